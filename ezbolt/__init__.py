@@ -13,4 +13,5 @@ from ezbolt.plotter import (preview,
                             plot_elastic, 
                             plot_ECR, 
                             plot_ICR,
-                            plot_convergence)
\ No newline at end of file
+                            plot_convergence,
+                            plot_convergence_map)
\ No newline at end of file
@@ -0,0 +1,3 @@
+from ezbolt.cli import main
+
+raise SystemExit(main())
@@ -0,0 +1,329 @@
+"""
+Batch solving of connection schedules. A schedule is a table with one row per
+(bolt pattern, load combination). Rows are read in chunks, solved across a process
+pool, and written to disk as each chunk finishes so memory stays flat regardless
+of schedule size. Within a chunk, rows are grouped by canonical geometry so each
+unique bolt pattern is set up once and all of its load cases go to one worker.
+
+Schedule columns:
+    id                  (OPTIONAL) case identifier. Defaults to the row number
+    nx, ny              number of bolts in x and y (rectangular pattern, see BoltGroup.add_bolts())
+    width, height       width and height of the rectangular pattern
+    xo, yo              (OPTIONAL) lower left corner. Default = 0
+    perimeter_only      (OPTIONAL) True or False. Default = False
+    bolts               (ALTERNATIVE TO nx, ny, width, height) explicit coordinates "x1 y1; x2 y2; ..."
+    Vx, Vy, torsion     applied loads
+    bolt_capacity       (OPTIONAL) bolt capacity in kips. Default = 17.9
+
+With a screening threshold, rows whose elastic DCR is below the threshold skip the ICR solve.
+Their ICR columns are blank and status = "screened"; all other rows have status = "exact".
+
+With a cache path, every worker looks up ICR solutions in a persistent SQLite cache before iterating
+(see ezbolt.cache), so patterns and load directions solved in an earlier run are not iterated again.
+
+With warm_start, every worker starts each ICR search from the nearest converged ICR of the same pattern
+it has solved so far, in this chunk or earlier ones (see ezbolt.warmstart). Rows need not be sorted by
+load. Cu then depends on which rows a worker saw first, within the equilibrium tolerance.
+
+With a curve, every row is solved with that bolt load-deformation curve (see ezbolt.curves) instead of AISC.
+"""
+import contextlib
+import io
+import os
+import multiprocessing
+import pandas as pd
+import ezbolt.boltgroup
+import ezbolt.curves
+
+
+RESULT_COLUMNS = ["id", "N_bolt", "Vx", "Vy", "torsion", "bolt_capacity",
+                  "bolt_demand", "DCR_elastic",
+                  "ECR_x", "ECR_y", "Ce", "DCR_ECR",
+                  "ICR_x", "ICR_y", "Cu", "DCR_ICR", "converged", "status"]
+
+
+def record_coordinates(record):
+    """
+    Return bolt coordinates [(x, y), ...] described by one schedule row (dict).
+    """
+    bolts = record.get("bolts")
+    if isinstance(bolts, str) and bolts.strip():
+        coords = []
+        for pair in bolts.split(";"):
+            if pair.strip():
+                x, y = pair.replace(",", " ").split()
+                coords.append((float(x), float(y)))
+    else:
+        coords = ezbolt.boltgroup.rectangular_pattern(xo = _get(record, "xo", 0.0),
+                                                      yo = _get(record, "yo", 0.0),
+                                                      width = float(record["width"]),
+                                                      height = float(record["height"]),
+                                                      nx = int(record["nx"]),
+                                                      ny = int(record["ny"]),
+                                                      perimeter_only = _get_bool(record, "perimeter_only"))
+    if len(coords) == 0:
+        raise RuntimeError("ERROR: no bolts specified")
+    return coords
+
+
+def geometry_key(coords, decimals=6):
+    """
+    Canonical key of a bolt pattern. Coordinates are taken relative to the centroid, rounded, and
+    sorted so the same pattern matches regardless of bolt order or location.
+
+    Returns:
+        key                 tuple:: hashable canonical geometry
+        x_cg, y_cg          float:: centroid of coords
+    """
+    x_cg = sum([c[0] for c in coords]) / len(coords)
+    y_cg = sum([c[1] for c in coords]) / len(coords)
+    key = tuple(sorted((round(x - x_cg, decimals) + 0.0, round(y - y_cg, decimals) + 0.0) for x, y in coords))
+    return key, x_cg, y_cg
+
+
+def group_by_geometry(records):
+    """
+    Group schedule rows by canonical geometry.
+
+    Returns:
+        groups              list:: [(coords, [(record, shift_x, shift_y), ...]), ...] where shift is the
+                                   offset of the row's centroid from that of coords
+        failed              list:: [(record, error), ...] rows whose geometry could not be parsed
+    """
+    groups = dict()
+    failed = []
+    for record in records:
+        try:
+            coords = record_coordinates(record)
+            key, x_cg, y_cg = geometry_key(coords)
+        except Exception as e:
+            failed.append((record, "{}: {}".format(type(e).__name__, e)))
+            continue
+        if key not in groups:
+            groups[key] = (coords, x_cg, y_cg, [])
+        coords0, x_cg0, y_cg0, cases = groups[key]
+        cases.append((record, x_cg - x_cg0, y_cg - y_cg0))
+    return [(coords, cases) for coords, _, _, cases in groups.values()], failed
+
+
+def solve_geometry(coords, cases, backend="python", screen=None, cache=None, warm_start=False, curve=None):
+    """
+    Solve all load cases of one bolt pattern. The BoltGroup (centroid, inertia and bolt offsets)
+    is built once and reused for every case. Every case is solved in full (never rescaled from the
+    previous row), so results do not depend on row order.
+
+    Args:
+        coords              list:: bolt coordinates [(x, y), ...]
+        cases               list:: [(record, shift_x, shift_y), ...]. Results (ECR, ICR) are translated
+                                   by shift to the row's own location
+        backend             str::  (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+        screen              float:: (OPTIONAL) elastic DCR screening threshold. See BoltGroup.solve(). Default = None
+        cache               str::   (OPTIONAL) path to a persistent solve cache. See ezbolt.cache. Default = None
+        warm_start          bool::  (OPTIONAL) warm start from the nearest converged ICR of this pattern. See ezbolt.warmstart.
+                                    Default = False
+        curve               obj::   (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+
+    Returns:
+        list of (record, result_row, error). Exactly one of result_row or error is None.
+    """
+    bolt_group = ezbolt.boltgroup.BoltGroup()
+    for x, y in coords:
+        bolt_group.add_bolt_single(x, y)
+
+    outputs = []
+    for record, shift_x, shift_y in cases:
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = bolt_group.solve(Vx = float(record["Vx"]),
+                                           Vy = float(record["Vy"]),
+                                           torsion = float(record["torsion"]),
+                                           bolt_capacity = _get(record, "bolt_capacity", 17.9),
+                                           verbose = False,
+                                           backend = backend,
+                                           screen = screen,
+                                           cache = cache,
+                                           warm_start = warm_start,
+                                           rescale = False,
+                                           curve = curve)
+            row, error = summarize(record["id"], bolt_group, results)
+        except Exception as e:
+            row, error = None, "{}: {}".format(type(e).__name__, e)
+        if row is not None:
+            for key, shift in (("ECR_x", shift_x), ("ECR_y", shift_y), ("ICR_x", shift_x), ("ICR_y", shift_y)):
+                row[key] = row[key] + shift
+        outputs.append((record, row, error))
+    return outputs
+
+
+def solve_record(record, backend="python", screen=None, cache=None, curve=None):
+    """
+    Solve one schedule row. Returns (result_row, error). Exactly one of the two is None.
+    Non-converged ICR solutions are reported as errors.
+    """
+    try:
+        coords = record_coordinates(record)
+    except Exception as e:
+        return None, "{}: {}".format(type(e).__name__, e)
+    _, row, error = solve_geometry(coords, [(record, 0.0, 0.0)], backend, screen, cache, curve=curve)[0]
+    return row, error
+
+
+def summarize(case_id, bolt_group, results):
+    """
+    Flatten a solved BoltGroup into one result row. Returns (result_row, error).
+    """
+    if results.status == "exact" and not results.ICR.converged:
+        return None, "ICR solver did not converge"
+    row = dict()
+    row["id"] = case_id
+    row["N_bolt"] = bolt_group.N_bolt
+    row["Vx"] = bolt_group.Vx
+    row["Vy"] = bolt_group.Vy
+    row["torsion"] = bolt_group.torsion
+    row["bolt_capacity"] = results.elastic.bolt_capacity
+    row["bolt_demand"] = results.elastic.bolt_demand
+    row["DCR_elastic"] = results.elastic.DCR
+    row["ECR_x"] = results.ECR.ECR_x
+    row["ECR_y"] = results.ECR.ECR_y
+    row["Ce"] = results.ECR.Ce
+    row["DCR_ECR"] = results.ECR.DCR
+    row["ICR_x"] = results.ICR.ICR_x
+    row["ICR_y"] = results.ICR.ICR_y
+    row["Cu"] = results.ICR.Cu
+    row["DCR_ICR"] = results.ICR.DCR
+    row["converged"] = results.ICR.converged
+    row["status"] = results.status
+    return row, None
+
+
+def _get(record, key, default):
+    """
+    Return float record[key], or default if the column is missing or blank.
+    """
+    value = record.get(key, default)
+    if value is None or value != value or value == "":
+        return default
+    return float(value)
+
+
+def _get_bool(record, key):
+    """
+    Return bool record[key]. Missing or blank values are False.
+    """
+    value = record.get(key, False)
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "1", "yes")
+    return bool(value) and value == value
+
+
+def _solve_geometry_star(args):
+    return solve_geometry(*args)
+
+
+class ResultWriter:
+    """
+    Append result rows to a csv or parquet file. Parquet output requires pyarrow.
+    """
+    def __init__(self, path, columns=None):
+        self.path = path
+        self.columns = columns
+        self.is_parquet = os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+        self._writer = None
+        self._header_written = False
+        self.n_rows = 0
+
+    def write(self, rows):
+        if not rows:
+            return
+        df = pd.DataFrame(rows, columns=self.columns)
+        if self.is_parquet:
+            import pyarrow
+            import pyarrow.parquet
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            if self._writer is None:
+                self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table.cast(self._writer.schema))
+        else:
+            df.to_csv(self.path, mode="a" if self._header_written else "w", header=not self._header_written, index=False)
+            self._header_written = True
+        self.n_rows += len(rows)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+def run_batch(input_path, output_path, failed_path=None, chunksize=1000, processes=None, backend="python", verbose=True,
+              screen=None, cache=None, warm_start=False, curve=None):
+    """
+    Solve every row of a connection schedule csv and stream results to output_path (.csv or .parquet).
+    Failed or non-converged rows are written to failed_path along with the error message.
+
+    Args:
+        input_path              str:: schedule csv. See module docstring for columns
+        output_path             str:: result file. Parquet if extension is .parquet, otherwise csv
+        failed_path             str:: (OPTIONAL) side file for failed rows. Default = <output>.failed.csv
+        chunksize               int:: (OPTIONAL) number of rows read and solved at a time. Default = 1000
+        processes               int:: (OPTIONAL) number of worker processes. Default = cpu_count(). 1 = run serially
+        backend                 str:: (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+        verbose                 bool:: (OPTIONAL) print progress after every chunk. Default = True
+        screen                  float:: (OPTIONAL) skip ICR for rows with elastic DCR below this value. Default = None
+        cache                   str:: (OPTIONAL) path to a persistent SQLite solve cache shared by all workers and
+                                      later runs. See ezbolt.cache. Default = None
+        warm_start              bool:: (OPTIONAL) start each ICR search from the nearest converged ICR of the same
+                                      pattern solved by the worker. See ezbolt.warmstart. Default = False
+        curve                   obj:: (OPTIONAL) bolt load-deformation curve: a LoadDeformationCurve or a name in
+                                      ezbolt.curves.CURVES. Default = AISC (closed form)
+
+    Returns:
+        n_solved, n_failed      int:: number of rows written to output_path and failed_path
+    """
+    if failed_path is None:
+        failed_path = os.path.splitext(output_path)[0] + ".failed.csv"
+    curve = ezbolt.curves.get_curve(curve)
+    processes = processes or multiprocessing.cpu_count()
+    writer = ResultWriter(output_path, columns=RESULT_COLUMNS)
+    failed_writer = None
+    pool = multiprocessing.Pool(processes) if processes > 1 else None
+    n_read = 0
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            if "id" not in chunk.columns:
+                chunk.insert(0, "id", range(n_read, n_read + len(chunk)))
+            records = chunk.to_dict("records")
+            n_read += len(records)
+
+            # group rows by geometry so each unique pattern is set up once and sent to one worker
+            groups, failed_geometry = group_by_geometry(records)
+            tasks = [(coords, cases, backend, screen, cache, warm_start, curve) for coords, cases in groups]
+            if pool is None:
+                outputs = map(_solve_geometry_star, tasks)
+            else:
+                outputs = pool.imap_unordered(_solve_geometry_star, tasks)
+            rows = []
+            failed = [dict(record, error=error) for record, error in failed_geometry]
+            for output in outputs:
+                for record, row, error in output:
+                    if error is None:
+                        rows.append(row)
+                    else:
+                        failed.append(dict(record, error=error))
+
+            # write results as soon as the chunk is done
+            writer.write(rows)
+            if failed:
+                if failed_writer is None:
+                    failed_writer = ResultWriter(failed_path, columns=list(chunk.columns) + ["error"])
+                failed_writer.write(failed)
+            if verbose:
+                print("{:,} rows processed. {:,} solved, {:,} failed".format(n_read, writer.n_rows,
+                                                                            0 if failed_writer is None else failed_writer.n_rows))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        writer.close()
+        if failed_writer is not None:
+            failed_writer.close()
+    return writer.n_rows, 0 if failed_writer is None else failed_writer.n_rows
@@ -1,7 +1,19 @@
 import ezbolt.bolt
+import ezbolt.brandt
+import ezbolt.curves
+import ezbolt.icr
+import ezbolt.results
+import ezbolt.sensitivity
+import ezbolt.surrogate
+import ezbolt.envelope
+import ezbolt.tolerance
+import ezbolt.robustness
+import ezbolt.cache
+import ezbolt.inverse
+import ezbolt.warmstart
+import numpy as np
 import math
 import itertools
-import pandas as pd
 
 
 class BoltGroup:
@@ -26,7 +38,7 @@ class BoltGroup:
         Iy (float):                     - moment of inertia about the y-axis
         Ixy (float):                    - product of inertia
         Iz (float):                     - moment of inertia about the z-axis (also known as Ip or J)
-        results (dict):                 - a dictionary storing all critical calculation results
+        results (SolveResult):          - result object storing all critical calculation results
 
         Vx (float):                     - applied shear force in X direction
         Vy (float):                     - applied shear force in Y direction
@@ -61,12 +73,18 @@ class BoltGroup:
         Cu (list(float)):               - coefficient for ICR method.
         P_demand_ICR (float):           - Demand on axial force for ICR method.
         P_capacity_ICR (float):         - Capacity of axial force for ICR method.
-        ICR_table (list(dataframe)):    - List containing ICR method table data.
 
     Public Methods:
         .add_bolt_single()
         .add_bolts()
+        .remove_bolt()
+        .move_bolt()
         .solve()
+        .build_surrogate()
+        .envelope()
+        .monte_carlo()
+        .n_minus_one()
+        .icr_geometry()
     """
     def __init__(self):
         # general geometric attributes
@@ -113,9 +131,24 @@ class BoltGroup:
         self.ICR_x =[]
         self.ICR_y = []
         self.Cu = []
+        self.residual = []
         self.P_demand_ICR = None
         self.P_capacity_ICR = None
-        self.ICR_table = []
+        
+        # load-independent geometry cache. See get_geometry() and icr_geometry()
+        self._geometry = None
+        self._icr_geometry = None
+        
+        # running sums for O(1) centroid and inertia updates. See _update_sums()
+        self._next_tag = 0
+        self._sums = None
+        self._ref = None
+        
+        # (Vx, Vy, torsion, ecc_method, curve) of the last full solve and its equilibrium residual in kips,
+        # scaled along with the results. See _rescale_factor()
+        self._solve_key = None
+        self._solve_residual = 0.0
+        self._bolt_geometry_stale = False
     
     def add_bolt_single(self, x, y):
         """
@@ -128,9 +161,110 @@ class BoltGroup:
         Returns:
             None
         """
-        self.bolts.append(ezbolt.bolt.Bolt(self.N_bolt,x,y))
+        self.bolts.append(ezbolt.bolt.Bolt(self._next_tag,x,y))
+        self._next_tag += 1
         self.N_bolt += 1
+        self._update_sums(x, y, 1)
         self.update_geometric_properties()
+    
+    def remove_bolt(self, tag):
+        """
+        Remove a bolt. Centroid and moments of inertia are downdated in O(1) from running sums
+        instead of being recomputed over all bolts. Remaining bolts keep their tags.
+        
+        Args:
+            tag ::int           - tag of the bolt to remove
+            
+        Returns:
+            bolt ::Bolt         - the removed bolt
+        """
+        bolt = self._find_bolt(tag)
+        self.bolts.remove(bolt)
+        self.N_bolt -= 1
+        self._update_sums(bolt.x, bolt.y, -1)
+        self._update_from_sums()
+        return bolt
+    
+    def move_bolt(self, tag, x, y):
+        """
+        Move a bolt to a new coordinate. Centroid and moments of inertia are updated in O(1).
+        
+        Args:
+            tag ::int           - tag of the bolt to move
+            x ::float           - new x coordinate
+            y ::float           - new y coordinate
+            
+        Returns:
+            None
+        """
+        bolt = self._find_bolt(tag)
+        self._update_sums(bolt.x, bolt.y, -1)
+        self._update_sums(x, y, 1)
+        bolt.x = x
+        bolt.y = y
+        self._update_from_sums()
+    
+    def _find_bolt(self, tag):
+        for bolt in self.bolts:
+            if bolt.tag == tag:
+                return bolt
+        raise RuntimeError("ERROR: no bolt with tag {}".format(tag))
+    
+    def _update_sums(self, x, y, sign):
+        """
+        Add (sign = 1) or remove (sign = -1) a bolt from the running sums [n, u, v, u^2, v^2, u*v].
+        u, v are measured from the first bolt ever added to limit cancellation in I = sum(u^2) - n * u_cg^2.
+        """
+        if self._sums is None:
+            self._ref = (x, y)
+            self._sums = [0.0] * 6
+        u = x - self._ref[0]
+        v = y - self._ref[1]
+        for i, value in enumerate((1.0, u, v, u*u, v*v, u*v)):
+            self._sums[i] += sign * value
+    
+    def _update_from_sums(self):
+        """
+        Centroid and moments of inertia from the running sums. Bolt distances to the centroid are
+        refreshed lazily by get_geometry().
+        """
+        if self.N_bolt == 0:
+            self.x_cg = self.y_cg = self.Ix = self.Iy = self.Ixy = self.Iz = None
+            self._sums = None
+        else:
+            self.x_cg, self.y_cg, self.Ix, self.Iy, self.Ixy = self._properties_from_sums(self._sums)
+            self.Iz = self.Ix + self.Iy
+        self._bolt_geometry_stale = True
+        self._geometry = None
+        self._icr_geometry = None
+        self._solve_key = None
+    
+    def _properties_from_sums(self, sums):
+        """
+        (x_cg, y_cg, Ix, Iy, Ixy) from running sums [n, u, v, u^2, v^2, u*v]
+        """
+        n, su, sv, suu, svv, suv = sums
+        u_cg = su / n
+        v_cg = sv / n
+        return (self._ref[0] + u_cg,
+                self._ref[1] + v_cg,
+                svv - n * v_cg**2,
+                suu - n * u_cg**2,
+                suv - n * u_cg * v_cg)
+    
+    def _properties_without(self, x, y):
+        """
+        Centroid and polar moment of inertia of the bolt group with the bolt at (x, y) taken out,
+        in O(1) and without modifying the bolt group. Used by n_minus_one().
+        
+        Returns:
+            x_cg, y_cg, Iz      float:: properties of the remaining bolts
+        """
+        u = x - self._ref[0]
+        v = y - self._ref[1]
+        sums = [total - value for total, value in zip(self._sums, (1.0, u, v, u*u, v*v, u*v))]
+        x_cg, y_cg, Ix, Iy, Ixy = self._properties_from_sums(sums)
+        return x_cg, y_cg, Ix + Iy
         
     def add_bolts(self,xo,yo,width,height,nx,ny,perimeter_only=False):
         """
@@ -148,30 +282,7 @@ class BoltGroup:
         Returns:
             None
         """
-        # determine spacing
-        sx = 0 if nx==1 else width / (nx-1)
-        sy = 0 if ny==1 else height / (ny-1)
-        
-        # generate bolt coordinate
-        xcoord=[]
-        ycoord=[]
-        xcoord.append(xo)
-        ycoord.append(yo)
-        if sx != 0:
-            for i in range(nx-1):
-                xcoord.append(xcoord[-1]+sx)
-        if sy !=0:
-            for i in range(ny-1):
-                ycoord.append(ycoord[-1]+sy)
-        bolt_coord = list(itertools.product(xcoord,ycoord))
-        
-        # remove middle bolts if in perimeter mode
-        if perimeter_only:
-            x_edge0=xo
-            x_edge1=xcoord[-1]
-            y_edge0=yo
-            y_edge1=ycoord[-1]
-            bolt_coord = [e for e in bolt_coord if e[0]==x_edge0 or e[0]==x_edge1 or e[1]==y_edge0 or e[1]==y_edge1]
+        bolt_coord = rectangular_pattern(xo, yo, width, height, nx, ny, perimeter_only)
         
         # add bolts
         for coord in bolt_coord:
@@ -191,8 +302,71 @@ class BoltGroup:
         self.Iz = self.Ix + self.Iy
         for bolt in self.bolts:
             bolt.update_geometry(self.x_cg, self.y_cg)
+        self._bolt_geometry_stale = False
+        self._geometry = None
+        self._icr_geometry = None
+        self._solve_key = None
     
-    def solve(self, Vx, Vy, torsion, bolt_capacity=17.9, verbose=True, ecc_method="AISC"):
+    def get_geometry(self):
+        """
+        Return load-independent bolt data as arrays. Computed once and cached until the
+        geometry changes (i.e. a bolt is added, removed or moved).
+        
+        Returns:
+            geometry            dict:: {"tag", "x", "y", "dx", "dy", "ro", "hull"}. "tag" is a list, the rest are
+                                       numpy arrays. dx, dy, ro are with respect to CoG. "hull" holds the
+                                       indices of bolts on the convex hull of the group
+        """
+        if self._geometry is None:
+            if self._bolt_geometry_stale:
+                for bolt in self.bolts:
+                    bolt.update_geometry(self.x_cg, self.y_cg)
+                self._bolt_geometry_stale = False
+            geometry = dict()
+            geometry["tag"] = [b.tag for b in self.bolts]
+            geometry["x"] = np.array([b.x for b in self.bolts], dtype=float)
+            geometry["y"] = np.array([b.y for b in self.bolts], dtype=float)
+            geometry["dx"] = np.array([b.dx for b in self.bolts], dtype=float)
+            geometry["dy"] = np.array([b.dy for b in self.bolts], dtype=float)
+            geometry["ro"] = np.array([b.ro for b in self.bolts], dtype=float)
+            geometry["hull"] = ezbolt.brandt.convex_hull(geometry["x"], geometry["y"])
+            self._geometry = geometry
+        return self._geometry
+    
+    def _reset_solve_state(self):
+        """
+        Clear results from the previous solve (on the bolt group and on every bolt) so the
+        same BoltGroup can be solved repeatedly without state leaking between load cases.
+        """
+        self.results = None
+        self._solve_key = None
+        self.bolt_demand = None
+        self.ecc_ECRx = None
+        self.ecc_ECRy = None
+        self.ecc_ECR = None
+        self.ECR_ax = None
+        self.ECR_ay = None
+        self.ECR_x = None
+        self.ECR_y = None
+        self.Ce = None
+        self.P_demand = None
+        self.P_capacity = None
+        self.ecc_ICRx = []
+        self.ecc_ICRy = []
+        self.ecc_ICR = []
+        self.ICR_ax = []
+        self.ICR_ay = []
+        self.ICR_x = []
+        self.ICR_y = []
+        self.Cu = []
+        self.residual = []
+        self.P_demand_ICR = None
+        self.P_capacity_ICR = None
+        for bolt in self.bolts:
+            bolt.reset_ICR()
+    
+    def solve(self, Vx, Vy, torsion, bolt_capacity=17.9, verbose=True, ecc_method="AISC", backend="python",
+              sensitivities=False, screen=None, cache=None, curve=None, warm_start=False, rescale=True):
         """
         Public method called by user to solve for bolt forces using three methods:
             1. Elastic Method - Superposition
@@ -208,28 +382,46 @@ class BoltGroup:
                                             connection capacity = Cu * bolt capacity.
             verbose                 bool::  (OPTIONAL) whether or not to print out status messages. Default = True
             ecc_method              str::   (OPTIONAL) method for calculating vertical eccentricity. "AISC" or "perpendicular". See more note below. 
+            backend                 str::   (OPTIONAL) "python" or "numba". "numba" compiles Brandt's iteration into a single native
+                                            function and falls back to "python" if numba is not installed. Default = "python"
+            sensitivities           bool::  (OPTIONAL) compute derivatives of Cu and ICR location with respect to ex, ey, load
+                                            angle and bolt coordinates by implicit differentiation at the converged ICR.
+                                            Stored in results.ICR.sensitivities. See ezbolt.sensitivity. Default = False
+            screen                  float:: (OPTIONAL) screening threshold. If the elastic DCR is below this value, the ICR
+                                            iteration is skipped and results.status = "screened" (ICR fields are NaN).
+                                            Otherwise results.status = "exact". The elastic method is conservative except
+                                            near concentric loads, where the ICR DCR can be up to 2% higher, so keep the
+                                            threshold comfortably below 1.0 (e.g. 0.8). Default = None (always solve ICR)
+            cache                   str::   (OPTIONAL) path to a persistent SQLite solve cache (or an ezbolt.cache.SolveCache).
+                                            A stored ICR for the same bolt pattern and line of action is the starting point
+                                            of the iteration, which then meets this load's tolerance in a few trials.
+                                            New converged solutions are stored. Default = None
+            curve                   obj::   (OPTIONAL) bolt load-deformation curve for the ICR method: a LoadDeformationCurve
+                                            (e.g. ezbolt.curves.crawford_kulak() or from_test_data()) or a name in
+                                            ezbolt.curves.CURVES. Default = None (AISC curve in closed form). See ezbolt.curves
+            warm_start              bool::  (OPTIONAL) start Brandt's iteration from the nearest converged ICR of a previous
+                                            solve of this bolt pattern (any load order) instead of the elastic estimate.
+                                            Converged ICRs are kept in a bounded per-pattern index. May also be an
+                                            ezbolt.warmstart.WarmStartIndex. Results agree with cold solves within the
+                                            equilibrium tolerance. See ezbolt.warmstart. Default = False
+            rescale                 bool::  (OPTIONAL) reuse the previous results of this bolt group when only the load
+                                            magnitude or bolt capacity changed. See notes on rescaling below. Default = True
 
         Return:
-            return_dict             dict:: dictionary containing calculation results
-                                        ...["Elastic Method - Superposition"]
-                                            ...["Bolt Capacity"]
-                                            ...["Bolt Demand"]
-                                            ...["Bolt Force Table"]
-                                            ...["DCR"]
-                                        ...["Elastic Method - Center of Rotation"]
-                                            ...["Center of Rotation"]
-                                            ...["Ce"]
-                                            ...["Bolt Capacity"]
-                                            ...["Bolt Demand"]
-                                            ...["Bolt Force Table"]
-                                            ...["DCR"]
-                                        ...["Instant Center of Rotation Method"]
-                                            ...["ICR"]
-                                            ...["Cu"]
-                                            ...["Bolt Capacity"]
-                                            ...["Bolt Demand"]
-                                            ...["Bolt Force Table"]
-                                            ...["DCR"]
+            results                 SolveResult:: result object (see ezbolt.results). Scalar fields are floats and bools,
+                                        bolt force tables are built on first access.
+                                        .elastic        Elastic Method - Superposition
+                                            .bolt_capacity, .bolt_demand, .DCR, .bolt_table
+                                        .ECR            Elastic Method - Center of Rotation
+                                            .applicable, .ECR_x, .ECR_y, .Ce, .connection_capacity,
+                                            .connection_demand, .DCR, .bolt_table
+                                        .ICR            Instant Center of Rotation Method
+                                            .applicable, .converged, .n_trials, .ICR_x, .ICR_y, .Cu,
+                                            .connection_capacity, .connection_demand, .DCR, .bolt_table,
+                                            .sensitivities, .status
+                                        .status         "exact" or "screened"
+                                        Original dictionary keys are still supported, for example
+                                        results["Instant Center of Rotation Method"]["Cu"]
             
         Notes on ecc_method:
             ezbolt simplifies user input into three load vectors at the centroid of the bolt group (Vx, Vy, Mz), this convention is
@@ -251,7 +443,31 @@ class BoltGroup:
                 Vy * ex - Vx * ey = torsion
                 (50) * ex - (50)* (0) = 200
                 ex = 200 / 50 = 4.0 in
+        
+        Notes on rescaling:
+            Cu, Ce, the ICR and ECR locations and the shape of the bolt force distribution only depend on the load
+            direction and eccentricity. If (Vx, Vy, torsion) is a positive multiple of the previous solve on this bolt
+            group (same ecc_method and curve, no screening), or only bolt_capacity changed, the previous results are rescaled in
+            O(N) instead of re-solved. Adding, removing or moving bolts always triggers a full solve.
+            The equilibrium tolerance of the ICR iteration is absolute (0.01 kips) and the residual scales with the
+            load, so when the scaled residual would exceed it, Brandt's iteration is rerun from the previous ICR
+            instead (usually a few trials). Results then depend on the order of solves only within the tolerance;
+            pass rescale=False for results that do not depend on previous solves at all.
         """
+        # same load direction and eccentricity as the previous solve: rescale instead of re-solving
+        curve = ezbolt.curves.get_curve(curve)
+        factor = self._rescale_factor(Vx, Vy, torsion, ecc_method, curve, sensitivities, screen) if rescale else None
+        icr_guess = None
+        if factor is not None:
+            if factor * self._solve_residual < ezbolt.icr.TOL:
+                return self._rescale(factor, Vx, Vy, torsion, bolt_capacity, ecc_method, curve, verbose)
+            
+            # the scaled residual exceeds the tolerance: iterate again, starting from the previous ICR
+            icr_guess = self.results.ICR.ICR
+        
+        # clear results from previous solve
+        self._reset_solve_state()
+        
         # store user input
         self.Vx = Vx
         self.Vy = Vy
@@ -264,99 +480,295 @@ class BoltGroup:
             raise RuntimeError("ERROR: No force applied!")
         self.theta = math.atan2(Vy, Vx) * 180 / math.pi
         
-        # calculate ex and ey
-        if self.V_resultant == 0:
-            self.ecc_x = 0
-            self.ecc_y = 0
-            
-        else:
-            if ecc_method == "AISC":
-                if Vy == 0:
-                    self.ecc_x = 0
-                    self.ecc_y = -(torsion) / Vx
-                else:
-                    self.ecc_x = (torsion) / Vy
-                    self.ecc_y = 0
-            elif ecc_method == "perpendicular":
-                self.ecc_y = (self.torsion / self.V_resultant) * -math.sin(math.radians(self.theta+90))
-                self.ecc_x = (self.torsion / self.V_resultant) * -math.cos(math.radians(self.theta+90))
-                
-            else:
-                # this is a test section. I wanted to see how Cu varies as I move along L(x). ecc_method is a float here
-                # conclusion: Cu is constant as long as P is along the line defined by Vy * ex - Vx * ey = torsion
-                self.ecc_y = ecc_method
-                self.ecc_x = (torsion + Vx * self.ecc_y) / Vy
+        # calculate ex and ey. See ezbolt.icr.eccentricity()
+        self.ecc_x, self.ecc_y = ezbolt.icr.eccentricity(Vx, Vy, torsion, ecc_method)
                 
         self.ecc = math.sqrt(self.ecc_x **2 + self.ecc_y **2)
         
         # solve with all three methods
         result_elastic = self.solve_elastic()
         result_ECR = self.solve_ECR()
-        result_ICR = self.solve_ICR(verbose)
+        if screen is not None and self.torsion != 0 and result_elastic.DCR < screen:
+            if verbose:
+                print("Elastic DCR = {:.3f} < {}. ICR solve skipped (screened).".format(result_elastic.DCR, screen))
+            result_ICR = ezbolt.results.ICRResult(self.bolt_capacity,
+                                                  connection_demand = self.V_resultant if self.V_resultant != 0 else self.torsion,
+                                                  converged = False,
+                                                  status = "screened")
+        else:
+            result_ICR = self.solve_ICR(verbose, backend, sensitivities, ezbolt.cache.get_cache(cache), ecc_method, curve,
+                                        warm_start, icr_guess)
         
-        # return a dictionary containing all result dataframes
-        self.results = dict()
-        self.results["Elastic Method - Superposition"] = result_elastic
-        self.results["Elastic Method - Center of Rotation"] = result_ECR
-        self.results["Instant Center of Rotation Method"] = result_ICR
+        # return a result object containing all three methods
+        self.results = ezbolt.results.SolveResult(result_elastic, result_ECR, result_ICR)
+        self._solve_key = (Vx, Vy, torsion, ecc_method, curve)
+        
+        # residual of the final trial. Zero if nothing was iterated (pure torsion, no torsion)
+        residual = result_ICR.history[9, -1] if result_ICR.history is not None else math.nan
+        self._solve_residual = float(residual) if residual == residual else 0.0
         return self.results
+    
+    def _rescale_factor(self, Vx, Vy, torsion, ecc_method, curve, sensitivities, screen):
+        """
+        Return k > 0 if (Vx, Vy, torsion) = k * (previous load) and the previous results can be rescaled, else None.
+        Screened or non-converged results are never rescaled since their status depends on the load magnitude.
+        """
+        if self._solve_key is None or screen is not None:
+            return None
+        Vx0, Vy0, torsion0, ecc_method0, curve0 = self._solve_key
+        ICR = self.results.ICR
+        if ecc_method != ecc_method0 or curve is not curve0 or ICR.status != "exact" or (ICR.applicable and not ICR.converged):
+            return None
+        if sensitivities and ICR.sensitivities is None:
+            return None
+        new = (Vx, Vy, torsion)
+        old = (Vx0, Vy0, torsion0)
+        i = max(range(3), key=lambda j: abs(old[j]))
+        factor = new[i] / old[i]
+        if not factor > 0 or math.isinf(factor):
+            return None
+        for a, b in zip(new, old):
+            if not math.isclose(a, factor * b, rel_tol=1e-12, abs_tol=0.0):
+                return None
+        return factor
+    
+    def _rescale(self, factor, Vx, Vy, torsion, bolt_capacity, ecc_method, curve, verbose):
+        """
+        Multiply the previous results by factor and apply the new bolt capacity. O(N)
+        """
+        if verbose:
+            print("Same load direction and eccentricity as previous solve. Results rescaled by {:.4g}.".format(factor))
+        self.Vx = Vx
+        self.Vy = Vy
+        self.torsion = torsion
+        self.bolt_capacity = bolt_capacity
+        self.V_resultant = (Vx**2 + Vy**2)**(1/2)
+        self.bolt_demand = self.bolt_demand * factor
+        if self.Ce is not None:
+            self.P_demand = self.P_demand * factor
+            self.P_capacity = self.Ce * bolt_capacity
+        if self.P_demand_ICR is not None:
+            self.P_demand_ICR = self.P_demand_ICR * factor
+            self.P_capacity_ICR = self.Cu[-1] * bolt_capacity
+        for bolt in self.bolts:
+            bolt.scale_forces_ICR(factor)
+        self.results = self.results.rescale(factor, bolt_capacity)
+        self._solve_key = (Vx, Vy, torsion, ecc_method, curve)
+        self._solve_residual *= factor
+        return self.results
+
+    def build_surrogate(self, angle_grid, ecc_grid, backend="python", curve=None, batched=True):
+        """
+        Precompute Cu over a grid of load angle and eccentricity. The returned surrogate answers any
+        (Vx, Vy, torsion) on this bolt group by interpolation, which is much cheaper than solve() when
+        checking many load combinations.
+        
+        Args:
+            angle_grid              list:: load angles in degrees. Wrapped to [0, 360)
+            ecc_grid                list:: perpendicular eccentricities (torsion / V_resultant), >= 0. Negative
+                                           eccentricity is the same as angle + 180. Include 0 to cover concentric loads
+            backend                 str::  (OPTIONAL) ICR backend. "python" or "numba". Only used if batched is False.
+                                           Default = "python"
+            curve                   obj::  (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+            batched                 bool:: (OPTIONAL) solve the whole grid in lockstep with ezbolt.surrogate.solve_Cu_batch().
+                                           False = one warm-started solve at a time on backend. Default = True
+        
+        Return:
+            surrogate               CapacitySurrogate:: see ezbolt.surrogate
+                                        .query(Vx, Vy, torsion) returns (Cu, error estimate)
+                                        .DCR(Vx, Vy, torsion, bolt_capacity=17.9) returns (DCR, conservative DCR)
+        """
+        if self.N_bolt == 0:
+            raise RuntimeError("ERROR: no bolts in bolt group")
+        return ezbolt.surrogate.build_surrogate(self, angle_grid, ecc_grid, backend, curve, batched)
+
+    def envelope(self, load_steps, bolt_capacity=17.9, backend="python", warm_start=True, curve=None):
+        """
+        Stream a load history through the ICR solver and keep only running envelopes (governing DCR and
+        per-bolt peak force). Memory does not depend on the length of the history, so load_steps can be
+        a generator reading from file. Each step is warm started from the ICR of the previous step.
+        
+        Concentric steps (torsion = 0) use the concentric limit (Cu = 0.982 * N_bolt for the AISC curve) with
+        equal bolt forces.
+        Steps where Brandt's iteration does not converge are counted but left out of the envelope.
+        
+        Args:
+            load_steps              iterable:: (Vx, Vy, torsion) for each step
+            bolt_capacity           float::    (OPTIONAL) bolt capacity. Default = 17.9 kips
+            backend                 str::      (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+            warm_start              bool::     (OPTIONAL) start each search from the previous ICR. Default = True
+            curve                   obj::      (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+        
+        Return:
+            envelope                Envelope:: see ezbolt.envelope
+                                        .max_DCR, .max_DCR_step, .governing_load
+                                        .peak_force, .peak_force_step (per bolt), .bolt_table
+        """
+        if self.N_bolt == 0:
+            raise RuntimeError("ERROR: no bolts in bolt group")
+        return ezbolt.envelope.stream_envelope(self, load_steps, bolt_capacity, backend, warm_start, curve)
 
+    def monte_carlo(self, Vx, Vy, torsion, tolerance=1/16, n_samples=1000, distribution="uniform", seed=None,
+                    processes=1, backend="python", curve=None):
+        """
+        Distribution of Cu when every bolt is randomly displaced from its nominal position (hole oversizing,
+        misdrilled holes). Samples are solved as arrays without building a BoltGroup for each, warm started
+        from the nominal ICR. The load is applied at a fixed point; Vx, Vy, torsion are about the nominal centroid.
+        
+        Args:
+            Vx, Vy, torsion         float:: applied load. Only the line of action matters for Cu
+            tolerance               float:: (OPTIONAL) "uniform": max displacement of a bolt (radius). "normal": standard
+                                            deviation of x and y offsets. Default = 1/16 in
+            n_samples               int::   (OPTIONAL) number of samples. Default = 1000
+            distribution            str::   (OPTIONAL) "uniform" or "normal". Default = "uniform"
+            seed                    int::   (OPTIONAL) random seed
+            processes               int::   (OPTIONAL) number of worker processes. None = cpu_count(). Default = 1 (serial)
+            backend                 str::   (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+            curve                   obj::   (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+        
+        Return:
+            result                  ToleranceResult:: see ezbolt.tolerance
+                                        .Cu (one per sample), .Cu_nominal, .percentiles(q), .summary
+        """
+        if self.N_bolt == 0:
+            raise RuntimeError("ERROR: no bolts in bolt group")
+        return ezbolt.tolerance.monte_carlo(self, Vx, Vy, torsion, tolerance, n_samples, distribution, seed,
+                                            processes, backend, curve)
+
+    def n_minus_one(self, Vx, Vy, torsion, bolt_capacity=17.9, backend="python", curve=None):
+        """
+        Missing bolt robustness check. Each bolt is removed in turn and Cu is solved for the remaining bolts,
+        warm started from the intact ICR. Centroid and inertia of each variant are downdated in O(1). The load
+        is applied at a fixed point; Vx, Vy, torsion are about the intact centroid.
+        
+        Args:
+            Vx, Vy, torsion         float:: applied load
+            bolt_capacity           float:: (OPTIONAL) bolt capacity. Default = 17.9 kips
+            backend                 str::   (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+            curve                   obj::   (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+        
+        Return:
+            result                  NMinusOneResult:: see ezbolt.robustness
+                                        .governing_bolt, .max_DCR, .DCR_intact
+                                        .table (one row per missing bolt, governing bolt first)
+        """
+        return ezbolt.robustness.n_minus_one(self, Vx, Vy, torsion, bolt_capacity, backend, curve)
+
+    def max_load(self, ecc, angle, bolt_capacity=17.9, backend="python", curve=None):
+        """
+        Largest load the connection carries at a given eccentricity and angle. Cu does not depend on the
+        load magnitude, so this takes a single solve.
+        
+        Args:
+            ecc                     float:: perpendicular eccentricity (torsion / V) about the centroid
+            angle                   float:: load angle in degrees, counterclockwise from +x (270 = downward)
+            bolt_capacity           float:: (OPTIONAL) bolt capacity. Default = 17.9 kips
+            backend                 str::   (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+            curve                   obj::   (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+        
+        Return:
+            result                  InverseResult:: see ezbolt.inverse
+                                        .P_max, .Cu, .load (Vx, Vy, torsion at capacity)
+        """
+        if self.N_bolt == 0:
+            raise RuntimeError("ERROR: no bolts in bolt group")
+        return ezbolt.inverse.max_load(self, ecc, angle, bolt_capacity, backend, curve)
+
+    def max_eccentricity(self, P, angle, bolt_capacity=17.9, tol=0.01, backend="python", curve=None):
+        """
+        Largest eccentricity at which the connection carries load P at a given angle. The root is bracketed
+        and then narrowed by regula falsi with warm-started solves, typically within 10 solves.
+        Negative eccentricity at an angle is the same as positive eccentricity at angle + 180.
+        
+        Args:
+            P                       float:: load magnitude
+            angle                   float:: load angle in degrees, counterclockwise from +x (270 = downward)
+            bolt_capacity           float:: (OPTIONAL) bolt capacity. Default = 17.9 kips
+            tol                     float:: (OPTIONAL) tolerance on eccentricity. Default = 0.01 in
+            backend                 str::   (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+            curve                   obj::   (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+        
+        Return:
+            result                  InverseResult:: see ezbolt.inverse
+                                        .ecc (on the safe side, within tol), .Cu, .P_max (>= P)
+                                        .ecc = NaN if P exceeds the concentric capacity
+        """
+        if self.N_bolt == 0:
+            raise RuntimeError("ERROR: no bolts in bolt group")
+        return ezbolt.inverse.max_eccentricity(self, P, angle, bolt_capacity, tol, backend=backend, curve=curve)
+
+    def critical_angle(self, ecc, bolt_capacity=17.9, tol=0.1, n_initial=12, backend="python", curve=None):
+        """
+        Load angle at which the connection is weakest for a given eccentricity. A coarse pass of n_initial
+        angles brackets the minimum of Cu, which is then refined by golden-section search.
+        
+        Args:
+            ecc                     float:: perpendicular eccentricity (torsion / V) about the centroid
+            bolt_capacity           float:: (OPTIONAL) bolt capacity. Default = 17.9 kips
+            tol                     float:: (OPTIONAL) tolerance on angle. Default = 0.1 degrees
+            n_initial               int::   (OPTIONAL) number of angles in the coarse pass. Default = 12
+            backend                 str::   (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+            curve                   obj::   (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+        
+        Return:
+            result                  InverseResult:: see ezbolt.inverse
+                                        .angle (degrees from +x), .Cu (minimum), .P_max
+        """
+        if self.N_bolt == 0:
+            raise RuntimeError("ERROR: no bolts in bolt group")
+        return ezbolt.inverse.critical_angle(self, ecc, bolt_capacity, tol, n_initial, backend, curve)
+    
     def solve_elastic(self):
         """
         Solve for bolt forces using elastic method and superposition of forces.
+        Per-bolt results are numpy arrays, see .column() of the returned ElasticResult.
         """
-        # calculate bolt forces per elastic method
-        for bolt in self.bolts:
-            bolt.update_forces_elastic(Vx = self.Vx, 
-                                       Vy = self.Vy, 
-                                       N_bolt = self.N_bolt, 
-                                       torsion = self.torsion, 
-                                       Iz = self.Iz)
+        # calculate bolt forces per elastic method (whole-array operations)
+        geometry = self.get_geometry()
+        dx = geometry["dx"]
+        dy = geometry["dy"]
+        vx_direct = np.full(self.N_bolt, -self.Vx / self.N_bolt)
+        vy_direct = np.full(self.N_bolt, -self.Vy / self.N_bolt)
+        vx_torsion = self.torsion * dy / self.Iz
+        vy_torsion = -self.torsion * dx / self.Iz
+        vx_total = vx_direct + vx_torsion
+        vy_total = vy_direct + vy_torsion
+        v_resultant = np.sqrt(vx_total**2 + vy_total**2)
+        theta = np.arctan2(vy_total, vx_total) * 180 / math.pi
+        moment = -(vx_total*dy) + vy_total*dx
         
         # calculate maximum bolt force
-        self.bolt_demand = max([b.v_resultant for b in self.bolts])
-        
-        # tabulate bolt forces
-        result_dict=dict()
-        result_dict["bolt_tag"] = [x.tag for x in self.bolts]
-        result_dict["x"] = [b.x for b in self.bolts]
-        result_dict["y"] = [b.y for b in self.bolts]
-        result_dict["dx"] = [x.dx for x in self.bolts]
-        result_dict["dy"] = [x.dy for x in self.bolts]
-        result_dict["d"] = [x.ro for x in self.bolts]
-        result_dict["vx_direct"] = [x.vx_direct for x in self.bolts]
-        result_dict["vx_torsion"] = [x.vx_torsion for x in self.bolts]
-        result_dict["vy_direct"] = [x.vy_direct for x in self.bolts]
-        result_dict["vy_torsion"] = [x.vy_torsion for x in self.bolts]
-        result_dict["vx_total"] = [x.vx_total for x in self.bolts]
-        result_dict["vy_total"] = [x.vy_total for x in self.bolts]
-        result_dict["v_resultant"] = [x.v_resultant for x in self.bolts]
-        result_dict["moment"] = [x.moment for x in self.bolts]
-        result_dict["theta"] = [x.theta for x in self.bolts]
-        df = pd.DataFrame(result_dict)
-        sum_row = pd.DataFrame([""] * df.shape[1]).T
-        sum_row.columns = df.columns
-        sum_row["bolt_tag"] = "Total"
-        sum_row["vx_total"] = sum([x.vx_total for x in self.bolts])
-        sum_row["vy_total"] = sum([x.vy_total for x in self.bolts])
-        sum_row["moment"] = sum([x.moment for x in self.bolts])
-        df = pd.concat([df, sum_row], ignore_index=True)
-        df = df.set_index("bolt_tag")
-        
-        # save results to return dictionary
-        return_dict = dict()
-        return_dict["Bolt Force Table"] = df
-        return_dict["Bolt Demand"] = self.bolt_demand
-        return_dict["Bolt Capacity"] = self.bolt_capacity
-        return_dict["DCR"] = self.bolt_demand/self.bolt_capacity
-        return return_dict
+        self.bolt_demand = float(v_resultant.max())
+        
+        # bolt force table columns. DataFrame is only built when accessed
+        columns=dict()
+        columns["bolt_tag"] = geometry["tag"]
+        columns["x"] = geometry["x"]
+        columns["y"] = geometry["y"]
+        columns["dx"] = dx
+        columns["dy"] = dy
+        columns["d"] = geometry["ro"]
+        columns["vx_direct"] = vx_direct
+        columns["vx_torsion"] = vx_torsion
+        columns["vy_direct"] = vy_direct
+        columns["vy_torsion"] = vy_torsion
+        columns["vx_total"] = vx_total
+        columns["vy_total"] = vy_total
+        columns["v_resultant"] = v_resultant
+        columns["moment"] = moment
+        columns["theta"] = theta
+        return ezbolt.results.ElasticResult(bolt_demand = self.bolt_demand,
+                                            bolt_capacity = self.bolt_capacity,
+                                            columns = columns,
+                                            totals = ("vx_total", "vy_total", "moment"))
     
     def solve_ECR(self):
         """
         Solve for bolt forces using elastic center of rotation (ECR) method.
+        Per-bolt results are numpy arrays, see .column() of the returned ECRResult.
         """
         if self.torsion == 0:
-            return "Method not applicable when torsion = 0"
+            return ezbolt.results.ECRResult(self.bolt_capacity, applicable=False)
         else:
             # calculate location of ECR which is deterministic
             self.ECR_ax = self.Vy * self.Iz / self.torsion / self.N_bolt
@@ -370,292 +782,193 @@ class BoltGroup:
             self.ecc_ECR = math.sqrt(self.ecc_ECRx**2 + self.ecc_ECRy**2)
 
             # calculate bolt distance to ECR
-            for bolt in self.bolts:
-                bolt.update_geometry_ECR(self.ECR_x, self.ECR_y)
+            geometry = self.get_geometry()
+            dx_ECR = geometry["x"] - self.ECR_x
+            dy_ECR = geometry["y"] - self.ECR_y
+            ro_ECR = np.sqrt(dx_ECR**2 + dy_ECR**2)
             
             # calculate elastic center of rotation coefficient
-            dmax = max([b.ro_ECR for b in self.bolts])
-            sumdsquared = sum([b.ro_ECR**2 for b in self.bolts])
+            dmax = ro_ECR.max()
+            sumdsquared = np.sum(ro_ECR**2)
             
             if self.V_resultant == 0:
                 Mp = 1 # unit torsion
             else:
                 Mp = -(self.Vx/self.V_resultant) * self.ecc_ECRy + (self.Vy/self.V_resultant) * self.ecc_ECRx 
                 
-            self.Ce = abs(sumdsquared / (Mp * dmax))
+            self.Ce = float(abs(sumdsquared / (Mp * dmax)))
 
             # calculate bolt force (multiplied by actual applied load to scale up from unit force)
             if self.V_resultant == 0:
                 K = Mp / sumdsquared * self.torsion
             else:
                 K = Mp / sumdsquared * self.V_resultant
-
-            for bolt in self.bolts:
-                bolt.update_forces_ECR(K)
+            
+            vx_ECR = K * dy_ECR
+            vy_ECR = -K * dx_ECR
+            vtotal_ECR = np.sqrt(vx_ECR**2 + vy_ECR**2)
+            moment_ECR = vtotal_ECR * ro_ECR
+            moment_ECG = -vx_ECR*geometry["dy"] + vy_ECR*geometry["dx"]
                 
             # calculate final connection capacity and demand
             self.P_capacity = self.Ce * self.bolt_capacity
             self.P_demand = self.V_resultant if self.ecc!= 0 else self.torsion
             
-            # tabulate bolt forces
-            result_dict=dict()
-            result_dict["bolt_tag"] = [x.tag for x in self.bolts]
-            result_dict["x"] = [b.x for b in self.bolts]
-            result_dict["y"] = [b.y for b in self.bolts]
-            result_dict["dx"] = [x.dx for x in self.bolts]
-            result_dict["dy"] = [x.dy for x in self.bolts]
-            result_dict["dx_ECR"] = [x.dx_ECR for x in self.bolts]
-            result_dict["dy_ECR"] = [x.dy_ECR for x in self.bolts]
-            result_dict["d_ECR"] = [x.ro_ECR for x in self.bolts]
-            result_dict["vx"] = [x.vx_ECR for x in self.bolts]
-            result_dict["vy"] = [x.vy_ECR for x in self.bolts]
-            result_dict["v_resultant"] = [x.vtotal_ECR for x in self.bolts]
-            result_dict["moment"] = [x.moment_ECG for x in self.bolts]
-            result_dict["moment_ECR"] = [x.moment_ECR for x in self.bolts]
-            df = pd.DataFrame.from_dict(result_dict)
-            sum_row = pd.DataFrame([""] * df.shape[1]).T
-            sum_row.columns = df.columns
-            sum_row["bolt_tag"] = "Total"
-            sum_row["vx"] = sum([x.vx_ECR for x in self.bolts])
-            sum_row["vy"] = sum([x.vy_ECR for x in self.bolts])
-            sum_row["moment"] = sum([x.moment_ECG for x in self.bolts])
-            df = pd.concat([df, sum_row], ignore_index=True)
-            df = df.set_index("bolt_tag")
-            
-            # save results to return dictionary
-            return_dict= dict()
-            return_dict["Bolt Force Table"] = df
-            return_dict["Center of Rotation"] = [self.ECR_x, self.ECR_y]
-            return_dict["Ce"] = self.Ce
-            return_dict["Bolt Capacity"] = self.bolt_capacity
-            return_dict["Connection Capacity"] = self.P_capacity
-            return_dict["Connection Demand"] = self.P_demand
-            return_dict["DCR"] = self.P_demand / self.P_capacity
-        return return_dict
+            # bolt force table columns. DataFrame is only built when accessed
+            columns=dict()
+            columns["bolt_tag"] = geometry["tag"]
+            columns["x"] = geometry["x"]
+            columns["y"] = geometry["y"]
+            columns["dx"] = geometry["dx"]
+            columns["dy"] = geometry["dy"]
+            columns["dx_ECR"] = dx_ECR
+            columns["dy_ECR"] = dy_ECR
+            columns["d_ECR"] = ro_ECR
+            columns["vx"] = vx_ECR
+            columns["vy"] = vy_ECR
+            columns["v_resultant"] = vtotal_ECR
+            columns["moment"] = moment_ECG
+            columns["moment_ECR"] = moment_ECR
+            columns["theta"] = np.arctan2(vy_ECR, vx_ECR) * 180 / math.pi
+            return ezbolt.results.ECRResult(bolt_capacity = self.bolt_capacity,
+                                            ECR_x = self.ECR_x,
+                                            ECR_y = self.ECR_y,
+                                            Ce = self.Ce,
+                                            connection_demand = self.P_demand,
+                                            columns = columns,
+                                            totals = ("vx", "vy", "moment"))
+    
+    def icr_geometry(self):
+        """
+        Load-independent bolt data for ezbolt.icr.solve_icr(): get_geometry() plus centroid and Iz.
+        Can be shared by threads solving load cases on this bolt group in parallel, as long as no bolt
+        is added, removed or moved meanwhile. Cached like get_geometry(), so data derived from it once
+        (e.g. the warm start pattern key, see ezbolt.warmstart.get_index()) is kept until the geometry changes.
+        """
+        if self._icr_geometry is None:
+            self._icr_geometry = dict(self.get_geometry(), x_cg=self.x_cg, y_cg=self.y_cg, Iz=self.Iz)
+        return self._icr_geometry
     
-    def solve_ICR(self, verbose):
+    def solve_ICR(self, verbose, backend="python", sensitivities=False, cache=None, ecc_method="AISC", curve=None,
+                  warm_start=False, icr_guess=None):
         """
-        Solve for bolt forces using ICR method.
+        Solve for bolt forces using ICR method. The solve itself is the stateless ezbolt.icr.solve_icr();
+        this wrapper handles the cache and status messages, and copies the result onto the BoltGroup
+        (trial history) and its bolts (final trial) for plotting. If sensitivities is True and the
+        iteration converged, derivatives are attached to the result (not available for pure torsion).
+        If a SolveCache is given, a stored ICR is the starting point of the iteration (the cache key does
+        not include the load magnitude, so equilibrium is still checked against this load's tolerance) and
+        new converged solutions are stored. curve is the bolt load-deformation curve
+        (see ezbolt.curves). warm_start starts the iteration from the nearest stored ICR of this pattern
+        (see ezbolt.warmstart). icr_guess is an (x, y) starting ICR, e.g. that of the previous solve when a
+        rescaled result would not meet the tolerance; a cached ICR takes precedence.
         """
         # possibility #1: No torsion. ICR method is not applicable
         if self.torsion == 0:
-            return "ICR Method not applicable when torsion = 0"
+            return ezbolt.results.ICRResult(self.bolt_capacity, applicable=False)
         
         # possibility #2: Typical applied load. Iteration needed to find ICR
-        elif self.V_resultant !=0:
+        cached = None
+        if self.V_resultant != 0:
             if verbose:
                 print("Searching for location of ICR using Brandt's method...")
-            tol = 0.01
-            N_iter = 0
-            max_iter = 1000
-            fxx = []
-            fyy = []
-            residual = []
+                if backend == "numba" and ezbolt.brandt.numba is None:
+                    print("numba is not installed. Falling back to pure-Python backend.")
             
-            # step size (ax) is a very important for convergence. In general,
-            # small eccentricity -> ICR might be far away in which case you want to take large steps
-            # large eccentricity -> if step is too large, may result in infinite cycles and no convergence.
-            # but sometimes it just doesn't want to converge. Need to adaptively change for most optimal convergence.
-            if self.ecc < 1:
-                stepsize_factor = 0.5
-            elif self.ecc < 5:
-                stepsize_factor = 1
-            elif self.ecc < 10:
-                stepsize_factor = 2
-            else:
-                stepsize_factor = 5
-
-            while True:
-                if N_iter == 0:
-                    ax = self.Vy * self.Iz / self.torsion / self.N_bolt
-                    ay = self.Vx * self.Iz / self.torsion / self.N_bolt
-                    ICR_x = self.x_cg - ax
-                    ICR_y = self.y_cg + ay
-                    ICR_ex = self.ecc_x + ax
-                    ICR_ey = self.ecc_y - ay
-                else:
-                    # some configurations of load and bolts leads to infinite cycles and no convergence
-                    # I reduced ax, ay by a factor of at least 5 to ensure convergence with smaller step
-                    ax = fyy[-1] * self.Iz / self.torsion / self.N_bolt / stepsize_factor
-                    ay = fxx[-1] * self.Iz / self.torsion / self.N_bolt / stepsize_factor
-                    ICR_x = self.ICR_x[-1] - ax
-                    ICR_y = self.ICR_y[-1] + ay
-                    ICR_ex = self.ecc_ICRx[-1] + ax
-                    ICR_ey = self.ecc_ICRy[-1] - ay
-                
-                self.ICR_x.append(ICR_x)
-                self.ICR_y.append(ICR_y)
-                self.ICR_ax.append(ax)
-                self.ICR_ay.append(ay)
-                self.ecc_ICRx.append(ICR_ex)
-                self.ecc_ICRy.append(ICR_ey)
-                self.ecc_ICR.append(math.sqrt(self.ecc_ICRx[-1]**2 + self.ecc_ICRy[-1]**2))
-                
-                # update bolt geometry with respect to assumed ICR
-                for bolt in self.bolts:
-                    bolt.update_geometry_ICR(self.ICR_x[-1], self.ICR_y[-1])
-                
-                # compute ICR coefficient at assumed ICR
-                ro_max = max([b.ro_ICR[-1] for b in self.bolts])
-                Mi1 = [b.get_moment_ICR(ro_max) for b in self.bolts]
-                Mp1 = -(self.Vx/self.V_resultant) * self.ecc_ICRy[-1] + (self.Vy/self.V_resultant) * self.ecc_ICRx[-1]
-                
-                ICR_Cu = abs(sum(Mi1) / Mp1)
-                self.Cu.append(ICR_Cu)
-                
-                # compute Fmax at specified force magnitude
-                Mp = self.Vx * self.ecc_ICRy[-1] - self.Vy * self.ecc_ICRx[-1]
-                F_max = Mp / sum(Mi1)
-                
-                # compute bolt forces
-                for bolt in self.bolts:
-                    bolt.update_forces_ICR(ro_max, F_max)
-                    
-                # check equilibrium
-                sumFx = sum([b.vx_ICR[-1] for b in self.bolts])
-                sumFy = sum([b.vy_ICR[-1] for b in self.bolts])
-                fxx.append(sumFx + self.Vx)
-                fyy.append(sumFy + self.Vy)
-                residual.append(math.sqrt(fxx[-1]**2 + fyy[-1]**2))
-                if verbose:
-                    print("\t Trial {}: ({:.2f}, {:.2f}). fxx = {:.2f}, fyy = {:.2f}, residual = {:.2f}".format(N_iter+1, 
-                                                                                                                self.ICR_x[-1], 
-                                                                                                                self.ICR_y[-1], 
-                                                                                                                fxx[-1], 
-                                                                                                                fyy[-1],
-                                                                                                                residual[-1]))
-
-                # tabulate bolt forces at each step
-                result_dict=dict()
-                result_dict["bolt_tag"] = [x.tag for x in self.bolts]
-                result_dict["x"] = [b.x for b in self.bolts]
-                result_dict["y"] = [b.y for b in self.bolts]
-                result_dict["dx_ICR"] = [x.dx_ICR[-1] for x in self.bolts]
-                result_dict["dy_ICR"] = [x.dy_ICR[-1] for x in self.bolts]
-                result_dict["ro_ICR"] = [x.ro_ICR[-1] for x in self.bolts]
-                result_dict["deformation"] = [x.deformation_ICR[-1] for x in self.bolts]
-                result_dict["force"] = [x.force_ICR[-1] for x in self.bolts]
-                result_dict["moment_ICR"] = [x.moment_ICR[-1] for x in self.bolts]
-                result_dict["moment_CG"] = [x.moment_ICG[-1] for x in self.bolts]
-                result_dict["Vx"] = [x.vx_ICR[-1] for x in self.bolts]
-                result_dict["Vy"] = [x.vy_ICR[-1] for x in self.bolts]
-                df = pd.DataFrame.from_dict(result_dict)
-                sum_row = pd.DataFrame([""] * df.shape[1]).T
-                sum_row.columns = df.columns
-                sum_row["bolt_tag"] = "Total"
-                sum_row["Vx"] = sum([x.vx_ICR[-1] for x in self.bolts])
-                sum_row["Vy"] = sum([x.vy_ICR[-1] for x in self.bolts])
-                sum_row["moment_CG"] = sum([x.moment_ICG[-1] for x in self.bolts])
-                sum_row["moment_ICR"] = sum([x.moment_ICR[-1] for x in self.bolts])
-                df = pd.concat([df, sum_row], ignore_index=True)
-                df = df.set_index("bolt_tag")
-                self.ICR_table.append(df)
-                
-                # end loop if equilibrium is obtained
-                if residual[-1] < tol:
-                    if verbose:
-                        print("\t Success! ICR found at ({:.2f}, {:.2f})".format(self.ICR_x[-1], self.ICR_y[-1]))
-                    self.P_demand_ICR = self.V_resultant
-                    self.P_capacity_ICR = self.Cu[-1] * self.bolt_capacity
-                    
-                    return_dict = dict()
-                    return_dict["Bolt Force Table"] = self.ICR_table[-1]
-                    return_dict["ICR"] = (self.ICR_x[-1], self.ICR_y[-1])
-                    return_dict["Cu"] = self.Cu[-1]
-                    return_dict["Connection Demand"] = self.P_demand_ICR
-                    return_dict["Connection Capacity"] = self.P_capacity_ICR
-                    return_dict["DCR"] = self.P_demand_ICR/self.P_capacity_ICR
-                    self.residual = residual
-                    return return_dict
-                
-                # end loop if maximum number of iterations exceeded
-                N_iter +=1
-                if N_iter > max_iter:
-                    print("WARNING: COULD NOT CONVERGE") 
-                    print(f"nbolt = {self.N_bolt}\nVx = {self.Vx}\nVy = {self.Vy}\nMz = {self.torsion}\n")
-                    #raise RuntimeError("could not converge on ICR after 1000 iterations. Ending solver.")
-                    return_dict = dict()
-                    return_dict["Bolt Force Tables"] = self.ICR_table[-1]
-                    return_dict["ICR"] = (self.ICR_x[-1], self.ICR_y[-1])
-                    return_dict["Cu"] = "DID NOT CONVERGE"
-                    return_dict["Connection Demand"] = "DID NOT CONVERGE"
-                    return_dict["Connection Capacity"] = "DID NOT CONVERGE"
-                    return_dict["DCR"] = "DID NOT CONVERGE"
-                    self.residual = residual
-                    return return_dict
-                
-                # after 200 iterations, if still not converged, try with smaller step size.
-                if N_iter % 200 == 0:
-                    is_stuck = len(residual) >= 10 and all(math.isclose(r, residual[-1], abs_tol=1e-3) for r in residual[-10:])
-                    if is_stuck:
-                        stepsize_factor = stepsize_factor * 2
-                        if verbose:
-                            print("Stuck at local minimum. Adjusting step size and trying again...")
-                            print(f"step factor = {stepsize_factor}")
-         
-                
-         
+            # look up a previous solution of the same pattern and line of action. See ezbolt.cache
+            cached = cache.lookup(self, self.Vx, self.Vy, self.torsion, curve) if cache is not None else None
+            if cached is not None and verbose:
+                print("\t ICR found in cache")
+        
+        geometry = self.icr_geometry()
+        result = ezbolt.icr.solve_icr(geometry, self.Vx, self.Vy, self.torsion,
+                                      bolt_capacity = self.bolt_capacity,
+                                      ecc_method = ecc_method,
+                                      backend = backend,
+                                      sensitivities = sensitivities,
+                                      icr_guess = cached if cached is not None else icr_guess,
+                                      curve = curve,
+                                      warm_start = ezbolt.warmstart.get_warm_start(warm_start, geometry, curve))
+        hist = result.history
+        
+        # copy the final trial onto the bolts
+        columns = result._columns
+        for i, bolt in enumerate(self.bolts):
+            bolt.append_ICR(*[columns[name][i] for name in ("dx_ICR", "dy_ICR", "ro_ICR", "deformation", "force",
+                                                             "moment_ICR", "moment_CG", "Vx", "Vy")])
+        
         # possibility #3: Pure torsion. ICR is located at centroid
-        elif self.V_resultant == 0:
-            self.ICR_x = [self.x_cg]
-            self.ICR_y = [self.y_cg]
+        if self.V_resultant == 0:
+            self.ICR_x = [result.ICR_x]
+            self.ICR_y = [result.ICR_y]
+            self.Cu = [result.Cu]
             print("Special Case: Pure Torsion. ICR at ({:.2f}, {:.2f})".format(self.x_cg, self.y_cg))
-            
-            # update bolt geometry with respect to assumed ICR
-            for bolt in self.bolts:
-                bolt.update_geometry_ICR(self.ICR_x[-1], self.ICR_y[-1])
-            
-            # compute ICR coefficient at assumed ICR
-            ro_max = max([b.ro_ICR[-1] for b in self.bolts])
-            Mi1 = [b.get_moment_ICR(ro_max) for b in self.bolts]
-            Mp1 = 1
-            ICR_Cu = [abs(sum(Mi1) / Mp1)]
-            self.Cu = ICR_Cu
-            
-            # compute Fmax at specified force magnitude
-            Mp = -self.torsion
-            F_max = Mp / sum(Mi1)
-            
-            # compute bolt forces
-            for bolt in self.bolts:
-                bolt.update_forces_ICR(ro_max, F_max)
-                
-            # tabulate bolt forces
-            result_dict=dict()
-            result_dict["bolt_tag"] = [x.tag for x in self.bolts]
-            result_dict["x"] = [b.x for b in self.bolts]
-            result_dict["y"] = [b.y for b in self.bolts]
-            result_dict["dx_ICR"] = [x.dx_ICR[-1] for x in self.bolts]
-            result_dict["dy_ICR"] = [x.dy_ICR[-1] for x in self.bolts]
-            result_dict["ro_ICR"] = [x.ro_ICR[-1] for x in self.bolts]
-            result_dict["deformation"] = [x.deformation_ICR[-1] for x in self.bolts]
-            result_dict["force"] = [x.force_ICR[-1] for x in self.bolts]
-            result_dict["moment_ICR"] = [x.moment_ICR[-1] for x in self.bolts]
-            result_dict["moment_CG"] = [x.moment_ICG[-1] for x in self.bolts]
-            result_dict["Vx"] = [x.vx_ICR[-1] for x in self.bolts]
-            result_dict["Vy"] = [x.vy_ICR[-1] for x in self.bolts]
-            df = pd.DataFrame.from_dict(result_dict)
-            sum_row = pd.DataFrame([""] * df.shape[1]).T
-            sum_row.columns = df.columns
-            sum_row["bolt_tag"] = "Total"
-            sum_row["Vx"] = sum([x.vx_ICR[-1] for x in self.bolts])
-            sum_row["Vy"] = sum([x.vy_ICR[-1] for x in self.bolts])
-            sum_row["moment_CG"] = sum([x.moment_ICG[-1] for x in self.bolts])
-            sum_row["moment_ICR"] = sum([x.moment_ICR[-1] for x in self.bolts])
-            df = pd.concat([df, sum_row], ignore_index=True)
-            df = df.set_index("bolt_tag")
-            self.ICR_table.append(df)
-            
-            # gather return dict
             self.P_demand_ICR = self.torsion
             self.P_capacity_ICR = self.Cu[-1] * self.bolt_capacity
-            
-            return_dict = dict()
-            return_dict["Bolt Force Tables"] = self.ICR_table
-            return_dict["ICR"] = list(zip(self.ICR_x, self.ICR_y))
-            return_dict["Cu"] = self.Cu
-            return_dict["Connection Demand"] = self.P_demand_ICR
-            return_dict["Connection Capacity"] = self.P_capacity_ICR
-            return_dict["DCR"] = self.P_demand_ICR/self.P_capacity_ICR
-            return return_dict
-            
\ No newline at end of file
+            return result
+        
+        if cache is not None and cached is None and result.converged:
+            cache.store(self, self.Vx, self.Vy, self.torsion, result.ICR_x, result.ICR_y, curve)
+        self.ICR_x.extend(hist[0].tolist())
+        self.ICR_y.extend(hist[1].tolist())
+        self.ICR_ax.extend(hist[2].tolist())
+        self.ICR_ay.extend(hist[3].tolist())
+        self.ecc_ICRx.extend(hist[4].tolist())
+        self.ecc_ICRy.extend(hist[5].tolist())
+        self.ecc_ICR.extend([math.sqrt(ex**2 + ey**2) for ex, ey in zip(hist[4], hist[5])])
+        self.Cu.extend(hist[6].tolist())
+        self.residual = hist[9].tolist()
+        if verbose:
+            for i in range(result.n_trials):
+                print("\t Trial {}: ({:.2f}, {:.2f}). fxx = {:.2f}, fyy = {:.2f}, residual = {:.2f}".format(i+1, 
+                                                                                                            hist[0,i], 
+                                                                                                            hist[1,i], 
+                                                                                                            hist[7,i], 
+                                                                                                            hist[8,i],
+                                                                                                            hist[9,i]))
+        self.P_demand_ICR = self.V_resultant
+        
+        # end if equilibrium is obtained
+        if result.converged:
+            if verbose:
+                print("\t Success! ICR found at ({:.2f}, {:.2f})".format(self.ICR_x[-1], self.ICR_y[-1]))
+            self.P_capacity_ICR = self.Cu[-1] * self.bolt_capacity
+        
+        # end if maximum number of iterations exceeded
+        else:
+            print("WARNING: COULD NOT CONVERGE") 
+            print(f"nbolt = {self.N_bolt}\nVx = {self.Vx}\nVy = {self.Vy}\nMz = {self.torsion}\n")
+            self.P_capacity_ICR = math.nan
+        return result
+
+
+def rectangular_pattern(xo, yo, width, height, nx, ny, perimeter_only=False):
+    """
+    Return bolt coordinates [(x, y), ...] of a rectangular array of bolts.
+    See BoltGroup.add_bolts() for arguments.
+    """
+    # determine spacing
+    sx = 0 if nx==1 else width / (nx-1)
+    sy = 0 if ny==1 else height / (ny-1)
+    
+    # generate bolt coordinate
+    xcoord=[]
+    ycoord=[]
+    xcoord.append(xo)
+    ycoord.append(yo)
+    if sx != 0:
+        for i in range(nx-1):
+            xcoord.append(xcoord[-1]+sx)
+    if sy !=0:
+        for i in range(ny-1):
+            ycoord.append(ycoord[-1]+sy)
+    bolt_coord = list(itertools.product(xcoord,ycoord))
+    
+    # remove middle bolts if in perimeter mode
+    if perimeter_only:
+        x_edge0=xo
+        x_edge1=xcoord[-1]
+        y_edge0=yo
+        y_edge1=ycoord[-1]
+        bolt_coord = [e for e in bolt_coord if e[0]==x_edge0 or e[0]==x_edge1 or e[1]==y_edge0 or e[1]==y_edge1]
+    return bolt_coord
@@ -0,0 +1,377 @@
+"""
+Brandt's iterative procedure for locating the instant center of rotation (ICR).
+
+The whole trial loop (geometry update, force-deformation curve, equilibrium check) is
+written as a single function operating on plain arrays and scalars. It runs as-is in
+pure Python, or is compiled into one native function with numba when available.
+"""
+import math
+import threading
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+BACKENDS = ("python", "numba")
+
+# AISC ultimate bolt deformation (in), reached by the bolt farthest from the ICR
+D_ULT = 0.34
+
+# initial step size reduction factor: STEPSIZE_FACTORS[k] for eccentricities below STEPSIZE_ECCS[k],
+# the last factor above. See stepsize_factor()
+STEPSIZE_ECCS = (1, 5, 10)
+STEPSIZE_FACTORS = (0.5, 1, 2, 5)
+
+# bump whenever a change to the iteration changes its results. Part of the ezbolt.cache key
+SOLVER_VERSION = 1
+_compiled = {}
+_compile_lock = threading.Lock()
+
+
+def brandt_loop(x, y, hull, Vx, Vy, torsion, ecc_x, ecc_y, x_cg, y_cg, Iz, stepsize_factor, tol, max_iter, ICR0_x, ICR0_y,
+                table):
+    """
+    Iterate on ICR location until the bolt forces are in equilibrium with the applied load.
+    Arithmetic follows the original BoltGroup.solve_ICR() loop operation-for-operation.
+
+    Args:
+        x, y                    array:: bolt coordinates
+        hull                    array:: indices of bolts on the convex hull. The farthest bolt from any
+                                        ICR is always a hull vertex, so ro_max is only searched over these
+        Vx, Vy, torsion         float:: applied loads
+        ecc_x, ecc_y            float:: load eccentricity with respect to CoG
+        x_cg, y_cg, Iz          float:: bolt group centroid and polar moment of inertia
+        stepsize_factor         float:: initial step size reduction factor
+        tol                     float:: equilibrium residual tolerance
+        max_iter                int::   maximum number of iterations
+        ICR0_x, ICR0_y          float:: initial ICR guess (warm start). NaN = start from Brandt's elastic estimate
+        table                   array:: bolt load-deformation curve table (see ezbolt.curves). Empty = closed-form AISC curve
+
+    Returns:
+        n_trials                int::   number of trials performed
+        converged               bool::  whether equilibrium was obtained
+        hist                    array:: (10 x n) trial history. Rows are ICR_x, ICR_y, ax, ay,
+                                        ecc_ICRx, ecc_ICRy, Cu, fxx, fyy, residual
+    """
+    N_bolt = len(x)
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    hist = np.empty((10, max_iter + 1))
+    ro = np.empty(N_bolt)
+    shape = np.empty(N_bolt)
+    n_last = len(table) - 1
+
+    N_iter = 0
+    while True:
+        if N_iter == 0:
+            if ICR0_x == ICR0_x and ICR0_y == ICR0_y:
+                ax = x_cg - ICR0_x
+                ay = ICR0_y - y_cg
+            else:
+                ax = Vy * Iz / torsion / N_bolt
+                ay = Vx * Iz / torsion / N_bolt
+            ICR_x = x_cg - ax
+            ICR_y = y_cg + ay
+            ICR_ex = ecc_x + ax
+            ICR_ey = ecc_y - ay
+        else:
+            ax = hist[8, N_iter-1] * Iz / torsion / N_bolt / stepsize_factor
+            ay = hist[7, N_iter-1] * Iz / torsion / N_bolt / stepsize_factor
+            ICR_x = hist[0, N_iter-1] - ax
+            ICR_y = hist[1, N_iter-1] + ay
+            ICR_ex = hist[4, N_iter-1] + ax
+            ICR_ey = hist[5, N_iter-1] - ay
+
+        # update bolt geometry with respect to assumed ICR
+        for i in range(N_bolt):
+            ro[i] = ((x[i] - ICR_x)**2 + (y[i] - ICR_y)**2)**(1/2)
+        ro_max = 0.0
+        for i in hull:
+            if ro[i] > ro_max:
+                ro_max = ro[i]
+
+        # compute ICR coefficient at assumed ICR. shape = R / R_ult of every bolt
+        sum_Mi1 = 0.0
+        for i in range(N_bolt):
+            if n_last < 0:
+                deformation = ro[i] / ro_max * D_ULT
+                shape[i] = (1-math.exp(-10*deformation))**(0.55)
+            else:
+                u = ro[i] / ro_max * n_last
+                k = min(int(u), n_last - 1)
+                shape[i] = table[k] + (u - k) * (table[k+1] - table[k])
+            sum_Mi1 += shape[i] * ro[i]
+        Mp1 = -(Vx/V_resultant) * ICR_ey + (Vy/V_resultant) * ICR_ex
+        ICR_Cu = abs(sum_Mi1 / Mp1)
+
+        # compute Fmax at specified force magnitude
+        Mp = Vx * ICR_ey - Vy * ICR_ex
+        F_max = Mp / sum_Mi1
+
+        # compute bolt forces and check equilibrium
+        sumFx = 0.0
+        sumFy = 0.0
+        for i in range(N_bolt):
+            if ro[i] != 0:
+                force = shape[i] * F_max
+                sumFx += -force * (y[i] - ICR_y) / ro[i]
+                sumFy += force * (x[i] - ICR_x) / ro[i]
+        fxx = sumFx + Vx
+        fyy = sumFy + Vy
+        residual = math.sqrt(fxx**2 + fyy**2)
+
+        hist[0, N_iter] = ICR_x
+        hist[1, N_iter] = ICR_y
+        hist[2, N_iter] = ax
+        hist[3, N_iter] = ay
+        hist[4, N_iter] = ICR_ex
+        hist[5, N_iter] = ICR_ey
+        hist[6, N_iter] = ICR_Cu
+        hist[7, N_iter] = fxx
+        hist[8, N_iter] = fyy
+        hist[9, N_iter] = residual
+
+        # end loop if equilibrium is obtained
+        if residual < tol:
+            return N_iter + 1, True, hist
+
+        # end loop if maximum number of iterations exceeded
+        N_iter += 1
+        if N_iter > max_iter:
+            return N_iter, False, hist
+
+        # after 200 iterations, if still not converged, try with smaller step size.
+        if N_iter % 200 == 0 and N_iter >= 10:
+            is_stuck = True
+            for k in range(N_iter - 10, N_iter):
+                if abs(hist[9, k] - residual) > max(1e-9 * max(abs(hist[9, k]), abs(residual)), 1e-3):
+                    is_stuck = False
+            if is_stuck:
+                stepsize_factor = stepsize_factor * 2
+
+
+def brandt_batch(x, y, mask, Vx, Vy, torsion, ecc_x, ecc_y, x_cg, y_cg, Iz, stepsize_factor, tol, max_iter=1000,
+                 ICR0_x=None, ICR0_y=None, curve=None):
+    """
+    Brandt's iteration for many bolt groups at once, advanced in lockstep with NumPy. Same trial
+    arithmetic as brandt_loop(); groups that converge (or run out of iterations) drop out of the
+    active set. Bolt sums run along the first axis so they accumulate in the same order as the
+    scalar loop; results agree with brandt_loop() to within the last few bits of exp().
+
+    Args:
+        x, y                    array:: (N_max x G) bolt coordinates, one column per bolt group
+        mask                    array:: (N_max x G) True for real bolts, False for padding
+        Vx, Vy, torsion         array:: (G) applied loads
+        ecc_x, ecc_y            array:: (G) load eccentricity with respect to CoG
+        x_cg, y_cg, Iz          array:: (G) bolt group centroids and polar moments of inertia
+        stepsize_factor         array:: (G) initial step size reduction factors
+        tol                     array:: (G) equilibrium residual tolerances
+        max_iter                int::   (OPTIONAL) maximum number of iterations. Default = 1000
+        ICR0_x, ICR0_y          array:: (OPTIONAL) (G) initial ICR guesses. NaN = start from Brandt's elastic estimate
+        curve                   obj::   (OPTIONAL) LoadDeformationCurve (see ezbolt.curves). Default = closed-form AISC curve
+
+    Returns:
+        n_trials                array:: (G) number of trials performed
+        converged               array:: (G) whether equilibrium was obtained
+        ICR_x, ICR_y            array:: (G) ICR of the last trial
+        Cu                      array:: (G) ICR coefficient of the last trial
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    mask = np.asarray(mask, dtype=bool)
+    G = x.shape[1]
+    Vx, Vy, torsion, ecc_x, ecc_y, x_cg, y_cg, Iz, step, tol = [np.broadcast_to(np.asarray(v, dtype=float), (G,)).copy()
+                                                                for v in (Vx, Vy, torsion, ecc_x, ecc_y, x_cg, y_cg,
+                                                                          Iz, stepsize_factor, tol)]
+    N_bolt = mask.sum(axis=0).astype(float)
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    x = np.where(mask, x, 0.0)
+    y = np.where(mask, y, 0.0)
+
+    # initial ICR: warm start where a guess is given, otherwise Brandt's elastic estimate
+    ax = Vy * Iz / torsion / N_bolt
+    ay = Vx * Iz / torsion / N_bolt
+    if ICR0_x is not None:
+        ICR0_x = np.broadcast_to(np.asarray(ICR0_x, dtype=float), (G,))
+        ICR0_y = np.broadcast_to(np.asarray(ICR0_y, dtype=float), (G,))
+        warm = (ICR0_x == ICR0_x) & (ICR0_y == ICR0_y)
+        ax = np.where(warm, x_cg - ICR0_x, ax)
+        ay = np.where(warm, ICR0_y - y_cg, ay)
+    ICR_x = x_cg - ax
+    ICR_y = y_cg + ay
+    ICR_ex = ecc_x + ax
+    ICR_ey = ecc_y - ay
+
+    # outputs, indexed by group. active holds the group index of every column still iterating
+    out_n_trials = np.zeros(G, dtype=int)
+    out_converged = np.zeros(G, dtype=bool)
+    out_ICR_x = np.full(G, math.nan)
+    out_ICR_y = np.full(G, math.nan)
+    out_Cu = np.full(G, math.nan)
+    active = np.arange(G)
+    recent = np.empty((10, G))
+
+    N_iter = 0
+    while len(active) > 0:
+        # update bolt geometry with respect to assumed ICR. Padding gets ro = 0 and contributes nothing
+        dx = x - ICR_x
+        dy = y - ICR_y
+        ro = np.where(mask, (dx**2 + dy**2)**(1/2), 0.0)
+        ro_max = ro.max(axis=0)
+
+        # compute ICR coefficient at assumed ICR
+        if curve is None:
+            shape = (1 - np.exp(-10 * (ro / ro_max * D_ULT)))**(0.55)
+        else:
+            shape = curve.shape(ro / ro_max)
+        sum_Mi1 = np.add.reduce(shape * ro, axis=0)
+        Mp1 = -(Vx/V_resultant) * ICR_ey + (Vy/V_resultant) * ICR_ex
+        ICR_Cu = np.abs(sum_Mi1 / Mp1)
+
+        # compute Fmax at specified force magnitude
+        Mp = Vx * ICR_ey - Vy * ICR_ex
+        F_max = Mp / sum_Mi1
+
+        # compute bolt forces and check equilibrium
+        with np.errstate(divide="ignore", invalid="ignore"):
+            force = shape * F_max
+            loaded = ro != 0
+            sumFx = np.add.reduce(np.where(loaded, -force * dy / ro, 0.0), axis=0)
+            sumFy = np.add.reduce(np.where(loaded, force * dx / ro, 0.0), axis=0)
+        fxx = sumFx + Vx
+        fyy = sumFy + Vy
+        residual = np.sqrt(fxx**2 + fyy**2)
+        recent[N_iter % 10] = residual
+
+        # groups leave the active set once equilibrium is obtained or iterations are exhausted
+        converged = residual < tol
+        N_iter += 1
+        done = converged | (N_iter > max_iter)
+        if done.any():
+            finished = active[done]
+            out_n_trials[finished] = N_iter
+            out_converged[finished] = converged[done]
+            out_ICR_x[finished] = ICR_x[done]
+            out_ICR_y[finished] = ICR_y[done]
+            out_Cu[finished] = ICR_Cu[done]
+            keep = ~done
+            active = active[keep]
+            x, y, mask = x[:, keep], y[:, keep], mask[:, keep]
+            Vx, Vy, torsion, ecc_x, ecc_y, x_cg, y_cg, Iz, step, tol, V_resultant, N_bolt = [
+                v[keep] for v in (Vx, Vy, torsion, ecc_x, ecc_y, x_cg, y_cg, Iz, step, tol, V_resultant, N_bolt)]
+            ICR_x, ICR_y, ICR_ex, ICR_ey, fxx, fyy, residual = [
+                v[keep] for v in (ICR_x, ICR_y, ICR_ex, ICR_ey, fxx, fyy, residual)]
+            recent = recent[:, keep]
+
+        # after 200 iterations, if still not converged, try with smaller step size.
+        if N_iter % 200 == 0 and N_iter >= 10:
+            is_stuck = np.all(np.abs(recent - residual) <= np.maximum(1e-9 * np.maximum(np.abs(recent), np.abs(residual)),
+                                                                      1e-3), axis=0)
+            step = np.where(is_stuck, step * 2, step)
+
+        # next trial
+        ax = fyy * Iz / torsion / N_bolt / step
+        ay = fxx * Iz / torsion / N_bolt / step
+        ICR_x = ICR_x - ax
+        ICR_y = ICR_y + ay
+        ICR_ex = ICR_ex + ax
+        ICR_ey = ICR_ey - ay
+
+    return out_n_trials, out_converged, out_ICR_x, out_ICR_y, out_Cu
+
+
+def stepsize_factor(ecc):
+    """
+    Initial step size reduction factor for a given load eccentricity (a float, or an array for brandt_batch()).
+    
+    Step size (ax) is very important for convergence. In general,
+    small eccentricity -> ICR might be far away in which case you want to take large steps
+    large eccentricity -> if step is too large, may result in infinite cycles and no convergence.
+    """
+    if np.ndim(ecc) > 0:
+        return np.array(STEPSIZE_FACTORS)[np.searchsorted(STEPSIZE_ECCS, ecc, side="right")]
+    for limit, factor in zip(STEPSIZE_ECCS, STEPSIZE_FACTORS):
+        if ecc < limit:
+            return factor
+    return STEPSIZE_FACTORS[-1]
+
+
+def convex_hull(x, y):
+    """
+    Return indices of the points on the convex hull (Andrew's monotone chain). Points lying
+    along hull edges are dropped since the farthest point from any location is always a vertex.
+    
+    Args:
+        x, y            array:: point coordinates
+    
+    Returns:
+        hull            array:: indices into x and y, counter-clockwise
+    """
+    order = sorted(range(len(x)), key=lambda i: (x[i], y[i]))
+    if len(order) < 3:
+        return np.array(order, dtype=np.int64)
+    
+    def cross(o, a, b):
+        return (x[a] - x[o]) * (y[b] - y[o]) - (y[a] - y[o]) * (x[b] - x[o])
+    
+    lower = []
+    for i in order:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], i) <= 0:
+            lower.pop()
+        lower.append(i)
+    upper = []
+    for i in reversed(order):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], i) <= 0:
+            upper.pop()
+        upper.append(i)
+    hull = lower[:-1] + upper[:-1]
+    return np.array(hull, dtype=np.int64)
+
+
+def get_solver(backend="python"):
+    """
+    Return the Brandt loop for the requested backend. "numba" compiles brandt_loop() on first use
+    (once, even if several threads ask at the same time) without the GIL, and falls back to the
+    pure-Python loop if numba is not installed.
+    """
+    if backend not in BACKENDS:
+        raise RuntimeError("ERROR: backend must be one of {}".format(BACKENDS))
+    if backend == "numba" and numba is not None:
+        with _compile_lock:
+            if "numba" not in _compiled:
+                _compiled["numba"] = numba.njit(cache=True, nogil=True)(brandt_loop)
+        return _compiled["numba"]
+    return brandt_loop
+
+
+def run(x, y, Vx, Vy, torsion, ecc_x, ecc_y, x_cg, y_cg, Iz, stepsize_factor, tol=0.01, max_iter=1000, backend="python",
+        hull=None, icr_guess=None, curve=None):
+    """
+    Run Brandt's loop on the selected backend. Inputs are cast to float so the compiled loop
+    is only specialized once. If hull (convex hull bolt indices) is not given, every bolt is
+    searched for ro_max. icr_guess = (x, y) warm starts the iteration from a nearby solution.
+    curve is a LoadDeformationCurve (see ezbolt.curves). Default = closed-form AISC curve.
+
+    Returns:
+        n_trials, converged, hist (trimmed to n_trials). See brandt_loop().
+    """
+    solver = get_solver(backend)
+    if hull is None:
+        hull = range(len(x))
+    if solver is brandt_loop:
+        x = [float(v) for v in x]
+        y = [float(v) for v in y]
+        hull = [int(i) for i in hull]
+        table = [] if curve is None else curve.table.tolist()
+    else:
+        x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        hull = np.asarray(hull, dtype=np.int64)
+        table = np.empty(0) if curve is None else np.asarray(curve.table, dtype=float)
+    ICR0_x, ICR0_y = (math.nan, math.nan) if icr_guess is None else icr_guess
+    n_trials, converged, hist = solver(x, y, hull, float(Vx), float(Vy), float(torsion), float(ecc_x), float(ecc_y),
+                                       float(x_cg), float(y_cg), float(Iz), float(stepsize_factor), float(tol), int(max_iter),
+                                       float(ICR0_x), float(ICR0_y), table)
+    return n_trials, converged, hist[:, :n_trials]
@@ -0,0 +1,191 @@
+"""
+Persistent on-disk cache of ICR solutions, shared across processes and runs. Entries live in a
+single SQLite file and are keyed by
+
+    - canonical geometry (bolt coordinates relative to the centroid, rounded and sorted, see ezbolt.batch.geometry_key)
+    - normalized line of action of the load: angle in [0, 360) and eccentricity e = torsion / V >= 0
+      ((angle, -e) is the same line as (angle + 180, e) and gives the same ICR and Cu)
+    - ezbolt.brandt.SOLVER_VERSION
+    - the bolt load-deformation curve, if not the default (see ezbolt.curves)
+
+so the same connection pattern and load direction is solved from scratch only once, at any location and
+load magnitude. Only converged solutions are stored, and only their ICR (relative to the centroid). The
+equilibrium tolerance is absolute (kips) and the key ignores the load magnitude, so a stored ICR is a
+starting point: BoltGroup.solve() iterates from it to the tolerance of the current load. That takes one
+trial at the stored load magnitude and a few more at larger loads (about 6 at three times the load).
+
+The database runs in WAL mode, which allows concurrent readers alongside one writer; writers wait
+on a busy timeout. Every process (e.g. each worker of a multiprocessing pool) opens its own connection.
+Cache errors never fail a solve: a lookup that cannot be completed is treated as a miss.
+
+When the number of entries exceeds max_entries, the least recently used entries are evicted. The size is
+checked every EVICT_EVERY stores, counted in the database itself so that stores from every process (e.g.
+many short-lived pool workers) add up. Each entry takes roughly 150 bytes on disk. Lookups only read: the last-used times of hits are kept
+in memory and written in one transaction every TOUCH_BATCH hits, on the next store, or before eviction,
+so readers do not take the write lock. Times not yet written when a process exits are lost, which only
+makes eviction slightly less exact.
+"""
+import hashlib
+import math
+import os
+import sqlite3
+import time
+import ezbolt.batch
+import ezbolt.brandt
+
+
+DECIMALS = 6
+TOUCH_BATCH = 1000
+EVICT_EVERY = 1000
+_caches = dict()
+
+
+class SolveCache:
+    """
+    SQLite-backed ICR solution cache. Pass to BoltGroup.solve(cache=...) or run_batch(cache=path).
+
+    Args:
+        path                str::   SQLite file. Created if it does not exist
+        max_entries         int::   (OPTIONAL) maximum number of stored solutions. Default = 1,000,000
+        timeout             float:: (OPTIONAL) seconds to wait for a lock held by another process. Default = 30
+
+    Attributes:
+        hits (int):                     - lookups answered by this process
+        misses (int):                   - lookups not found by this process
+    """
+    def __init__(self, path, max_entries=1000000, timeout=30):
+        self.path = path
+        self.max_entries = int(max_entries)
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+        self._touched = dict()
+
+    def _connect(self):
+        # connections cannot be shared across a fork, reconnect in every process
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS icr (key TEXT PRIMARY KEY, ICR_dx REAL, ICR_dy REAL, last_used REAL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS icr_last_used ON icr (last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('stores', 0)")
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def key(self, bolt_group, Vx, Vy, torsion, curve=None):
+        """
+        Cache key of a load case on a bolt group. curve is a LoadDeformationCurve, None = default AISC curve.
+
+        Returns:
+            key                 str::   hex digest
+            x_cg, y_cg          float:: centroid the stored ICR is relative to
+        """
+        geometry = bolt_group.get_geometry()
+        geometry_key, x_cg, y_cg = ezbolt.batch.geometry_key(list(zip(geometry["x"], geometry["y"])), DECIMALS)
+        V_resultant = (Vx**2 + Vy**2)**(1/2)
+        angle = math.degrees(math.atan2(Vy, Vx))
+        ecc = torsion / V_resultant
+        if ecc < 0:
+            angle, ecc = angle + 180, -ecc
+        angle = round(angle % 360, DECIMALS) % 360 + 0.0
+        ecc = round(ecc, DECIMALS) + 0.0
+        text = repr((ezbolt.brandt.SOLVER_VERSION, geometry_key, angle, ecc))
+        if curve is not None:
+            text += curve.key
+        return hashlib.sha1(text.encode()).hexdigest(), x_cg, y_cg
+
+    def lookup(self, bolt_group, Vx, Vy, torsion, curve=None):
+        """
+        Return the stored ICR (ICR_x, ICR_y), or None if not found.
+        """
+        key, x_cg, y_cg = self.key(bolt_group, Vx, Vy, torsion, curve)
+        try:
+            conn = self._connect()
+            row = conn.execute("SELECT ICR_dx, ICR_dy FROM icr WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched[key] = time.time()
+        if len(self._touched) >= TOUCH_BATCH:
+            self.flush()
+        return x_cg + row[0], y_cg + row[1]
+
+    def store(self, bolt_group, Vx, Vy, torsion, ICR_x, ICR_y, curve=None):
+        """
+        Store the ICR of a converged solution. Every EVICT_EVERY stores (from any process), evicts least
+        recently used entries if the cache is full.
+        """
+        key, x_cg, y_cg = self.key(bolt_group, Vx, Vy, torsion, curve)
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute("INSERT OR REPLACE INTO icr (key, ICR_dx, ICR_dy, last_used) VALUES (?, ?, ?, ?)",
+                             (key, ICR_x - x_cg, ICR_y - y_cg, time.time()))
+                conn.execute("UPDATE meta SET value = value + 1 WHERE name = 'stores'")
+                n_stores = conn.execute("SELECT value FROM meta WHERE name = 'stores'").fetchone()[0]
+            self._touched.pop(key, None)
+            self.flush()
+            if n_stores % EVICT_EVERY == 0:
+                self.evict()
+        except sqlite3.Error:
+            pass
+
+    def flush(self):
+        """
+        Write the last-used times of pending lookup hits, in one transaction.
+        """
+        if not self._touched:
+            return
+        touched = [(t, key) for key, t in self._touched.items()]
+        self._touched.clear()
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN")
+                conn.executemany("UPDATE icr SET last_used = max(last_used, ?) WHERE key = ?", touched)
+        except sqlite3.Error:
+            pass
+
+    def evict(self):
+        """
+        Delete least recently used entries down to 90% of max_entries if the cache is full.
+        """
+        self.flush()
+        conn = self._connect()
+        n = conn.execute("SELECT COUNT(*) FROM icr").fetchone()[0]
+        if n > self.max_entries:
+            n_delete = n - int(0.9 * self.max_entries)
+            conn.execute("DELETE FROM icr WHERE key IN (SELECT key FROM icr ORDER BY last_used LIMIT ?)", (n_delete,))
+
+    def clear(self):
+        """
+        Delete all entries.
+        """
+        self._touched.clear()
+        self._connect().execute("DELETE FROM icr")
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM icr").fetchone()[0]
+
+    def __repr__(self):
+        return "SolveCache(path={!r}, entries={}, hits={}, misses={})".format(self.path, len(self), self.hits, self.misses)
+
+
+def get_cache(cache):
+    """
+    Return a SolveCache. cache may be a SolveCache, a path (one shared instance per path and process), or None.
+    """
+    if cache is None or isinstance(cache, SolveCache):
+        return cache
+    if cache not in _caches:
+        _caches[cache] = SolveCache(cache)
+    return _caches[cache]
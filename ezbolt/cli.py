@@ -0,0 +1,86 @@
+"""
+Command line interface.
+
+    ezbolt batch schedule.csv -o results.parquet
+    ezbolt batch schedule.csv -o results.csv --curve bolt_tests.csv
+    ezbolt report schedule.csv -o reports/ --format png
+"""
+import argparse
+import pandas as pd
+import ezbolt.batch
+import ezbolt.curves
+import ezbolt.report
+
+
+def read_curve(value):
+    """
+    Bolt load-deformation curve from the command line: a name in ezbolt.curves.CURVES or a csv of
+    measured points with columns deformation, force (see ezbolt.curves.from_test_data()).
+    """
+    if value in ezbolt.curves.CURVES:
+        return ezbolt.curves.CURVES[value]
+    df = pd.read_csv(value)
+    if "deformation" not in df.columns or "force" not in df.columns:
+        raise RuntimeError("ERROR: curve csv must have columns deformation, force")
+    return ezbolt.curves.from_test_data(df["deformation"], df["force"], name=value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ezbolt", description="ezbolt - bolt force calculations in python")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser("batch", help="solve a connection schedule csv")
+    batch.add_argument("schedule", help="input schedule csv (one row per bolt pattern + load combination)")
+    batch.add_argument("-o", "--output", required=True, help="output file (.csv or .parquet)")
+    batch.add_argument("--failed", default=None, help="side file for failed or non-converged rows. Default = <output>.failed.csv")
+    batch.add_argument("--chunksize", type=int, default=1000, help="rows read and solved at a time. Default = 1000")
+    batch.add_argument("-j", "--processes", type=int, default=None, help="number of worker processes. Default = all cores")
+    batch.add_argument("--backend", default="python", choices=["python", "numba"], help="ICR solver backend. Default = python")
+    batch.add_argument("--screen", type=float, default=None, help="skip ICR for rows with elastic DCR below this value (e.g. 0.8)")
+    batch.add_argument("--cache", default=None, help="persistent solve cache file (SQLite), reused across runs")
+    batch.add_argument("--warm-start", action="store_true", help="start each ICR search from the nearest solved load case of the same pattern")
+    batch.add_argument("--curve", default=None, help="bolt load-deformation curve: {} or a csv with columns deformation, force. Default = AISC (closed form)".format(", ".join(ezbolt.curves.CURVES)))
+    batch.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+
+    report = subparsers.add_parser("report", help="render calculation plots for every connection of a schedule csv")
+    report.add_argument("schedule", help="input schedule csv (one row per bolt pattern + load combination)")
+    report.add_argument("-o", "--output", required=True, help="output folder. An index.csv is written alongside the plots")
+    report.add_argument("--format", default="pdf", choices=list(ezbolt.report.FORMATS), help="pdf (one file per connection), png or svg (one file per plot). Default = pdf")
+    report.add_argument("--plots", nargs="+", default=list(ezbolt.report.PLOTS), choices=list(ezbolt.report.PLOTS), help="plots to render. Default = all")
+    report.add_argument("--dpi", type=int, default=100, help="resolution. Default = 100")
+    report.add_argument("--chunksize", type=int, default=1000, help="rows read at a time. Default = 1000")
+    report.add_argument("-j", "--processes", type=int, default=None, help="number of worker processes. Default = all cores")
+    report.add_argument("--backend", default="python", choices=["python", "numba"], help="ICR solver backend. Default = python")
+    report.add_argument("-q", "--quiet", action="store_true", help="do not print progress")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        n_solved, n_failed = ezbolt.batch.run_batch(input_path = args.schedule,
+                                                    output_path = args.output,
+                                                    failed_path = args.failed,
+                                                    chunksize = args.chunksize,
+                                                    processes = args.processes,
+                                                    backend = args.backend,
+                                                    verbose = not args.quiet,
+                                                    screen = args.screen,
+                                                    cache = args.cache,
+                                                    warm_start = args.warm_start,
+                                                    curve = read_curve(args.curve) if args.curve is not None else None)
+        print("Done! {:,} rows solved, {:,} rows failed.".format(n_solved, n_failed))
+        return 1 if n_failed else 0
+    if args.command == "report":
+        n_rendered, n_failed = ezbolt.report.generate_reports(input_path = args.schedule,
+                                                              output_dir = args.output,
+                                                              plots = args.plots,
+                                                              fmt = args.format,
+                                                              processes = args.processes,
+                                                              chunksize = args.chunksize,
+                                                              dpi = args.dpi,
+                                                              backend = args.backend,
+                                                              verbose = not args.quiet)
+        print("Done! {:,} connections rendered, {:,} failed (see index.csv).".format(n_rendered, n_failed))
+        return 1 if n_failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+"""
+Convergence map of Brandt's iteration. Sweeps bolt patterns, load angles and eccentricities with
+cold solves, records the number of trials and whether each case converged, and collects slow or
+failing cases into a regression corpus.
+
+Every case is solved exactly as BoltGroup.solve() would solve a load of magnitude P at that angle
+and eccentricity (same load placement, equilibrium tolerance of 0.01 kips), so the trial counts are
+the ones solve() sees. Angles are in degrees counterclockwise from +x (270 = downward) and ecc is the
+perpendicular eccentricity torsion / V about the centroid.
+
+The corpus is a schedule csv (explicit "bolts" coordinates, Vx, Vy, torsion; see ezbolt.batch) with
+the recorded n_trials, converged and Cu, so it can be replayed with replay_corpus() after a solver
+change or run through `ezbolt batch`. Saving to an existing corpus appends new cases.
+"""
+import math
+import os
+import numpy as np
+import pandas as pd
+import ezbolt.batch
+import ezbolt.boltgroup
+import ezbolt.brandt
+import ezbolt.cutable
+import ezbolt.surrogate
+
+
+CORPUS_COLUMNS = ["id", "bolts", "Vx", "Vy", "torsion", "n_trials", "converged", "Cu", "solver_version"]
+
+
+class ConvergenceMap:
+    """
+    Result of convergence_map().
+
+    Attributes:
+        labels (list):                  - pattern labels
+        coordinates (list):             - [(x, y), ...] bolt coordinates of every pattern
+        angles (array):                 - load angles in degrees
+        eccs (array):                   - eccentricities
+        n_trials (array):               - (n_pattern x n_angle x n_ecc) Brandt trials per case
+        converged (array):              - (n_pattern x n_angle x n_ecc) convergence status
+        Cu (array):                     - (n_pattern x n_angle x n_ecc) ICR coefficient. NaN if not converged
+        P (float):                      - load magnitude of every case
+        slow_trials (int):              - converged cases with at least this many trials count as slow
+    """
+    def __init__(self, labels, coordinates, angles, eccs, n_trials, converged, Cu, P, slow_trials):
+        self.labels = labels
+        self.coordinates = coordinates
+        self.angles = np.asarray(angles, dtype=float)
+        self.eccs = np.asarray(eccs, dtype=float)
+        self.n_trials = n_trials
+        self.converged = converged
+        self.Cu = Cu
+        self.P = P
+        self.slow_trials = slow_trials
+
+    @property
+    def hard(self):
+        """
+        (n_pattern x n_angle x n_ecc) True for slow or non-converged cases.
+        """
+        return ~self.converged | (self.n_trials >= self.slow_trials)
+
+    @property
+    def table(self):
+        """
+        One row per case: pattern, angle, ecc, n_trials, converged, Cu.
+        """
+        i_pattern, i_angle, i_ecc = np.indices(self.n_trials.shape).reshape(3, -1)
+        return pd.DataFrame({"pattern": np.asarray(self.labels, dtype=object)[i_pattern],
+                             "angle": self.angles[i_angle],
+                             "ecc": self.eccs[i_ecc],
+                             "n_trials": self.n_trials.ravel(),
+                             "converged": self.converged.ravel(),
+                             "Cu": self.Cu.ravel()})
+
+    @property
+    def summary(self):
+        """
+        Per-pattern statistics: number of cases, non-converged and slow cases, mean and max trials, total trials.
+        """
+        axes = (1, 2)
+        return pd.DataFrame({"n_cases": np.full(len(self.labels), self.n_trials[0].size),
+                             "n_not_converged": (~self.converged).sum(axis=axes),
+                             "n_slow": (self.converged & (self.n_trials >= self.slow_trials)).sum(axis=axes),
+                             "mean_trials": self.n_trials.mean(axis=axes),
+                             "max_trials": self.n_trials.max(axis=axes),
+                             "total_trials": self.n_trials.sum(axis=axes)},
+                            index=pd.Index(self.labels, name="pattern"))
+
+    def corpus(self):
+        """
+        Slow and non-converged cases as corpus rows (see CORPUS_COLUMNS), most trials first.
+        """
+        rows = []
+        for k, i, j in zip(*np.nonzero(self.hard)):
+            angle, ecc = self.angles[i], self.eccs[j]
+            rows.append({"id": "{}|{:g}|{:g}".format(self.labels[k], angle, ecc),
+                         "bolts": "; ".join("{!r} {!r}".format(x, y) for x, y in self.coordinates[k]),
+                         "Vx": self.P * math.cos(math.radians(angle)),
+                         "Vy": self.P * math.sin(math.radians(angle)),
+                         "torsion": self.P * ecc,
+                         "n_trials": int(self.n_trials[k, i, j]),
+                         "converged": bool(self.converged[k, i, j]),
+                         "Cu": self.Cu[k, i, j],
+                         "solver_version": ezbolt.brandt.SOLVER_VERSION})
+        df = pd.DataFrame(rows, columns=CORPUS_COLUMNS)
+        return df.sort_values("n_trials", ascending=False, kind="stable", ignore_index=True)
+
+    def save_corpus(self, path):
+        """
+        Append slow and non-converged cases to a corpus csv. A case already in the file is replaced.
+
+        Returns:
+            n_cases                 int:: number of cases in the corpus after saving
+        """
+        df = self.corpus()
+        if os.path.exists(path):
+            df = pd.concat([pd.read_csv(path, float_precision="round_trip"), df], ignore_index=True)
+            df = df.drop_duplicates(subset=["bolts", "Vx", "Vy", "torsion"], keep="last", ignore_index=True)
+        df.to_csv(path, index=False)
+        return len(df)
+
+    def __repr__(self):
+        return "ConvergenceMap({} patterns x {} angles x {} eccentricities, {} not converged, {} slow, {} trials)".format(
+            len(self.labels), len(self.angles), len(self.eccs), int((~self.converged).sum()),
+            int((self.converged & (self.n_trials >= self.slow_trials)).sum()), int(self.n_trials.sum()))
+
+
+def _pattern(pattern):
+    """
+    Return (label, BoltGroup) for a BoltGroup or an (n_col, n_row) rectangular pattern at 3 in spacing.
+    """
+    if isinstance(pattern, ezbolt.boltgroup.BoltGroup):
+        return None, pattern
+    n_col, n_row = pattern
+    return "{}x{}".format(n_col, n_row), ezbolt.cutable.rectangular_group(n_col, n_row)
+
+
+def convergence_map(patterns, angles, eccs, P=100, slow_trials=100, corpus=None, backend="python",
+                    progress=None, curve=None):
+    """
+    Sweep patterns, load angles and eccentricities and record Brandt's trial count and convergence.
+
+    Args:
+        patterns                list:: BoltGroup objects or (n_col, n_row) rectangular patterns (3 in spacing).
+                                       A dict {label: pattern} sets the labels
+        angles                  list:: load angles in degrees, counterclockwise from +x
+        eccs                    list:: perpendicular eccentricities (torsion / V). 0 is concentric (no iteration)
+        P                       float:: (OPTIONAL) load magnitude. Sets the equilibrium tolerance (0.01 kips) relative
+                                        to the load, as in solve(). Default = 100 kips
+        slow_trials             int::  (OPTIONAL) converged cases with at least this many trials are slow. Default = 100
+        corpus                  str::  (OPTIONAL) corpus csv. Slow and non-converged cases are appended to it
+        backend                 str::  (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+        progress                func:: (OPTIONAL) progress wrapper called as progress(iterable, total=n), e.g. tqdm
+        curve                   obj::  (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+
+    Returns:
+        result                  ConvergenceMap:: .table, .summary, .corpus(). See ezbolt.plotter.plot_convergence_map()
+    """
+    if isinstance(patterns, dict):
+        labels, groups = list(patterns.keys()), [_pattern(p)[1] for p in patterns.values()]
+    else:
+        labels, groups = zip(*[_pattern(p) for p in patterns])
+        labels = [label if label is not None else "group {}".format(k) for k, label in enumerate(labels)]
+    shape = (len(groups), len(angles), len(eccs))
+    n_trials = np.zeros(shape, dtype=int)
+    converged = np.ones(shape, dtype=bool)
+    Cu = np.full(shape, math.nan)
+    coordinates = []
+    for g in groups:
+        geometry = g.get_geometry()
+        coordinates.append(list(zip(geometry["x"].tolist(), geometry["y"].tolist())))
+
+    cases = list(np.ndindex(*shape))
+    progress = progress or (lambda iterable, total: iterable)
+    for k, i, j in progress(cases, total=len(cases)):
+        Vx = P * math.cos(math.radians(angles[i]))
+        Vy = P * math.sin(math.radians(angles[i]))
+        Cu[k, i, j], n_trials[k, i, j], converged[k, i, j] = _solve_case(groups[k], Vx, Vy, P * eccs[j], backend, curve)
+
+    result = ConvergenceMap(list(labels), coordinates, angles, eccs, n_trials, converged, Cu, P, slow_trials)
+    if corpus is not None:
+        result.save_corpus(corpus)
+    return result
+
+
+def _solve_case(bolt_group, Vx, Vy, torsion, backend="python", curve=None):
+    """
+    Cold solve of one case with solve()'s load placement and tolerance. Returns (Cu, n_trials, converged).
+    """
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    Cu, _, n_trials = ezbolt.surrogate.solve_Cu(bolt_group, Vx, Vy, torsion,
+                                                tol = 0.01 / V_resultant,
+                                                backend = backend,
+                                                curve = curve)
+    return Cu, n_trials, not math.isnan(Cu)
+
+
+def replay_corpus(path, backend="python", curve=None):
+    """
+    Re-solve every case of a corpus csv with the current solver and compare with the recorded run.
+    Pass the curve the corpus was recorded with.
+
+    Returns:
+        df                      DataFrame:: indexed by case id with columns n_trials_before, n_trials,
+                                            converged_before, converged, Cu_before, Cu
+    """
+    corpus = pd.read_csv(path, float_precision="round_trip")
+    rows = []
+    for record in corpus.to_dict("records"):
+        bolt_group = ezbolt.boltgroup.BoltGroup()
+        for x, y in ezbolt.batch.record_coordinates(record):
+            bolt_group.add_bolt_single(x, y)
+        Cu, n_trials, converged = _solve_case(bolt_group, record["Vx"], record["Vy"], record["torsion"], backend, curve)
+        rows.append({"id": record["id"],
+                     "n_trials_before": record["n_trials"],
+                     "n_trials": n_trials,
+                     "converged_before": bool(record["converged"]),
+                     "converged": bool(converged),
+                     "Cu_before": record["Cu"],
+                     "Cu": Cu})
+    return pd.DataFrame(rows, columns=["id", "n_trials_before", "n_trials", "converged_before", "converged",
+                                       "Cu_before", "Cu"]).set_index("id")
@@ -0,0 +1,418 @@
+"""
+Tabulated C coefficients for rectangular bolt patterns, following the AISC table convention:
+load angle in degrees from vertical (0 = vertical downward) and horizontal eccentricity
+ex = Mz / Vy.
+
+Tables are rectilinear per bolt pattern but need not be uniform. The adaptive generator only
+refines the degree and eccentricity axes where linear interpolation between grid lines misses
+Cu by more than a tolerance, which concentrates solves at small eccentricity where Cu changes
+sharply and leaves the flat regions coarse. CuTable interpolates either kind of table.
+"""
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+import ezbolt.boltgroup
+import ezbolt.curves
+import ezbolt.surrogate
+
+
+TABLE_COLUMNS = ["columns", "rows", "eccentricity", "degree", "Ce", "Cu"]
+
+# maximum number of load cases per lockstep batch in Cu_grid(batched=True)
+BATCH_SIZE = 20000
+
+
+def rectangular_group(n_col, n_row, col_spacing=3, row_spacing=3):
+    """
+    Return a BoltGroup with n_col columns and n_row rows of bolts.
+    """
+    bolt_group = ezbolt.boltgroup.BoltGroup()
+    bolt_group.add_bolts(xo = 0,
+                         yo = 0,
+                         width = (n_col-1) * col_spacing,
+                         height = (n_row-1) * row_spacing,
+                         nx = n_col,
+                         ny = n_row)
+    return bolt_group
+
+
+def solve_Cu_AISC(bolt_group, degree, ecc, icr_guess=None, tol=0.01, backend="python", curve=None):
+    """
+    Cu for a unit load at degree from vertical (Vx = -sin, Vy = -cos) with horizontal eccentricity ecc.
+    See ezbolt.surrogate.solve_Cu() for arguments and return values.
+    """
+    Vx = -math.sin(degree * math.pi / 180)
+    Vy = -math.cos(degree * math.pi / 180)
+    return ezbolt.surrogate.solve_Cu(bolt_group, Vx, Vy, Vy * ecc, icr_guess, tol, backend, curve)
+
+
+def Ce_grid(bolt_groups, degrees, eccs):
+    """
+    Elastic center of rotation coefficient Ce for every combination of bolt group, eccentricity and
+    load angle in one vectorized pass. Same closed form as BoltGroup.solve_ECR() with a unit load at
+    degree from vertical (Vx = -sin, Vy = -cos) and torsion = Vy * ecc. Bolt groups of different sizes
+    are padded to a common length by repeating their first bolt, which leaves the farthest bolt unchanged.
+
+    Args:
+        bolt_groups             list:: BoltGroup objects
+        degrees                 list:: load angles from vertical
+        eccs                    list:: horizontal eccentricities
+
+    Returns:
+        Ce                      array:: (n_group x n_ecc x n_degree). NaN where torsion = 0 (ECR not applicable)
+    """
+    N_max = max([g.N_bolt for g in bolt_groups])
+    x = np.empty((len(bolt_groups), N_max))
+    y = np.empty((len(bolt_groups), N_max))
+    for k, g in enumerate(bolt_groups):
+        geometry = g.get_geometry()
+        x[k, :g.N_bolt] = geometry["x"]
+        y[k, :g.N_bolt] = geometry["y"]
+        x[k, g.N_bolt:] = geometry["x"][0]
+        y[k, g.N_bolt:] = geometry["y"][0]
+    x_cg = np.array([g.x_cg for g in bolt_groups])[:, None, None]
+    y_cg = np.array([g.y_cg for g in bolt_groups])[:, None, None]
+    Iz = np.array([g.Iz for g in bolt_groups])[:, None, None]
+    N_bolt = np.array([g.N_bolt for g in bolt_groups])[:, None, None]
+
+    # unit load and AISC eccentricity (ey = 0 unless the load is horizontal)
+    degrees = np.radians(np.asarray(degrees, dtype=float))[None, None, :]
+    eccs = np.asarray(eccs, dtype=float)[None, :, None]
+    Vx = -np.sin(degrees)
+    Vy = -np.cos(degrees)
+    torsion = Vy * eccs
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ecc_x = np.where(Vy != 0, torsion / Vy, 0.0)
+        ecc_y = np.where(Vy != 0, 0.0, -torsion / Vx)
+
+        # location of ECR and eccentricity with respect to ECR
+        ECR_ax = Vy * Iz / torsion / N_bolt
+        ECR_ay = Vx * Iz / torsion / N_bolt
+        ECR_x = x_cg - ECR_ax
+        ECR_y = y_cg + ECR_ay
+        ecc_ECRx = ecc_x + ECR_ax
+        ecc_ECRy = ecc_y - ECR_ay
+
+        # farthest bolt from ECR, and sum of squared distances (parallel axis theorem)
+        dmax = np.max(np.sqrt((x[:, None, None, :] - ECR_x[..., None])**2 +
+                              (y[:, None, None, :] - ECR_y[..., None])**2), axis=-1)
+        sumdsquared = Iz + N_bolt * (ECR_ax**2 + ECR_ay**2)
+        Mp = -Vx * ecc_ECRy + Vy * ecc_ECRx
+        Ce = np.abs(sumdsquared / (Mp * dmax))
+    return np.where(torsion == 0, np.nan, Ce)
+
+
+def Ce_table(n_cols, n_rows, degrees, eccs, col_spacing=3, row_spacing=3):
+    """
+    Ce table rows for every rectangular pattern (n_cols x n_rows), eccentricity and degree. No ICR solves.
+
+    Returns:
+        df                      DataFrame:: columns "columns", "rows", "eccentricity", "degree", "Ce"
+    """
+    patterns = [(n_col, n_row) for n_col in n_cols for n_row in n_rows]
+    bolt_groups = [rectangular_group(n_col, n_row, col_spacing, row_spacing) for n_col, n_row in patterns]
+    Ce = Ce_grid(bolt_groups, degrees, eccs)
+    index = pd.MultiIndex.from_product([range(len(patterns)), eccs, degrees], names=["pattern", "eccentricity", "degree"])
+    df = pd.DataFrame({"Ce": Ce.ravel()}, index=index).reset_index()
+    df.insert(0, "columns", [patterns[k][0] for k in df["pattern"]])
+    df.insert(1, "rows", [patterns[k][1] for k in df["pattern"]])
+    return df.drop(columns="pattern")
+
+
+# per-process state of Cu_grid() workers: the result buffer and the grid definition
+_worker = dict()
+
+
+def _init_Cu_worker(shm_name, shape, patterns, degrees, eccs, col_spacing, row_spacing, backend, curve, Cu=None):
+    """
+    Attach a worker to the shared result buffer (or use Cu directly when running serially).
+    """
+    if shm_name is not None:
+        shm = shared_memory.SharedMemory(name=shm_name)
+        Cu = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        _worker["shm"] = shm
+    _worker.update(Cu = Cu,
+                   patterns = patterns,
+                   degrees = degrees,
+                   eccs = eccs,
+                   spacing = (col_spacing, row_spacing),
+                   backend = backend,
+                   curve = curve,
+                   groups = dict())
+
+
+def _Cu_task(case):
+    """
+    Solve every degree of one (pattern, eccentricity) case and write Cu into the result buffer. Returns nothing.
+    """
+    i_pattern, i_ecc = divmod(case, len(_worker["eccs"]))
+    groups = _worker["groups"]
+    if i_pattern not in groups:
+        groups.clear()
+        groups[i_pattern] = rectangular_group(*_worker["patterns"][i_pattern], *_worker["spacing"])
+    bolt_group = groups[i_pattern]
+    ecc = _worker["eccs"][i_ecc]
+    for i_degree, degree in enumerate(_worker["degrees"]):
+        Cu, _, _ = solve_Cu_AISC(bolt_group, degree, ecc, backend=_worker["backend"], curve=_worker["curve"])
+        _worker["Cu"][i_pattern, i_ecc, i_degree] = Cu
+
+
+def _Cu_batch_task(i_patterns):
+    """
+    Solve every (eccentricity, degree) case of the given patterns as one lockstep batch and write Cu into
+    the result buffer. Returns nothing.
+    """
+    i_patterns = list(i_patterns)
+    groups = [rectangular_group(*_worker["patterns"][k], *_worker["spacing"]) for k in i_patterns]
+    geometry = [g.get_geometry() for g in groups]
+    x, y, mask = ezbolt.surrogate.pad_coordinates([(q["x"], q["y"]) for q in geometry])
+    shape = (len(i_patterns), len(_worker["eccs"]), len(_worker["degrees"]))
+    k, i_ecc, i_degree = np.indices(shape).reshape(3, -1)
+    radians = np.radians(np.asarray(_worker["degrees"], dtype=float))[i_degree]
+    Vx = -np.sin(radians)
+    Vy = -np.cos(radians)
+    properties = np.array([(g.x_cg, g.y_cg, g.Iz) for g in groups])[k]
+    Cu, _, _ = ezbolt.surrogate.solve_Cu_batch(x[k], y[k], Vx, Vy, Vy * np.asarray(_worker["eccs"], dtype=float)[i_ecc],
+                                               mask = mask[k],
+                                               x_cg = properties[:, 0],
+                                               y_cg = properties[:, 1],
+                                               Iz = properties[:, 2],
+                                               curve = _worker["curve"])
+    _worker["Cu"][i_patterns] = Cu.reshape(shape)
+
+
+def Cu_grid(n_cols, n_rows, degrees, eccs, col_spacing=3, row_spacing=3, processes=1, backend="python", progress=None,
+            batched=False, curve=None):
+    """
+    Cu for every rectangular pattern (n_cols x n_rows), eccentricity and degree. Same layout as Ce_grid().
+
+    One task solves every degree of one (pattern, eccentricity) case. With processes > 1, workers write
+    straight into a preallocated multiprocessing.shared_memory buffer indexed by case and return nothing,
+    so no results are pickled. The parent copies the buffer out once before releasing it.
+
+    With batched = True, cases are solved in lockstep with ezbolt.surrogate.solve_Cu_batch() instead:
+    serially as padded batches of several patterns, or in parallel with one batch per pattern.
+
+    Args:
+        n_cols, n_rows          list:: number of columns and rows of the patterns (every combination)
+        degrees                 list:: load angles from vertical
+        eccs                    list:: horizontal eccentricities
+        processes               int::  (OPTIONAL) worker processes. None = cpu_count(). Default = 1 (serial)
+        backend                 str::  (OPTIONAL) see ezbolt.brandt.BACKENDS. Default = "python"
+        progress                func:: (OPTIONAL) progress wrapper called as progress(iterable, total=n), e.g. tqdm
+        batched                 bool:: (OPTIONAL) solve in lockstep batches. backend is not used. Default = False
+        curve                   obj::  (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+
+    Returns:
+        Cu                      array:: (n_pattern x n_ecc x n_degree). NaN where the solver did not converge
+    """
+    patterns = [(n_col, n_row) for n_col in n_cols for n_row in n_rows]
+    shape = (len(patterns), len(eccs), len(degrees))
+    processes = processes or multiprocessing.cpu_count()
+    if batched:
+        task = _Cu_batch_task
+        # serially, patterns are batched together up to BATCH_SIZE cases to bound memory
+        n_batch = max(1, BATCH_SIZE // (shape[1] * shape[2])) if processes == 1 else 1
+        cases = [range(k, min(k + n_batch, len(patterns))) for k in range(0, len(patterns), n_batch)]
+    else:
+        task = _Cu_task
+        cases = range(shape[0] * shape[1])
+    n_cases = len(cases)
+    initargs = (patterns, list(degrees), list(eccs), col_spacing, row_spacing, backend, ezbolt.curves.get_curve(curve))
+    progress = progress or (lambda iterable, total: iterable)
+
+    if processes == 1:
+        Cu = np.full(shape, np.nan)
+        _init_Cu_worker(None, shape, *initargs, Cu=Cu)
+        try:
+            for _ in progress(map(task, cases), total=n_cases):
+                pass
+        finally:
+            _worker.clear()
+        return Cu
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, int(np.prod(shape))) * 8)
+    try:
+        Cu_shared = np.ndarray(shape, dtype=float, buffer=shm.buf)
+        Cu_shared[:] = np.nan
+        with multiprocessing.Pool(processes, _init_Cu_worker, (shm.name, shape) + initargs) as pool:
+            for _ in progress(pool.imap_unordered(task, cases), total=n_cases):
+                pass
+        Cu = Cu_shared.copy()
+        del Cu_shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return Cu
+
+
+def grid_table(n_cols, n_rows, degrees, eccs, Ce, Cu):
+    """
+    Table rows (see TABLE_COLUMNS) from Ce and Cu grids of shape (n_pattern x n_ecc x n_degree),
+    as returned by Ce_grid() and Cu_grid().
+
+    Returns:
+        df                      DataFrame:: columns TABLE_COLUMNS
+    """
+    patterns = np.array([(n_col, n_row) for n_col in n_cols for n_row in n_rows])
+    i_pattern, i_ecc, i_degree = np.indices(Cu.shape).reshape(3, -1)
+    return pd.DataFrame({"columns": patterns[i_pattern, 0],
+                         "rows": patterns[i_pattern, 1],
+                         "eccentricity": np.asarray(eccs)[i_ecc],
+                         "degree": np.asarray(degrees)[i_degree],
+                         "Ce": Ce.ravel(),
+                         "Cu": Cu.ravel()}, columns=TABLE_COLUMNS)
+
+
+def adaptive_grid(bolt_group, degree_range=(0, 75), ecc_range=(1, 36), tol=0.01, n_initial=5,
+                  min_degree_step=1, min_ecc_step=0.25, solve_tol=1e-3, backend="python"):
+    """
+    Build a nonuniform (degree x eccentricity) grid of Cu for one bolt group by adaptive refinement.
+
+    Both axes start with n_initial evenly spaced lines. Every interval between two grid lines is tested
+    by solving the line through its midpoint, which is then added to the grid since its solves are already
+    paid for. If linear interpolation missed the midpoint Cu by more than tol (relative) anywhere along the
+    line, both halves are tested in turn. Intervals are not split below min_degree_step / min_ecc_step.
+
+    Args:
+        bolt_group              BoltGroup:: bolt group
+        degree_range            tuple:: (OPTIONAL) (min, max) load angle from vertical. Default = (0, 75)
+        ecc_range               tuple:: (OPTIONAL) (min, max) horizontal eccentricity. Default = (1, 36)
+        tol                     float:: (OPTIONAL) relative interpolation tolerance on Cu. Default = 0.01
+        n_initial               int::   (OPTIONAL) initial number of lines along each axis. Default = 5
+        min_degree_step         float:: (OPTIONAL) smallest degree spacing. Default = 1
+        min_ecc_step            float:: (OPTIONAL) smallest eccentricity spacing. Default = 0.25
+        solve_tol               float:: (OPTIONAL) equilibrium tolerance of each solve as a fraction of the load.
+                                        Should be well below tol. Default = 1e-3
+        backend                 str::   (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+
+    Returns:
+        degrees                 array:: sorted grid degrees
+        eccs                    array:: sorted grid eccentricities
+        Cu                      array:: (n_degree x n_ecc) Cu. NaN where the solver did not converge
+        n_solves                int::   number of Cu solves (= number of grid points)
+    """
+    solved = dict()
+
+    def evaluate(degree, ecc):
+        if (degree, ecc) not in solved:
+            solved[(degree, ecc)] = solve_Cu_AISC(bolt_group, degree, ecc, tol=solve_tol, backend=backend)[0]
+        return solved[(degree, ecc)]
+
+    def midpoint_error(line, neighbors):
+        # relative error of linear interpolation at the midpoint line. NaN points are ignored
+        errors = [abs(c_mid - (c0 + c1) / 2) / abs(c_mid) for c_mid, c0, c1 in zip(line, *neighbors)]
+        errors = [e for e in errors if e == e]
+        return max(errors) if errors else 0.0
+
+    degrees = sorted(set(np.linspace(degree_range[0], degree_range[1], n_initial).tolist()))
+    eccs = sorted(set(np.linspace(ecc_range[0], ecc_range[1], n_initial).tolist()))
+    for d in degrees:
+        for e in eccs:
+            evaluate(d, e)
+
+    pending_degree = list(zip(degrees[:-1], degrees[1:]))
+    pending_ecc = list(zip(eccs[:-1], eccs[1:]))
+    while pending_degree or pending_ecc:
+        # test eccentricity intervals against every current degree line
+        tested = pending_ecc
+        pending_ecc = []
+        for e0, e1 in tested:
+            if e1 - e0 < 2 * min_ecc_step:
+                continue
+            e_mid = (e0 + e1) / 2
+            line = [evaluate(d, e_mid) for d in degrees]
+            err = midpoint_error(line, ([evaluate(d, e0) for d in degrees], [evaluate(d, e1) for d in degrees]))
+            eccs = sorted(eccs + [e_mid])
+            if err > tol:
+                pending_ecc.extend([(e0, e_mid), (e_mid, e1)])
+
+        # test degree intervals against every current eccentricity line
+        tested = pending_degree
+        pending_degree = []
+        for d0, d1 in tested:
+            if d1 - d0 < 2 * min_degree_step:
+                continue
+            d_mid = (d0 + d1) / 2
+            line = [evaluate(d_mid, e) for e in eccs]
+            err = midpoint_error(line, ([evaluate(d0, e) for e in eccs], [evaluate(d1, e) for e in eccs]))
+            degrees = sorted(degrees + [d_mid])
+            if err > tol:
+                pending_degree.extend([(d0, d_mid), (d_mid, d1)])
+
+    Cu = np.array([[evaluate(d, e) for e in eccs] for d in degrees])
+    return np.array(degrees), np.array(eccs), Cu, len(solved)
+
+
+def adaptive_pattern_table(n_col, n_row, col_spacing=3, row_spacing=3, **kwargs):
+    """
+    Adaptive table rows [columns, rows, eccentricity, degree, Ce, Cu] for one rectangular pattern.
+    kwargs are passed to adaptive_grid(). Ce is computed at the same grid points with Ce_grid().
+
+    Returns:
+        rows                    list:: table rows. See TABLE_COLUMNS
+        n_solves                int::  number of Cu solves
+    """
+    bolt_group = rectangular_group(n_col, n_row, col_spacing, row_spacing)
+    degrees, eccs, Cu, n_solves = adaptive_grid(bolt_group, **kwargs)
+    Ce = Ce_grid([bolt_group], degrees, eccs)[0]
+    rows = []
+    for i, degree in enumerate(degrees):
+        for j, ecc in enumerate(eccs):
+            rows.append([n_col, n_row, ecc, degree, Ce[j, i], Cu[i, j]])
+    return rows, n_solves
+
+
+class CuTable:
+    """
+    Interpolated lookup of a tabulated C coefficient table (uniform or adaptive).
+
+    Input Arguments:
+        data                    str or DataFrame:: csv path or table with columns "columns", "rows",
+                                                   "eccentricity", "degree" and one or more coefficients ("Cu", "Ce")
+
+    Public Methods:
+        .lookup()
+    """
+    def __init__(self, data):
+        df = pd.read_csv(data) if isinstance(data, str) else data
+        self.coefficients = [c for c in df.columns if c not in ("columns", "rows", "eccentricity", "degree")]
+        self.patterns = dict()
+        for (n_col, n_row), group in df.groupby(["columns", "rows"]):
+            grids = dict()
+            for coefficient in self.coefficients:
+                pivot = group.pivot_table(index="degree", columns="eccentricity", values=coefficient, dropna=False)
+                grids[coefficient] = pivot.to_numpy(dtype=float)
+            self.patterns[(int(n_col), int(n_row))] = (pivot.index.to_numpy(dtype=float),
+                                                       pivot.columns.to_numpy(dtype=float),
+                                                       grids)
+
+    def lookup(self, columns, rows, eccentricity, degree, coefficient="Cu"):
+        """
+        Bilinear interpolation of a coefficient.
+
+        Args:
+            columns, rows           int::   bolt pattern
+            eccentricity            float:: horizontal eccentricity
+            degree                  float:: load angle from vertical
+            coefficient             str::   (OPTIONAL) "Cu" or "Ce" (if tabulated). Default = "Cu"
+        """
+        if (columns, rows) not in self.patterns:
+            raise RuntimeError("ERROR: {} x {} bolt pattern is not in the table".format(columns, rows))
+        if coefficient not in self.coefficients:
+            raise RuntimeError("ERROR: {} is not tabulated. Available: {}".format(coefficient, self.coefficients))
+        degrees, eccs, grids = self.patterns[(columns, rows)]
+        if len(degrees) < 2 or len(eccs) < 2:
+            raise RuntimeError("ERROR: table for {} x {} pattern needs at least two degrees and eccentricities".format(columns, rows))
+        if not (degrees[0] <= degree <= degrees[-1] and eccs[0] <= eccentricity <= eccs[-1]):
+            raise RuntimeError("ERROR: (ecc = {}, degree = {}) is outside the table range".format(eccentricity, degree))
+
+        i = min(np.searchsorted(degrees, degree, side="right") - 1, len(degrees) - 2)
+        j = min(np.searchsorted(eccs, eccentricity, side="right") - 1, len(eccs) - 2)
+        f = grids[coefficient]
+        td = (degree - degrees[i]) / (degrees[i+1] - degrees[i])
+        te = (eccentricity - eccs[j]) / (eccs[j+1] - eccs[j])
+        return float((1-td) * (1-te) * f[i, j] + td * (1-te) * f[i+1, j] +
+                     (1-td) * te * f[i, j+1] + td * te * f[i+1, j+1])
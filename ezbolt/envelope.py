@@ -0,0 +1,143 @@
+"""
+Streaming ICR envelope over long load histories. Load steps are consumed one at a time from any
+iterable or generator and only running maxima are kept, so memory does not grow with the number
+of steps. Consecutive steps are usually close to each other, so every ICR search is warm started
+from the previous step's ICR.
+"""
+import math
+import numpy as np
+import pandas as pd
+import ezbolt.curves
+import ezbolt.surrogate
+
+
+class Envelope:
+    """
+    Running envelope of ICR results. Built by BoltGroup.envelope().
+
+    Attributes:
+        n_steps (int):                  - number of load steps processed
+        n_not_converged (int):          - number of steps where the ICR solver did not converge (excluded from envelope)
+        first_not_converged (int):      - index of the first non-converged step. None if all converged
+        max_DCR (float):                - governing demand capacity ratio
+        max_DCR_step (int):             - step index of max_DCR
+        governing_load (tuple):         - (Vx, Vy, torsion) at max_DCR_step
+        governing_Cu (float):           - Cu at max_DCR_step
+        bolt_tag (list):                - bolt tags
+        peak_force (array):             - per-bolt peak force magnitude
+        peak_force_step (array):        - step index at which each bolt's peak force occurred
+        n_trials (int):                 - total number of Brandt trials
+    """
+    def __init__(self, bolt_tag):
+        self.n_steps = 0
+        self.n_not_converged = 0
+        self.first_not_converged = None
+        self.max_DCR = 0.0
+        self.max_DCR_step = None
+        self.governing_load = None
+        self.governing_Cu = math.nan
+        self.bolt_tag = bolt_tag
+        self.peak_force = np.zeros(len(bolt_tag))
+        self.peak_force_step = np.full(len(bolt_tag), -1)
+        self.n_trials = 0
+
+    @property
+    def bolt_demand(self):
+        """
+        Peak bolt force over all bolts and steps.
+        """
+        return float(self.peak_force.max())
+
+    @property
+    def bolt_table(self):
+        """
+        Per-bolt peak force and the step it occurred at, indexed by bolt tag.
+        """
+        df = pd.DataFrame({"bolt_tag": self.bolt_tag, "peak_force": self.peak_force, "step": self.peak_force_step})
+        return df.set_index("bolt_tag")
+
+    def _not_converged(self, step):
+        self.n_not_converged += 1
+        if self.first_not_converged is None:
+            self.first_not_converged = step
+
+    def _update(self, step, load, DCR, Cu, force):
+        if DCR > self.max_DCR or self.max_DCR_step is None:
+            self.max_DCR = DCR
+            self.max_DCR_step = step
+            self.governing_load = load
+            self.governing_Cu = Cu
+        force = np.abs(force)
+        is_peak = force > self.peak_force
+        self.peak_force = np.where(is_peak, force, self.peak_force)
+        self.peak_force_step = np.where(is_peak, step, self.peak_force_step)
+
+    def __repr__(self):
+        return "Envelope(n_steps={}, max_DCR={}, max_DCR_step={}, bolt_demand={}, n_not_converged={})".format(
+            self.n_steps, self.max_DCR, self.max_DCR_step, self.bolt_demand, self.n_not_converged)
+
+
+def stream_envelope(bolt_group, load_steps, bolt_capacity=17.9, backend="python", warm_start=True, curve=None):
+    """
+    Envelope of ICR results over a load history. See BoltGroup.envelope().
+    """
+    curve = ezbolt.curves.get_curve(curve)
+    geometry = bolt_group.get_geometry()
+    x = geometry["x"]
+    y = geometry["y"]
+    hull = geometry["hull"]
+    N_bolt = bolt_group.N_bolt
+    x_cg = bolt_group.x_cg
+    y_cg = bolt_group.y_cg
+
+    # pure torsion: ICR at centroid, bolt forces proportional to torsion
+    ro = geometry["ro"]
+    R_torsion = ezbolt.curves.load_ratio(ro / ro.max(), curve)
+    Cu_torsion = float(ezbolt.curves.torsion_Cu(ro, curve))
+
+    envelope = Envelope(geometry["tag"])
+    icr_guess = None
+    for step, load in enumerate(load_steps):
+        Vx, Vy, torsion = [float(v) for v in load]
+        V_resultant = (Vx**2 + Vy**2)**(1/2)
+        envelope.n_steps += 1
+
+        # no load
+        if V_resultant == 0 and torsion == 0:
+            continue
+
+        # pure torsion
+        elif V_resultant == 0:
+            Cu = Cu_torsion
+            force = R_torsion * -torsion / Cu_torsion
+            demand = abs(torsion)
+
+        # concentric load: every bolt takes an equal share
+        elif torsion == 0:
+            Cu = ezbolt.curves.concentric_Cu(N_bolt, curve)
+            force = np.full(N_bolt, V_resultant / N_bolt)
+            demand = V_resultant
+
+        # typical load: Brandt's iteration, warm started from the previous step
+        else:
+            Cu, ICR, n_trials = ezbolt.surrogate.solve_Cu(bolt_group, Vx, Vy, torsion,
+                                                          icr_guess = icr_guess if warm_start else None,
+                                                          tol = 0.01 / V_resultant,
+                                                          backend = backend,
+                                                          curve = curve)
+            envelope.n_trials += n_trials
+            icr_guess = ICR
+            if ICR is None:
+                envelope._not_converged(step)
+                continue
+
+            # bolt forces at the converged ICR (same as BoltGroup.solve_ICR())
+            ICR_x, ICR_y = ICR
+            r = np.sqrt((x - ICR_x)**2 + (y - ICR_y)**2)
+            R = ezbolt.curves.load_ratio(r / r[hull].max(), curve)
+            Mp = Vx * (y_cg - ICR_y) - Vy * (x_cg - ICR_x) - torsion
+            force = R * Mp / np.sum(R * r)
+            demand = V_resultant
+
+        envelope._update(step, (Vx, Vy, torsion), demand / (Cu * bolt_capacity), Cu, force)
+    return envelope
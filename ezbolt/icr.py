@@ -0,0 +1,267 @@
+"""
+Stateless ICR solver core. solve_icr() takes bolt coordinates and a load and returns an ICRResult;
+it reads its inputs, keeps every intermediate in local variables and writes to nothing shared (other
+than a warm start index, if one is passed, which locks itself), so any number of threads can solve load
+cases on the same geometry at once without copies or locks.
+BoltGroup.solve() wraps it and copies the result onto the BoltGroup and its bolts for plotting.
+
+Load-independent geometry is prepared once with icr_geometry() and can be passed in place of the
+coordinates. Its arrays are read-only.
+
+    geometry = ezbolt.icr.icr_geometry(coordinates)
+    with concurrent.futures.ThreadPoolExecutor() as pool:
+        results = list(pool.map(lambda load: ezbolt.icr.solve_icr(geometry, *load), loads))
+
+The compiled "numba" loop runs without the GIL, so threads solve in parallel on any build; the
+"python" backend only runs in parallel on free-threaded Python builds.
+"""
+import math
+import numpy as np
+import ezbolt.brandt
+import ezbolt.curves
+import ezbolt.results
+import ezbolt.sensitivity
+import ezbolt.warmstart
+
+
+D_ULT = ezbolt.brandt.D_ULT
+
+# equilibrium tolerance of Brandt's iteration in kips (absolute, whatever the load magnitude)
+TOL = 0.01
+
+
+def icr_geometry(coordinates, tags=None):
+    """
+    Load-independent bolt data used by solve_icr(). Build once per bolt pattern and share between threads.
+
+    Args:
+        coordinates             list:: [(x, y), ...] bolt coordinates
+        tags                    list:: (OPTIONAL) bolt tags. Default = 0, 1, 2, ...
+
+    Returns:
+        geometry                dict:: {"tag", "x", "y", "dx", "dy", "hull", "x_cg", "y_cg", "Iz"}. Same arrays as
+                                       BoltGroup.get_geometry() (read-only) plus centroid and polar moment of inertia
+    """
+    coordinates = [(float(x), float(y)) for x, y in coordinates]
+    N_bolt = len(coordinates)
+    if N_bolt == 0:
+        raise RuntimeError("ERROR: No bolts!")
+    x_cg = sum([x / N_bolt for x, _ in coordinates])
+    y_cg = sum([y / N_bolt for _, y in coordinates])
+    Iy = sum([(x - x_cg)**2 for x, _ in coordinates])
+    Ix = sum([(y - y_cg)**2 for _, y in coordinates])
+    geometry = dict()
+    geometry["tag"] = list(range(N_bolt)) if tags is None else list(tags)
+    geometry["x"] = np.array([x for x, _ in coordinates], dtype=float)
+    geometry["y"] = np.array([y for _, y in coordinates], dtype=float)
+    geometry["dx"] = geometry["x"] - x_cg
+    geometry["dy"] = geometry["y"] - y_cg
+    geometry["hull"] = ezbolt.brandt.convex_hull(geometry["x"], geometry["y"])
+    for key in ("x", "y", "dx", "dy", "hull"):
+        geometry[key].setflags(write=False)
+    geometry["x_cg"] = x_cg
+    geometry["y_cg"] = y_cg
+    geometry["Iz"] = Ix + Iy
+    return geometry
+
+
+def eccentricity(Vx, Vy, torsion, ecc_method="AISC"):
+    """
+    Place the load on its line of action Vy * ex - Vx * ey = torsion. See BoltGroup.solve() for ecc_method.
+
+    Returns:
+        ecc_x, ecc_y            float:: eccentricity of the load with respect to the centroid
+    """
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    if V_resultant == 0:
+        return 0, 0
+    if ecc_method == "AISC":
+        if Vy == 0:
+            return 0, -(torsion) / Vx
+        return (torsion) / Vy, 0
+    elif ecc_method == "perpendicular":
+        theta = math.atan2(Vy, Vx) * 180 / math.pi
+        ecc_y = (torsion / V_resultant) * -math.sin(math.radians(theta+90))
+        ecc_x = (torsion / V_resultant) * -math.cos(math.radians(theta+90))
+        return ecc_x, ecc_y
+    else:
+        # ecc_method is a float here: ey is given and ex follows from the line of action
+        ecc_y = ecc_method
+        ecc_x = (torsion + Vx * ecc_y) / Vy
+        return ecc_x, ecc_y
+
+
+def solve_icr(coordinates, Vx, Vy, torsion, bolt_capacity=17.9, ecc_method="AISC", backend="python",
+              sensitivities=False, tol=TOL, max_iter=1000, curve=None, warm_start=None, icr_guess=None):
+    """
+    Solve one load case with the instant center of rotation method. Pure function: nothing outside the
+    returned result is modified (except the warm start index, if given), and no printing.
+
+    Args:
+        coordinates             list:: [(x, y), ...] bolt coordinates, or a geometry dict from icr_geometry()
+        Vx                      float:: applied horizontal force
+        Vy                      float:: applied vertical force
+        torsion                 float:: applied in-plane moment about the centroid
+        bolt_capacity           float:: (OPTIONAL) bolt capacity. Default = 17.9 kips
+        ecc_method              str::   (OPTIONAL) "AISC" or "perpendicular". See BoltGroup.solve(). Default = "AISC"
+        backend                 str::   (OPTIONAL) "python" or "numba". Default = "python"
+        sensitivities           bool::  (OPTIONAL) attach derivatives of Cu and ICR. See ezbolt.sensitivity. Default = False
+        tol                     float:: (OPTIONAL) equilibrium tolerance in kips. Default = 0.01
+        max_iter                int::   (OPTIONAL) maximum number of trials. Default = 1000
+        curve                   obj::   (OPTIONAL) bolt load-deformation curve, a LoadDeformationCurve or a name in
+                                        ezbolt.curves.CURVES. Default = None (closed-form AISC curve)
+        warm_start              obj::   (OPTIONAL) ezbolt.warmstart.WarmStartIndex of this pattern and curve. The iteration
+                                        starts from the nearest stored ICR (retried cold if that fails) and converged
+                                        ICRs are stored. Default = None (start from Brandt's elastic estimate)
+        icr_guess               tuple:: (OPTIONAL) (x, y) starting ICR, e.g. a stored solution from ezbolt.cache. Iterated
+                                        to this load's tolerance (one trial if it already meets it) and retried cold if
+                                        that fails. Takes precedence over warm_start. Default = None
+
+    Returns:
+        result                  ICRResult:: see ezbolt.results. .history holds the trial history
+                                            (rows as ezbolt.brandt.brandt_loop())
+    """
+    geometry = coordinates if isinstance(coordinates, dict) else icr_geometry(coordinates)
+    curve = ezbolt.curves.get_curve(curve)
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    if V_resultant == 0 and torsion == 0:
+        raise RuntimeError("ERROR: No force applied!")
+
+    # possibility #1: No torsion. ICR method is not applicable
+    if torsion == 0:
+        return ezbolt.results.ICRResult(bolt_capacity, applicable=False)
+    x_cg = geometry["x_cg"]
+    y_cg = geometry["y_cg"]
+    ecc_x, ecc_y = eccentricity(Vx, Vy, torsion, ecc_method)
+
+    # possibility #2: Typical applied load. Iteration needed to find ICR
+    if V_resultant != 0:
+        if warm_start is not None:
+            angle, ecc = ezbolt.warmstart.line_of_action(Vx, Vy, torsion)
+        args = dict(x = geometry["x"],
+                    y = geometry["y"],
+                    Vx = Vx,
+                    Vy = Vy,
+                    torsion = torsion,
+                    ecc_x = ecc_x,
+                    ecc_y = ecc_y,
+                    x_cg = x_cg,
+                    y_cg = y_cg,
+                    Iz = geometry["Iz"],
+                    stepsize_factor = ezbolt.brandt.stepsize_factor(math.sqrt(ecc_x**2 + ecc_y**2)),
+                    tol = tol,
+                    max_iter = max_iter,
+                    backend = backend,
+                    hull = geometry["hull"],
+                    curve = curve)
+        if icr_guess is None and warm_start is not None:
+            offset = warm_start.nearest(angle, ecc)
+            if offset is not None:
+                icr_guess = (x_cg + offset[0], y_cg + offset[1])
+        if icr_guess is None:
+            n_trials, converged, hist = ezbolt.brandt.run(**args)
+        else:
+            # start from the guess. If that fails, retry cold and keep both in the history
+            warm_args = dict(args, max_iter=min(max_iter, ezbolt.warmstart.MAX_WARM_TRIALS))
+            n_trials, converged, hist = ezbolt.brandt.run(icr_guess=icr_guess, **warm_args)
+            if not converged:
+                n_cold, converged, hist_cold = ezbolt.brandt.run(**args)
+                n_trials += n_cold
+                hist = np.hstack([hist, hist_cold])
+        ICR_x = float(hist[0, -1])
+        ICR_y = float(hist[1, -1])
+        Cu = float(hist[6, -1])
+        Mp = Vx * float(hist[5, -1]) - Vy * float(hist[4, -1])
+        columns, _ = _bolt_forces(geometry, ICR_x, ICR_y, Mp, curve)
+        connection_demand = V_resultant
+        if warm_start is not None and converged:
+            warm_start.insert(angle, ecc, ICR_x - x_cg, ICR_y - y_cg)
+
+    # possibility #3: Pure torsion. ICR is located at centroid
+    else:
+        n_trials, converged = 1, True
+        ICR_x, ICR_y = x_cg, y_cg
+        columns, sum_Mi1 = _bolt_forces(geometry, ICR_x, ICR_y, -torsion, curve)
+        Cu = abs(sum_Mi1 / 1)
+        hist = _known_hist(geometry, ecc_x, ecc_y, ICR_x, ICR_y, Cu)
+        connection_demand = torsion
+
+    result = ezbolt.results.ICRResult(bolt_capacity = bolt_capacity,
+                                      ICR_x = ICR_x,
+                                      ICR_y = ICR_y,
+                                      Cu = Cu,
+                                      connection_demand = connection_demand,
+                                      columns = columns,
+                                      totals = ("Vx", "Vy", "moment_CG", "moment_ICR"),
+                                      converged = converged,
+                                      n_trials = n_trials)
+    result.history = hist
+    if sensitivities and converged and V_resultant != 0:
+        result.sensitivities = ezbolt.sensitivity.icr_sensitivities(x = geometry["x"],
+                                                                   y = geometry["y"],
+                                                                   ICR_x = ICR_x,
+                                                                   ICR_y = ICR_y,
+                                                                   x_cg = x_cg,
+                                                                   y_cg = y_cg,
+                                                                   ecc_x = ecc_x,
+                                                                   ecc_y = ecc_y,
+                                                                   theta = math.atan2(Vy, Vx) * 180 / math.pi,
+                                                                   curve = curve)
+    return result
+
+
+def _known_hist(geometry, ecc_x, ecc_y, ICR_x, ICR_y, Cu):
+    """
+    Single-trial history (same rows as ezbolt.brandt.brandt_loop()) for an ICR that was not iterated on
+    (pure torsion). Equilibrium residuals are NaN.
+    """
+    ax = geometry["x_cg"] - ICR_x
+    ay = ICR_y - geometry["y_cg"]
+    return np.array([[ICR_x], [ICR_y], [ax], [ay], [ecc_x + ax], [ecc_y - ay], [Cu],
+                     [math.nan], [math.nan], [math.nan]])
+
+
+def _bolt_forces(geometry, ICR_x, ICR_y, Mp, curve=None):
+    """
+    Bolt force table columns at a given ICR for an applied moment Mp about it. Each bolt's deformation is
+    D_ult * ro / ro_max, its force R / R_ult follows from the curve and acts perpendicular to ro; bolt
+    forces are scaled so their moment about the ICR balances Mp. Computed bolt by bolt in plain floats.
+    curve = None is the closed-form AISC curve.
+
+    Returns:
+        columns                 dict:: ICRResult bolt force table columns
+        sum_Mi1                 float:: resisting moment of the group per unit bolt capacity (Cu under pure torsion)
+    """
+    x = geometry["x"].tolist()
+    y = geometry["y"].tolist()
+    dx_ICR = [xi - ICR_x for xi in x]
+    dy_ICR = [yi - ICR_y for yi in y]
+    ro_ICR = [(a**2 + b**2)**(1/2) for a, b in zip(dx_ICR, dy_ICR)]
+    ro_max = max([ro_ICR[i] for i in geometry["hull"]])
+    if curve is None:
+        deformation = [r / ro_max * D_ULT for r in ro_ICR]
+        R = [(1-math.exp(-10*d))**(0.55) for d in deformation]
+    else:
+        rho = np.array(ro_ICR) / ro_max
+        deformation = (rho * curve.D_ult).tolist()
+        R = curve.shape(rho).tolist()
+    sum_Mi1 = sum([f * r for f, r in zip(R, ro_ICR)])
+    F_max = Mp / sum_Mi1
+    force = [f * F_max for f in R]
+    vx = [-f * b / r if r!=0 else 0 for f, b, r in zip(force, dy_ICR, ro_ICR)]
+    vy = [f * a / r if r!=0 else 0 for f, a, r in zip(force, dx_ICR, ro_ICR)]
+
+    columns=dict()
+    columns["bolt_tag"] = geometry["tag"]
+    columns["x"] = geometry["x"]
+    columns["y"] = geometry["y"]
+    columns["dx_ICR"] = dx_ICR
+    columns["dy_ICR"] = dy_ICR
+    columns["ro_ICR"] = ro_ICR
+    columns["deformation"] = deformation
+    columns["force"] = force
+    columns["moment_ICR"] = [f * r for f, r in zip(force, ro_ICR)]
+    columns["moment_CG"] = [- a*dy + b*dx for a, b, dx, dy in zip(vx, vy, geometry["dx"].tolist(), geometry["dy"].tolist())]
+    columns["Vx"] = vx
+    columns["Vy"] = vy
+    return columns, sum_Mi1
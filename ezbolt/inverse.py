@@ -0,0 +1,171 @@
+"""
+Inverse design queries on one bolt group: the largest eccentricity that carries a given load, the
+load angle at which the group is weakest, and the largest load at a given eccentricity and angle.
+
+Loads follow the surrogate convention (see ezbolt.surrogate): the load acts at angle degrees
+counterclockwise from +x (Vx = V cos(angle), Vy = V sin(angle)) with perpendicular eccentricity
+e = torsion / V about the centroid. Cu does not depend on the load magnitude, so every solve uses
+a unit load and each search only moves along one axis of (angle, e), warm starting every solve
+from the ICR of the previous one.
+"""
+import math
+import ezbolt.surrogate
+
+
+GOLDEN = (math.sqrt(5) - 1) / 2
+
+
+class InverseResult:
+    """
+    Answer of an inverse query. The load point (angle, ecc) and the capacity there.
+
+    Attributes:
+        angle (float):                  - load angle in degrees from +x, counterclockwise
+        ecc (float):                    - perpendicular eccentricity (torsion / V)
+        Cu (float):                     - ICR coefficient at (angle, ecc). NaN if not converged
+        P_max (float):                  - connection capacity Cu * bolt_capacity at (angle, ecc)
+        load (tuple):                   - (Vx, Vy, torsion) at capacity
+        n_solves (int):                 - number of Cu solves performed
+        n_trials (int):                 - total number of Brandt trials
+    """
+    def __init__(self, angle, ecc, Cu, bolt_capacity, n_solves, n_trials):
+        self.angle = float(angle)
+        self.ecc = float(ecc)
+        self.Cu = float(Cu)
+        self.P_max = self.Cu * bolt_capacity
+        self.load = (self.P_max * math.cos(math.radians(angle)),
+                     self.P_max * math.sin(math.radians(angle)),
+                     self.P_max * ecc)
+        self.n_solves = n_solves
+        self.n_trials = n_trials
+
+    def __repr__(self):
+        return "InverseResult(angle={:.4g}, ecc={:.4g}, Cu={:.4g}, P_max={:.4g}, n_solves={})".format(
+            self.angle, self.ecc, self.Cu, self.P_max, self.n_solves)
+
+
+class _CuSearch:
+    """
+    Cu along a search path. Every solve is warm started from the last converged ICR.
+    """
+    def __init__(self, bolt_group, backend, curve=None):
+        self.bolt_group = bolt_group
+        self.backend = backend
+        self.curve = curve
+        self.icr_guess = None
+        self.n_solves = 0
+        self.n_trials = 0
+
+    def __call__(self, angle, ecc):
+        Vx = math.cos(math.radians(angle))
+        Vy = math.sin(math.radians(angle))
+        Cu, ICR, n_trials = ezbolt.surrogate.solve_Cu(self.bolt_group, Vx, Vy, ecc, self.icr_guess,
+                                                      tol = 1e-3,
+                                                      backend = self.backend,
+                                                      curve = self.curve)
+        self.n_solves += 1
+        self.n_trials += n_trials
+        if ICR is not None:
+            self.icr_guess = ICR
+        return Cu
+
+
+def max_load(bolt_group, ecc, angle, bolt_capacity=17.9, backend="python", curve=None):
+    """
+    Largest load at a given eccentricity and angle. See BoltGroup.max_load().
+    """
+    Cu = _CuSearch(bolt_group, backend, curve)
+    return InverseResult(angle, ecc, Cu(angle, ecc), bolt_capacity, Cu.n_solves, Cu.n_trials)
+
+
+def max_eccentricity(bolt_group, P, angle, bolt_capacity=17.9, tol=0.01, max_iter=100, backend="python", curve=None):
+    """
+    Largest eccentricity at which the connection carries P at a given angle. See BoltGroup.max_eccentricity().
+
+    Cu decreases with eccentricity. The root of g(e) = Cu_required / Cu(e) - 1 is bracketed by doubling e,
+    then narrowed by regula falsi with the Illinois modification. Cu ~ 1/e at large eccentricity, so g is
+    close to linear and the bracket usually closes in a handful of solves.
+    """
+    if P <= 0:
+        raise RuntimeError("ERROR: P must be positive")
+    Cu = _CuSearch(bolt_group, backend, curve)
+    Cu_required = P / bolt_capacity
+
+    # concentric capacity is the upper bound
+    e_lo, Cu_lo = 0.0, Cu(angle, 0.0)
+    if Cu_lo < Cu_required:
+        return InverseResult(angle, math.nan, math.nan, bolt_capacity, Cu.n_solves, Cu.n_trials)
+
+    # bracket the root, starting from the size of the bolt group
+    e_hi = max(math.sqrt(bolt_group.Iz / bolt_group.N_bolt), tol)
+    Cu_hi = Cu(angle, e_hi)
+    while not Cu_hi < Cu_required:
+        if math.isnan(Cu_hi) or Cu.n_solves > max_iter:
+            return InverseResult(angle, math.nan, Cu_hi, bolt_capacity, Cu.n_solves, Cu.n_trials)
+        e_lo, Cu_lo = e_hi, Cu_hi
+        e_hi = 2 * e_hi
+        Cu_hi = Cu(angle, e_hi)
+
+    # Illinois regula falsi. e_lo always carries P, e_hi does not
+    g_lo = Cu_required / Cu_lo - 1
+    g_hi = Cu_required / Cu_hi - 1
+    side = 0
+    while e_hi - e_lo > tol and Cu.n_solves <= max_iter:
+        e = (e_lo * g_hi - e_hi * g_lo) / (g_hi - g_lo)
+        e = min(max(e, e_lo + tol / 4), e_hi - tol / 4)
+        Cu_e = Cu(angle, e)
+        if math.isnan(Cu_e):
+            break
+        g = Cu_required / Cu_e - 1
+        if g <= 0:
+            e_lo, Cu_lo, g_lo = e, Cu_e, g
+            if side == -1:
+                g_hi = g_hi / 2
+            side = -1
+        else:
+            e_hi, g_hi = e, g
+            if side == 1:
+                g_lo = g_lo / 2
+            side = 1
+    return InverseResult(angle, e_lo, Cu_lo, bolt_capacity, Cu.n_solves, Cu.n_trials)
+
+
+def critical_angle(bolt_group, ecc, bolt_capacity=17.9, tol=0.1, n_initial=12, backend="python", curve=None):
+    """
+    Load angle with the lowest capacity at a given eccentricity. See BoltGroup.critical_angle().
+
+    A coarse pass of n_initial angles around the circle brackets the weakest angle, which is then
+    refined by golden-section search to within tol degrees.
+    """
+    if n_initial < 3:
+        raise RuntimeError("ERROR: n_initial must be at least 3")
+    Cu = _CuSearch(bolt_group, backend, curve)
+    step = 360 / n_initial
+    angles = [k * step for k in range(n_initial)]
+    Cu_initial = [Cu(a, ecc) for a in angles]
+    converged = [k for k in range(n_initial) if not math.isnan(Cu_initial[k])]
+    if len(converged) == 0:
+        return InverseResult(math.nan, ecc, math.nan, bolt_capacity, Cu.n_solves, Cu.n_trials)
+    k_min = min(converged, key=lambda k: Cu_initial[k])
+    best_angle, best_Cu = angles[k_min], Cu_initial[k_min]
+
+    # golden-section search between the neighbors of the weakest coarse angle
+    a, b = best_angle - step, best_angle + step
+    c = b - GOLDEN * (b - a)
+    d = a + GOLDEN * (b - a)
+    Cu_c, Cu_d = Cu(c, ecc), Cu(d, ecc)
+    while b - a > tol:
+        if math.isnan(Cu_c) or math.isnan(Cu_d):
+            break
+        if Cu_c < Cu_d:
+            b, d, Cu_d = d, c, Cu_c
+            c = b - GOLDEN * (b - a)
+            Cu_c = Cu(c, ecc)
+        else:
+            a, c, Cu_c = c, d, Cu_d
+            d = a + GOLDEN * (b - a)
+            Cu_d = Cu(d, ecc)
+    for angle, Cu_angle in ((c, Cu_c), (d, Cu_d)):
+        if Cu_angle < best_Cu:
+            best_angle, best_Cu = angle, Cu_angle
+    return InverseResult(best_angle % 360, ecc, best_Cu, bolt_capacity, Cu.n_solves, Cu.n_trials)
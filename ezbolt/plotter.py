@@ -1,14 +1,27 @@
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+import matplotlib.colors as colors
 import math
 
 
-def preview(boltgroup):
+def _subplots(fig, nrows=1, ncols=1, figsize=None, **kwargs):
     """
-    Preview bolt configuration
+    plt.subplots(), or clear and reuse fig when given (e.g. a figure template kept by ezbolt.report)
+    """
+    if fig is None:
+        return plt.subplots(nrows, ncols, figsize=figsize, **kwargs)
+    fig.clf()
+    if figsize is not None:
+        fig.set_size_inches(figsize)
+    return fig, fig.subplots(nrows, ncols, **kwargs)
+
+
+def preview(boltgroup, fig=None):
+    """
+    Preview bolt configuration. Draws on fig (cleared first) if given
     """   
     # plot bolts
-    fig, axs = plt.subplots(1,2, gridspec_kw={"width_ratios":[2,3]}, figsize=(11,8.5))
+    fig, axs = _subplots(fig, 1, 2, gridspec_kw={"width_ratios":[2,3]}, figsize=(11,8.5))
     for bolt in boltgroup.bolts :
         axs[1].plot([bolt.x],[bolt.y], 
                  marker="h",
@@ -57,7 +70,7 @@ def preview(boltgroup):
     axs[0].set_xticks([])
     axs[0].set_yticks([])
     fig.suptitle("Bolt Group Preview", fontweight="bold", fontsize=16)
-    plt.tight_layout()
+    fig.tight_layout()
     
     
     # set axis limit, first use auto, then expand by 10% to not clip annotations
@@ -72,11 +85,11 @@ def preview(boltgroup):
     return fig
 
 
-def plot_elastic(boltgroup, annotate_force=True):
+def plot_elastic(boltgroup, annotate_force=True, fig=None):
     """
-    Plot bolt forces from elastic method
+    Plot bolt forces from elastic method. Draws on fig (cleared first) if given
     """
-    fig, axs = plt.subplots(1,2, gridspec_kw={"width_ratios":[2,3]}, figsize=[11,8.5])
+    fig, axs = _subplots(fig, 1, 2, gridspec_kw={"width_ratios":[2,3]}, figsize=[11,8.5])
     
     # arrow size scaling set up. 
     # Larrow_max is set to 20% of x and y bound. Qarrow_max the associated amplitude. 
@@ -84,7 +97,12 @@ def plot_elastic(boltgroup, annotate_force=True):
     ybound = max([b.y for b in boltgroup.bolts]) - min([b.y for b in boltgroup.bolts])
     xbound = max([b.x for b in boltgroup.bolts]) - min([b.x for b in boltgroup.bolts])
     Larrow_max = max(xbound,ybound) * 0.20
-    Qarrow_max = max([b.v_resultant for b in boltgroup.bolts])
+    result = boltgroup.results.elastic
+    vx_total = result.column("vx_total")
+    vy_total = result.column("vy_total")
+    v_resultant = result.column("v_resultant")
+    theta = result.column("theta")
+    Qarrow_max = v_resultant.max()
     ARROWWIDTH = 0.03
     
     # text box showing applied load
@@ -125,7 +143,7 @@ def plot_elastic(boltgroup, annotate_force=True):
                     (xo,yo-dy*14), xycoords='axes fraction', fontsize=14, va="top", ha="left")
     
     # plot bolts
-    for bolt in boltgroup.bolts:
+    for i, bolt in enumerate(boltgroup.bolts):
         axs[1].plot([bolt.x],[bolt.y], 
                  marker="h",
                  markerfacecolor="lightgray",
@@ -135,7 +153,7 @@ def plot_elastic(boltgroup, annotate_force=True):
                  zorder=2,
                  linestyle="none")
         if annotate_force:
-            axs[1].annotate("({:.1f} k, {:.1f} k)".format(bolt.vx_total, bolt.vy_total),
+            axs[1].annotate("({:.1f} k, {:.1f} k)".format(vx_total[i], vy_total[i]),
                          xy=(bolt.x, bolt.y), 
                          xycoords='data', 
                          xytext=(0, -16), 
@@ -151,10 +169,10 @@ def plot_elastic(boltgroup, annotate_force=True):
     axs[1].plot(boltgroup.x_cg, boltgroup.y_cg, marker="X",c="red",markersize=6,zorder=2,linestyle="none")
 
     # bolts reaction arrows
-    for bolt in boltgroup.bolts:
-        L_arrow = (bolt.v_resultant / Qarrow_max) * Larrow_max
-        dx_arrow = L_arrow * math.cos(math.radians(bolt.theta))
-        dy_arrow = L_arrow * math.sin(math.radians(bolt.theta))
+    for i, bolt in enumerate(boltgroup.bolts):
+        L_arrow = (v_resultant[i] / Qarrow_max) * Larrow_max
+        dx_arrow = L_arrow * math.cos(math.radians(theta[i]))
+        dy_arrow = L_arrow * math.sin(math.radians(theta[i]))
         axs[1].arrow(bolt.x,
                   bolt.y, 
                   dx_arrow, 
@@ -213,16 +231,16 @@ def plot_elastic(boltgroup, annotate_force=True):
     axs[1].set_xlim(x_min - 0.2*x_length, x_max + 0.2*x_length)
     axs[1].set_ylim(y_min - 0.2*y_length, y_max + 0.2*y_length)
     
-    plt.tight_layout()
+    fig.tight_layout()
     return fig
 
 
-def plot_ECR(boltgroup, annotate_force=True):
+def plot_ECR(boltgroup, annotate_force=True, fig=None):
     """
-    plot bolt forces from ECR method.
+    plot bolt forces from ECR method. Draws on fig (cleared first) if given
     """
     if boltgroup.torsion == 0:
-        fig, axs = plt.subplots()
+        fig, axs = _subplots(fig)
         axs.annotate("ECR method is not applicable for torsion = 0",
                      xy=(0,0), 
                      xytext=(0.05,0.5), 
@@ -230,14 +248,19 @@ def plot_ECR(boltgroup, annotate_force=True):
                      fontsize=14)
         return fig
     
-    fig, axs = plt.subplots(1,2, gridspec_kw={"width_ratios":[2,3]}, figsize=[11,8.5])
+    fig, axs = _subplots(fig, 1, 2, gridspec_kw={"width_ratios":[2,3]}, figsize=[11,8.5])
     # arrow size scaling set up. 
     # Larrow_max is set to 20% of x and y bound. Qarrow_max the associated amplitude. 
     # Therefore, L = (q/Qarrow_max) * Larrow_max
     ybound = max([b.y for b in boltgroup.bolts]) - min([b.y for b in boltgroup.bolts])
     xbound = max([b.x for b in boltgroup.bolts]) - min([b.x for b in boltgroup.bolts])
     Larrow_max = max(xbound,ybound) * 0.20
-    Qarrow_max = max([b.vtotal_ECR for b in boltgroup.bolts])
+    result = boltgroup.results.ECR
+    vx_ECR = result.column("vx")
+    vy_ECR = result.column("vy")
+    vtotal_ECR = result.column("v_resultant")
+    theta_ECR = result.column("theta")
+    Qarrow_max = vtotal_ECR.max()
     ARROWWIDTH = 0.03
     
     # text box showing applied load
@@ -283,7 +306,7 @@ def plot_ECR(boltgroup, annotate_force=True):
                     (xo,yo-dy*16), xycoords='axes fraction', fontsize=14, va="top", ha="left")
     
     # plot bolts
-    for bolt in boltgroup.bolts:
+    for i, bolt in enumerate(boltgroup.bolts):
         axs[1].plot([bolt.x],[bolt.y], 
                  marker="h",
                  markerfacecolor="lightgray",
@@ -293,7 +316,7 @@ def plot_ECR(boltgroup, annotate_force=True):
                  zorder=2,
                  linestyle="none")
         if annotate_force:
-            axs[1].annotate("({:.1f} k, {:.1f} k)".format(bolt.vx_ECR, bolt.vy_ECR),
+            axs[1].annotate("({:.1f} k, {:.1f} k)".format(vx_ECR[i], vy_ECR[i]),
                          xy=(bolt.x, bolt.y), 
                          xycoords='data', 
                          xytext=(0, -16), 
@@ -312,10 +335,10 @@ def plot_ECR(boltgroup, annotate_force=True):
         axs[1].plot(boltgroup.ECR_x, boltgroup.ECR_y, marker="*",c="red",markersize=14,zorder=3,linestyle="none")
     
     # bolts reaction arrows
-    for bolt in boltgroup.bolts:
-        L_arrow = (bolt.vtotal_ECR / Qarrow_max) * Larrow_max
-        dx_arrow = L_arrow * math.cos(math.radians(bolt.theta_ECR))
-        dy_arrow = L_arrow * math.sin(math.radians(bolt.theta_ECR))
+    for i, bolt in enumerate(boltgroup.bolts):
+        L_arrow = (vtotal_ECR[i] / Qarrow_max) * Larrow_max
+        dx_arrow = L_arrow * math.cos(math.radians(theta_ECR[i]))
+        dy_arrow = L_arrow * math.sin(math.radians(theta_ECR[i]))
         axs[1].arrow(bolt.x,
                   bolt.y, 
                   dx_arrow, 
@@ -374,25 +397,33 @@ def plot_ECR(boltgroup, annotate_force=True):
     axs[1].set_xlim(x_min - 0.3*x_length, x_max + 0.3*x_length)
     axs[1].set_ylim(y_min - 0.3*y_length, y_max + 0.3*y_length)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     return fig
 
 
-def plot_ICR(boltgroup, annotate_force=True):
+def plot_ICR(boltgroup, annotate_force=True, fig=None):
     """
-    plot bolt forces from ICR method.
+    plot bolt forces from ICR method. Draws on fig (cleared first) if given
     """
     if boltgroup.torsion == 0:
-        fig, axs = plt.subplots()
+        fig, axs = _subplots(fig)
         axs.annotate("ICR method is not applicable for torsion = 0",
                      xy=(0,0), 
                      xytext=(0.05,0.5), 
                      textcoords='axes fraction', 
                      fontsize=14)
         return fig
+    if boltgroup.results.status == "screened":
+        fig, axs = _subplots(fig)
+        axs.annotate("ICR solve was skipped (screened by elastic DCR)",
+                     xy=(0,0), 
+                     xytext=(0.05,0.5), 
+                     textcoords='axes fraction', 
+                     fontsize=14)
+        return fig
     
-    fig, axs = plt.subplots(1,2, gridspec_kw={"width_ratios":[2,3]}, figsize=[11,8.5])
+    fig, axs = _subplots(fig, 1, 2, gridspec_kw={"width_ratios":[2,3]}, figsize=[11,8.5])
     # arrow size scaling set up. 
     # Larrow_max is set to 20% of x and y bound. Qarrow_max the associated amplitude. 
     # Therefore, L = (q/Qarrow_max) * Larrow_max
@@ -545,7 +576,7 @@ def plot_ICR(boltgroup, annotate_force=True):
     axs[1].set_xlim(x_min - 0.3*x_length, x_max + 0.3*x_length)
     axs[1].set_ylim(y_min - 0.3*y_length, y_max + 0.3*y_length)
     
-    plt.tight_layout()
+    fig.tight_layout()
     
     return fig
 
@@ -575,6 +606,54 @@ def plot_convergence(boltgroup):
     return fig
 
 
+def plot_convergence_map(convergence_map, pattern=None, fig=None):
+    """
+    Heat map of Brandt trials over load angle and eccentricity from ezbolt.convergence.convergence_map().
+    Non-converged cases are marked with a red x. Draws on fig (cleared first) if given
+    
+    Args:
+        convergence_map         ConvergenceMap:: sweep result
+        pattern                 str::  (OPTIONAL) pattern label. Default = worst case over all patterns
+        fig                     obj::  (OPTIONAL) matplotlib figure to draw on. Default = None (new figure)
+    """
+    if pattern is None:
+        n_trials = convergence_map.n_trials.max(axis=0)
+        failed = (~convergence_map.converged).any(axis=0)
+        title = "all patterns (worst case)"
+    else:
+        k = convergence_map.labels.index(pattern)
+        n_trials = convergence_map.n_trials[k]
+        failed = ~convergence_map.converged[k]
+        title = "pattern {}".format(pattern)
+    
+    # heat map of trial count on a log scale, one cell per (angle, ecc)
+    fig, ax = _subplots(fig, figsize=(11,8.5))
+    n_angle, n_ecc = n_trials.shape
+    mesh = ax.pcolormesh(range(n_ecc+1), range(n_angle+1), n_trials.clip(min=1),
+                         norm=colors.LogNorm(vmin=1, vmax=max(n_trials.max(), 2)),
+                         cmap="viridis")
+    fig.colorbar(mesh, ax=ax, label="Brandt trials")
+    rows, cols = failed.nonzero()
+    ax.plot(cols + 0.5, rows + 0.5, marker="x", color="red", markersize=8, linestyle="none", label="not converged")
+    
+    # styling
+    fig.suptitle("Brandt's Method Convergence Map", fontweight="bold", fontsize=16)
+    ax.set_title(title)
+    ax.set_xlabel("eccentricity")
+    ax.set_ylabel("load angle (degrees)")
+    step_e = max(1, n_ecc // 12)
+    step_a = max(1, n_angle // 12)
+    ax.set_xticks([j + 0.5 for j in range(0, n_ecc, step_e)])
+    ax.set_xticklabels(["{:g}".format(e) for e in convergence_map.eccs[::step_e]])
+    ax.set_yticks([i + 0.5 for i in range(0, n_angle, step_a)])
+    ax.set_yticklabels(["{:g}".format(a) for a in convergence_map.angles[::step_a]])
+    if len(rows) > 0:
+        ax.legend(loc="upper right")
+    fig.tight_layout()
+    
+    return fig
+
+
 
 
 
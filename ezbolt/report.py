@@ -0,0 +1,181 @@
+"""
+Headless calculation reports. Every connection of a schedule (see ezbolt.batch for columns) is
+solved and its plots (preview, elastic, ECR, ICR) are written to file, along with an index csv of
+results and file names.
+
+Figures are rendered on Agg canvases directly, so no display is needed and the pyplot backend is
+never touched. Each worker keeps one figure per plot type outside of pyplot's figure manager and
+clears and redraws it for every connection, so no figures accumulate and memory stays flat no matter
+how many connections are rendered. Rows are read in chunks and spread over a process pool.
+
+Output per connection:
+    pdf                 <id>.pdf, one page per plot
+    png, svg            <id>_<plot>.<format>, one file per plot
+"""
+import contextlib
+import io
+import logging
+import os
+import re
+import multiprocessing
+import matplotlib.backends.backend_agg
+import matplotlib.backends.backend_pdf
+import matplotlib.figure
+import pandas as pd
+import ezbolt.batch
+import ezbolt.boltgroup
+import ezbolt.plotter
+
+
+PLOTS = {"preview": ezbolt.plotter.preview,
+         "elastic": ezbolt.plotter.plot_elastic,
+         "ECR": ezbolt.plotter.plot_ECR,
+         "ICR": ezbolt.plotter.plot_ICR}
+FORMATS = ("pdf", "png", "svg")
+INDEX_COLUMNS = ezbolt.batch.RESULT_COLUMNS + ["files", "error"]
+
+# per-process report settings and figure templates, set by _init_worker()
+_worker = dict()
+
+
+def _init_worker(output_dir, plots, fmt, dpi, annotate_force, backend):
+    """
+    Create one reusable figure with an Agg canvas per plot type.
+    """
+    templates = dict()
+    for plot in plots:
+        templates[plot] = matplotlib.figure.Figure()
+        matplotlib.backends.backend_agg.FigureCanvasAgg(templates[plot])
+    _worker.update(output_dir = output_dir,
+                   plots = plots,
+                   format = fmt,
+                   dpi = dpi,
+                   annotate_force = annotate_force,
+                   backend = backend,
+                   templates = templates)
+
+
+def _file_stem(case_id):
+    """
+    File name for a case id. Characters that are not safe in file names are replaced by "_".
+    """
+    return re.sub(r"[^\w\-.]", "_", str(case_id))
+
+
+def render_record(record):
+    """
+    Solve one schedule row and write its plots. Returns an index row (see INDEX_COLUMNS).
+    Runs in a worker set up by _init_worker().
+    """
+    row = dict(id=record["id"])
+    try:
+        bolt_group = ezbolt.boltgroup.BoltGroup()
+        for x, y in ezbolt.batch.record_coordinates(record):
+            bolt_group.add_bolt_single(x, y)
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = bolt_group.solve(Vx = float(record["Vx"]),
+                                       Vy = float(record["Vy"]),
+                                       torsion = float(record["torsion"]),
+                                       bolt_capacity = ezbolt.batch._get(record, "bolt_capacity", 17.9),
+                                       verbose = False,
+                                       backend = _worker["backend"])
+        summary, error = ezbolt.batch.summarize(record["id"], bolt_group, results)
+        if summary is not None:
+            row.update(summary)
+        row["error"] = error
+
+        # draw every plot on its template figure and write it out. Equal-aspect axes log a warning
+        # about adjusted limits on every draw; keep it out of long runs
+        stem = os.path.join(_worker["output_dir"], _file_stem(record["id"]))
+        files = []
+        pdf = None
+        axes_log = logging.getLogger("matplotlib.axes._base")
+        log_level = axes_log.level
+        axes_log.setLevel(logging.ERROR)
+        if _worker["format"] == "pdf":
+            pdf = matplotlib.backends.backend_pdf.PdfPages(stem + ".pdf")
+            files.append(stem + ".pdf")
+        try:
+            for plot in _worker["plots"]:
+                fig = _worker["templates"][plot]
+                if plot == "preview":
+                    PLOTS[plot](bolt_group, fig=fig)
+                elif plot == "ICR" and error is not None:
+                    continue
+                else:
+                    PLOTS[plot](bolt_group, annotate_force=_worker["annotate_force"], fig=fig)
+                if pdf is not None:
+                    pdf.savefig(fig, dpi=_worker["dpi"])
+                else:
+                    path = "{}_{}.{}".format(stem, plot, _worker["format"])
+                    fig.savefig(path, dpi=_worker["dpi"])
+                    files.append(path)
+                fig.clf()
+        finally:
+            axes_log.setLevel(log_level)
+            if pdf is not None:
+                pdf.close()
+        row["files"] = ";".join(os.path.relpath(f, _worker["output_dir"]) for f in files)
+    except Exception as e:
+        row["error"] = "{}: {}".format(type(e).__name__, e)
+    return row
+
+
+def generate_reports(input_path, output_dir, plots=("preview", "elastic", "ECR", "ICR"), fmt="pdf", processes=None,
+                     chunksize=1000, dpi=100, annotate_force=True, backend="python", verbose=True):
+    """
+    Render calculation plots for every row of a connection schedule csv and write an index.
+
+    Args:
+        input_path              str::  schedule csv. See ezbolt.batch for columns
+        output_dir              str::  output folder. Created if it does not exist
+        plots                   list:: (OPTIONAL) any of "preview", "elastic", "ECR", "ICR". Default = all four
+        fmt                     str::  (OPTIONAL) "pdf" (one multi-page file per connection), "png" or "svg"
+                                       (one file per plot). Default = "pdf"
+        processes               int::  (OPTIONAL) number of worker processes. Default = cpu_count(). 1 = run serially
+        chunksize               int::  (OPTIONAL) number of rows read at a time. Default = 1000
+        dpi                     int::  (OPTIONAL) resolution. Default = 100
+        annotate_force          bool:: (OPTIONAL) label bolt forces. Default = True
+        backend                 str::  (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+        verbose                 bool:: (OPTIONAL) print progress after every chunk. Default = True
+
+    Returns:
+        n_rendered, n_failed    int::  number of connections written, and rows that failed or did not converge
+                                       (listed in the index with an error message)
+    """
+    if fmt not in FORMATS:
+        raise RuntimeError("ERROR: fmt must be one of {}".format(FORMATS))
+    for plot in plots:
+        if plot not in PLOTS:
+            raise RuntimeError("ERROR: plots must be from {}".format(tuple(PLOTS)))
+    os.makedirs(output_dir, exist_ok=True)
+    processes = processes or multiprocessing.cpu_count()
+    initargs = (output_dir, tuple(plots), fmt, dpi, annotate_force, backend)
+    writer = ezbolt.batch.ResultWriter(os.path.join(output_dir, "index.csv"), columns=INDEX_COLUMNS)
+    pool = multiprocessing.Pool(processes, _init_worker, initargs) if processes > 1 else None
+    if pool is None:
+        _init_worker(*initargs)
+    n_read = 0
+    n_failed = 0
+    try:
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            if "id" not in chunk.columns:
+                chunk.insert(0, "id", range(n_read, n_read + len(chunk)))
+            records = chunk.to_dict("records")
+            n_read += len(records)
+            if pool is None:
+                rows = list(map(render_record, records))
+            else:
+                rows = pool.map(render_record, records, chunksize=max(1, len(records) // (4 * processes)))
+            n_failed += sum(row["error"] is not None for row in rows)
+            writer.write(rows)
+            if verbose:
+                print("{:,} connections processed. {:,} failed".format(n_read, n_failed))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        else:
+            _worker.clear()
+        writer.close()
+    return n_read - n_failed, n_failed
@@ -0,0 +1,254 @@
+"""
+Lightweight result objects returned by BoltGroup.solve(). Scalar fields are plain floats
+and bools; per-bolt force tables are stored as arrays and only turned into DataFrames when
+accessed. Results still support the original dictionary-style keys, for example
+results["Instant Center of Rotation Method"]["Cu"].
+"""
+import math
+import numpy as np
+import pandas as pd
+
+
+def tabulate(columns, totals):
+    """
+    Build a bolt force table indexed by bolt tag with a "Total" row at the bottom.
+
+    Args:
+        columns         dict:: {column name: per-bolt values}. First column must be "bolt_tag"
+        totals          list:: columns that are summed in the "Total" row
+    """
+    df = pd.DataFrame(columns)
+    sum_row = pd.DataFrame([""] * df.shape[1]).T
+    sum_row.columns = df.columns
+    sum_row["bolt_tag"] = "Total"
+    for column in totals:
+        sum_row[column] = sum(columns[column])
+    df = pd.concat([df, sum_row], ignore_index=True)
+    df = df.set_index("bolt_tag")
+    return df
+
+
+class MethodResult:
+    """
+    Base class for per-method results. The bolt force table is built on first access of .bolt_table
+
+    Attributes:
+        bolt_capacity (float):          - bolt capacity
+        DCR (float):                    - demand capacity ratio. NaN if method not applicable or not converged. Signed
+                                          like connection_demand (negative under pure negative torsion)
+        bolt_table (dataframe):         - bolt force table. None if method not applicable
+    """
+    __slots__ = ("bolt_capacity", "DCR", "_columns", "_totals", "_table")
+    _legacy_keys = {"Bolt Capacity": "bolt_capacity",
+                    "DCR": "DCR",
+                    "Bolt Force Table": "bolt_table"}
+
+    def __init__(self, bolt_capacity, DCR, columns=None, totals=()):
+        self.bolt_capacity = float(bolt_capacity)
+        self.DCR = float(DCR)
+        self._columns = columns
+        self._totals = totals
+        self._table = None
+
+    @property
+    def bolt_table(self):
+        if self._table is None and self._columns is not None:
+            self._table = tabulate(self._columns, self._totals)
+        return self._table
+
+    def column(self, name):
+        """
+        Return one column of the bolt force table as a numpy array without building the DataFrame.
+        """
+        return np.asarray(self._columns[name])
+
+    def _scaled_columns(self, factor):
+        """
+        Bolt force table columns with forces and moments multiplied by factor. Geometry columns are shared.
+        """
+        if self._columns is None:
+            return None
+        return {name: np.asarray(values) * factor if name in self._force_columns else values
+                for name, values in self._columns.items()}
+
+    def __getitem__(self, key):
+        return getattr(self, self._legacy_keys[key])
+
+    def __repr__(self):
+        fields = ", ".join("{}={}".format(k, getattr(self, k)) for k in self._repr_fields)
+        return "{}({})".format(type(self).__name__, fields)
+
+
+class ElasticResult(MethodResult):
+    """
+    Elastic Method - Superposition.
+
+    Attributes:
+        bolt_demand (float):            - maximum bolt resultant force
+    """
+    __slots__ = ("bolt_demand",)
+    _legacy_keys = dict(MethodResult._legacy_keys, **{"Bolt Demand": "bolt_demand"})
+    _repr_fields = ("bolt_demand", "bolt_capacity", "DCR")
+    _force_columns = ("vx_direct", "vx_torsion", "vy_direct", "vy_torsion", "vx_total", "vy_total", "v_resultant", "moment")
+
+    def __init__(self, bolt_demand, bolt_capacity, columns=None, totals=()):
+        super().__init__(bolt_capacity, bolt_demand / bolt_capacity, columns, totals)
+        self.bolt_demand = float(bolt_demand)
+
+    def rescale(self, factor, bolt_capacity):
+        """
+        Result for the same load direction and eccentricity with every load multiplied by factor (> 0)
+        and a new bolt capacity. Bolt forces scale linearly.
+        """
+        return ElasticResult(self.bolt_demand * factor, bolt_capacity, self._scaled_columns(factor), self._totals)
+
+
+class ECRResult(MethodResult):
+    """
+    Elastic Method - Center of Rotation.
+
+    Attributes:
+        applicable (bool):              - False when torsion = 0
+        ECR_x (float):                  - x-coordinate of ECR
+        ECR_y (float):                  - y-coordinate of ECR
+        Ce (float):                     - elastic connection capacity coefficient
+        connection_capacity (float):    - Ce * bolt_capacity
+        connection_demand (float):      - resultant applied force (or torsion if no eccentricity)
+    """
+    __slots__ = ("applicable", "ECR_x", "ECR_y", "Ce", "connection_capacity", "connection_demand")
+    _legacy_keys = dict(MethodResult._legacy_keys, **{"Center of Rotation": "ECR",
+                                                      "Ce": "Ce",
+                                                      "Connection Capacity": "connection_capacity",
+                                                      "Connection Demand": "connection_demand"})
+    _repr_fields = ("ECR", "Ce", "DCR")
+    _force_columns = ("vx", "vy", "v_resultant", "moment", "moment_ECR")
+
+    def __init__(self, bolt_capacity, ECR_x=math.nan, ECR_y=math.nan, Ce=math.nan, connection_demand=math.nan,
+                 columns=None, totals=(), applicable=True):
+        self.applicable = bool(applicable)
+        self.ECR_x = float(ECR_x)
+        self.ECR_y = float(ECR_y)
+        self.Ce = float(Ce)
+        self.connection_capacity = self.Ce * bolt_capacity
+        self.connection_demand = float(connection_demand)
+        super().__init__(bolt_capacity, self.connection_demand / self.connection_capacity if applicable else math.nan,
+                         columns, totals)
+
+    @property
+    def ECR(self):
+        return (self.ECR_x, self.ECR_y)
+
+    def rescale(self, factor, bolt_capacity):
+        """
+        Result for the same load direction and eccentricity with every load multiplied by factor (> 0)
+        and a new bolt capacity. ECR and Ce do not change; bolt forces and demand scale linearly.
+        """
+        if not self.applicable:
+            return ECRResult(bolt_capacity, applicable=False)
+        return ECRResult(bolt_capacity, self.ECR_x, self.ECR_y, self.Ce, self.connection_demand * factor,
+                         self._scaled_columns(factor), self._totals)
+
+
+class ICRResult(MethodResult):
+    """
+    Instant Center of Rotation Method.
+
+    Attributes:
+        applicable (bool):              - False when torsion = 0
+        converged (bool):               - whether Brandt's iteration reached equilibrium
+        n_trials (int):                 - number of trials performed
+        ICR_x (float):                  - x-coordinate of ICR
+        ICR_y (float):                  - y-coordinate of ICR
+        Cu (float):                     - ICR connection capacity coefficient. NaN if not converged
+        connection_capacity (float):    - Cu * bolt_capacity
+        connection_demand (float):      - resultant applied force (or torsion if pure torsion)
+        sensitivities (dict):           - derivatives of Cu, ICR_x, ICR_y. None unless requested. See ezbolt.sensitivity
+        history (array):                - (10 x n_trials) trial history, rows as ezbolt.brandt.brandt_loop(). None if not solved
+        status (str):                   - "exact" if solved (or not applicable), "screened" if the ICR solve was
+                                          skipped because the elastic DCR was below the screening threshold
+    """
+    __slots__ = ("applicable", "converged", "n_trials", "ICR_x", "ICR_y", "Cu", "connection_capacity", "connection_demand",
+                 "sensitivities", "history", "status")
+    _legacy_keys = dict(MethodResult._legacy_keys, **{"ICR": "ICR",
+                                                      "Cu": "Cu",
+                                                      "Connection Capacity": "connection_capacity",
+                                                      "Connection Demand": "connection_demand"})
+    _repr_fields = ("ICR", "Cu", "DCR", "converged", "status")
+    _force_columns = ("force", "moment_ICR", "moment_CG", "Vx", "Vy")
+
+    def __init__(self, bolt_capacity, ICR_x=math.nan, ICR_y=math.nan, Cu=math.nan, connection_demand=math.nan,
+                 columns=None, totals=(), applicable=True, converged=True, n_trials=0, status="exact"):
+        self.status = status
+        self.applicable = bool(applicable)
+        self.converged = bool(converged)
+        self.n_trials = int(n_trials)
+        self.ICR_x = float(ICR_x)
+        self.ICR_y = float(ICR_y)
+        self.Cu = float(Cu) if converged else math.nan
+        self.connection_capacity = self.Cu * bolt_capacity
+        self.connection_demand = float(connection_demand)
+        self.sensitivities = None
+        self.history = None
+        super().__init__(bolt_capacity, self.connection_demand / self.connection_capacity if applicable else math.nan,
+                         columns, totals)
+
+    @property
+    def ICR(self):
+        return (self.ICR_x, self.ICR_y)
+
+    def rescale(self, factor, bolt_capacity):
+        """
+        Result for the same load direction and eccentricity with every load multiplied by factor (> 0)
+        and a new bolt capacity. ICR, Cu and sensitivities do not change; bolt forces and demand scale linearly.
+        """
+        if not self.applicable:
+            return ICRResult(bolt_capacity, applicable=False)
+        result = ICRResult(bolt_capacity, self.ICR_x, self.ICR_y, self.Cu, self.connection_demand * factor,
+                           self._scaled_columns(factor), self._totals, converged=self.converged,
+                           n_trials=self.n_trials, status=self.status)
+        result.sensitivities = self.sensitivities
+        result.history = self.history
+        return result
+
+
+class SolveResult:
+    """
+    Results from all three methods returned by BoltGroup.solve().
+
+    Attributes:
+        elastic (ElasticResult):        - Elastic Method - Superposition
+        ECR (ECRResult):                - Elastic Method - Center of Rotation
+        ICR (ICRResult):                - Instant Center of Rotation Method
+        status (str):                   - "exact" or "screened". See BoltGroup.solve()
+    """
+    __slots__ = ("elastic", "ECR", "ICR")
+    _legacy_keys = {"Elastic Method - Superposition": "elastic",
+                    "Elastic Method - Center of Rotation": "ECR",
+                    "Instant Center of Rotation Method": "ICR"}
+
+    def __init__(self, elastic, ECR, ICR):
+        self.elastic = elastic
+        self.ECR = ECR
+        self.ICR = ICR
+
+    @property
+    def status(self):
+        """
+        "screened" if the ICR solve was skipped by elastic screening, otherwise "exact".
+        """
+        return self.ICR.status
+
+    def rescale(self, factor, bolt_capacity):
+        """
+        Results for the same load direction and eccentricity with every load multiplied by factor (> 0)
+        and a new bolt capacity. See BoltGroup.solve().
+        """
+        return SolveResult(self.elastic.rescale(factor, bolt_capacity),
+                           self.ECR.rescale(factor, bolt_capacity),
+                           self.ICR.rescale(factor, bolt_capacity))
+
+    def __getitem__(self, key):
+        return getattr(self, self._legacy_keys[key])
+
+    def __repr__(self):
+        return "SolveResult(\n    {},\n    {},\n    {})".format(self.elastic, self.ECR, self.ICR)
@@ -0,0 +1,100 @@
+"""
+Missing bolt (N-1) robustness analysis. Each bolt is taken out in turn and the connection is
+re-checked with the remaining bolts. Centroid and polar moment of inertia of each variant are
+downdated in O(1) from the intact group's running sums, and every Brandt search is warm started
+from the intact ICR, which is usually close since removing one bolt only shifts the ICR slightly.
+
+The load acts at a fixed physical point. Loads are given about the intact centroid, so the torsion
+of each variant is transferred to its own centroid: T' = T + (x_cg - x_cg') * Vy - (y_cg - y_cg') * Vx
+"""
+import math
+import numpy as np
+import pandas as pd
+import ezbolt.brandt
+import ezbolt.curves
+import ezbolt.surrogate
+
+
+class NMinusOneResult:
+    """
+    Result of BoltGroup.n_minus_one().
+
+    Attributes:
+        Cu_intact (float):              - Cu of the intact bolt group
+        DCR_intact (float):             - DCR of the intact bolt group
+        table (DataFrame):              - one row per missing bolt (indexed by bolt tag) with columns
+                                          x, y, Cu, DCR, converged, n_trials. Sorted by DCR, governing bolt first,
+                                          non-converged variants (DCR = NaN) last
+        governing_bolt (int):           - tag of the missing bolt with the highest DCR among converged variants.
+                                          None if no variant converged
+        max_DCR (float):                - DCR with the governing bolt missing
+        n_not_converged (int):          - number of variants where the solver did not converge. Check these separately
+    """
+    def __init__(self, Cu_intact, DCR_intact, table):
+        self.Cu_intact = Cu_intact
+        self.DCR_intact = DCR_intact
+        self.table = table.sort_values("DCR", ascending=False, na_position="last")
+        self.n_not_converged = int((~self.table["converged"]).sum())
+        if self.n_not_converged == len(self.table):
+            self.governing_bolt = None
+            self.max_DCR = math.nan
+        else:
+            self.governing_bolt = self.table.index[0]
+            self.max_DCR = float(self.table["DCR"].iloc[0])
+
+    def __repr__(self):
+        return "NMinusOneResult(DCR_intact={:.3f}, governing_bolt={}, max_DCR={:.3f}, n_not_converged={})".format(
+            self.DCR_intact, self.governing_bolt, self.max_DCR, self.n_not_converged)
+
+
+def n_minus_one(bolt_group, Vx, Vy, torsion, bolt_capacity=17.9, backend="python", curve=None):
+    """
+    Re-check the connection with each bolt missing in turn. See BoltGroup.n_minus_one().
+    """
+    curve = ezbolt.curves.get_curve(curve)
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    if V_resultant == 0 and torsion == 0:
+        raise RuntimeError("ERROR: No force applied!")
+    if bolt_group.N_bolt < 3:
+        raise RuntimeError("ERROR: n_minus_one() needs at least 3 bolts")
+    geometry = bolt_group.get_geometry()
+    x = geometry["x"]
+    y = geometry["y"]
+    demand = V_resultant if V_resultant != 0 else abs(torsion)
+
+    def torsion_Cu(x, y, x_cg, y_cg):
+        return float(ezbolt.curves.torsion_Cu(np.sqrt((x - x_cg)**2 + (y - y_cg)**2), curve))
+
+    # intact solution. Its ICR is the warm start for every variant
+    if V_resultant == 0:
+        Cu_intact, icr_guess = torsion_Cu(x, y, bolt_group.x_cg, bolt_group.y_cg), None
+    else:
+        Cu_intact, icr_guess, _ = ezbolt.surrogate.solve_Cu(bolt_group, Vx, Vy, torsion,
+                                                            tol = 0.01 / V_resultant,
+                                                            backend = backend,
+                                                            curve = curve)
+
+    rows = []
+    for i, tag in enumerate(geometry["tag"]):
+        x_i = np.delete(x, i)
+        y_i = np.delete(y, i)
+        x_cg, y_cg, Iz = bolt_group._properties_without(x[i], y[i])
+        if V_resultant == 0:
+            Cu, n_trials = torsion_Cu(x_i, y_i, x_cg, y_cg), 0
+        else:
+            torsion_i = torsion + (bolt_group.x_cg - x_cg) * Vy - (bolt_group.y_cg - y_cg) * Vx
+            hull = ezbolt.brandt.convex_hull(x_i, y_i)
+            Cu, _, n_trials = ezbolt.surrogate.solve_Cu_geometry(x_i, y_i, hull, x_cg, y_cg, Iz, Vx, Vy, torsion_i,
+                                                                 icr_guess = icr_guess,
+                                                                 tol = 0.01 / V_resultant,
+                                                                 backend = backend,
+                                                                 curve = curve)
+        rows.append({"bolt_tag": tag,
+                     "x": x[i],
+                     "y": y[i],
+                     "Cu": Cu,
+                     "DCR": demand / (Cu * bolt_capacity),
+                     "converged": not math.isnan(Cu),
+                     "n_trials": n_trials})
+    table = pd.DataFrame(rows).set_index("bolt_tag")
+    return NMinusOneResult(Cu_intact, demand / (Cu_intact * bolt_capacity), table)
@@ -0,0 +1,133 @@
+"""
+Analytical sensitivities of the ICR solution by implicit differentiation.
+
+At a converged ICR (u, v), Brandt's equilibrium condition can be written per unit load as
+
+    h(u, v; p) = n - (m / S) * T = 0
+
+    n = (cos(angle), sin(angle))            load direction
+    m = (X-u)*sin(angle) - (Y-v)*cos(angle) moment arm of the load about the ICR
+    S = sum(R_i * r_i)                      normalized bolt moment about the ICR
+    T = sum(R_i * t_i)                      normalized bolt force vector
+    R_i = (1 - exp(-10 * 0.34 * r_i / r_max))**0.55  (or a tabulated curve, see ezbolt.curves)
+
+and Cu = |S / m|. Differentiating h = 0 gives dz/dp = -J^-1 * dh/dp with J = dh/dz, so
+sensitivities with respect to every parameter come from one 2x2 solve at the final trial
+instead of additional calls to solve().
+"""
+import math
+import numpy as np
+import ezbolt.brandt
+
+
+D_ULT = ezbolt.brandt.D_ULT
+
+
+def icr_sensitivities(x, y, ICR_x, ICR_y, x_cg, y_cg, ecc_x, ecc_y, theta, curve=None):
+    """
+    Derivatives of Cu and the ICR location with respect to load eccentricity, load angle and
+    bolt coordinates at a converged ICR.
+
+    Bolt coordinate derivatives hold ex and ey fixed, i.e. the load point moves with the
+    centroid (consistent with loads being specified at the centroid in BoltGroup.solve()).
+    If several bolts are tied for the farthest distance from the ICR, the gradient of r_max
+    is averaged over the tied bolts.
+
+    Args:
+        x, y                    array:: bolt coordinates
+        ICR_x, ICR_y            float:: converged ICR
+        x_cg, y_cg              float:: bolt group centroid
+        ecc_x, ecc_y            float:: load eccentricity with respect to CoG
+        theta                   float:: load angle in degrees
+        curve                   obj::   (OPTIONAL) LoadDeformationCurve (see ezbolt.curves). Default = closed-form AISC curve.
+                                        A tabulated curve is differentiated piecewise
+
+    Returns:
+        sensitivities           dict:: {"Cu", "ICR_x", "ICR_y"}. Each entry is a dict with keys
+                                       "ex", "ey" (per in), "angle" (per degree) as floats and
+                                       "x", "y" (per in, one value per bolt) as numpy arrays
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    N_bolt = len(x)
+    ca = math.cos(math.radians(theta))
+    sa = math.sin(math.radians(theta))
+    X = x_cg + ecc_x
+    Y = y_cg + ecc_y
+
+    # bolt geometry with respect to ICR. A bolt sitting on the ICR carries no force or moment
+    a = x - ICR_x
+    b = y - ICR_y
+    r = np.sqrt(a**2 + b**2)
+    active = r != 0
+    r_safe = np.where(active, r, 1.0)
+    r_max = r.max()
+    tied = r >= r_max * (1 - 1e-9)
+    w = tied / tied.sum()
+
+    # normalized force-deformation curve and its slope
+    if curve is None:
+        c = 10 * D_ULT
+        e = np.exp(-c * r / r_max)
+        R = np.where(active, (1 - e)**0.55, 0.0)
+        dR = np.where(active, 0.55 * (1 - np.where(active, e, 0.0))**(-0.45) * c * e, 0.0)
+    else:
+        R = np.where(active, curve.shape(r / r_max), 0.0)
+        dR = np.where(active, curve.slope(r / r_max), 0.0)
+
+    # F = (S, Tx, Ty) = sum(R_i * Q_i)
+    Q = np.array([r, -b / r_safe, a / r_safe]) * active
+    S, Tx, Ty = (R * Q).sum(axis=1)
+    T = np.array([Tx, Ty])
+    m = (X - ICR_x) * sa - (Y - ICR_y) * ca
+
+    # dF/da_j and dF/db_j (3 x N), first holding r_max fixed, then through r_max
+    r3 = r_safe**3
+    dQ_da = np.array([a / r_safe, a * b / r3, b**2 / r3]) * active
+    dQ_db = np.array([b / r_safe, -a**2 / r3, -a * b / r3]) * active
+    G_a = dR * a / (r_safe * r_max) * Q + R * dQ_da
+    G_b = dR * b / (r_safe * r_max) * Q + R * dQ_db
+    dF_drmax = (dR * (-r / r_max**2) * Q).sum(axis=1)
+    G_a = G_a + np.outer(dF_drmax, w * a / r_max)
+    G_b = G_b + np.outer(dF_drmax, w * b / r_max)
+
+    def dh(dF, dm, dn):
+        return dn - np.outer(T, dm) / S - m * dF[1:] / S + m * np.outer(T, dF[0]) / S**2
+
+    def dCu(dF, dm):
+        return np.sign(m) * (dF[0] / m - S * dm / m**2)
+
+    # partials with respect to ICR location. Moving the ICR by +du shifts every a_i by -du
+    dF_dz = np.column_stack([-G_a.sum(axis=1), -G_b.sum(axis=1)])
+    dm_dz = np.array([-sa, ca])
+    J = dh(dF_dz, dm_dz, np.zeros((2, 2)))
+    dCu_dz = dCu(dF_dz, dm_dz)
+
+    # partials with respect to parameters p = [ex, ey, angle, x_1...x_N, y_1...y_N]
+    n_param = 3 + 2 * N_bolt
+    dF_dp = np.zeros((3, n_param))
+    dF_dp[:, 3:3+N_bolt] = G_a
+    dF_dp[:, 3+N_bolt:] = G_b
+    dm_dp = np.concatenate([[sa, -ca, (X - ICR_x) * ca + (Y - ICR_y) * sa],
+                            np.full(N_bolt, sa / N_bolt),
+                            np.full(N_bolt, -ca / N_bolt)])
+    dn_dp = np.zeros((2, n_param))
+    dn_dp[:, 2] = [-sa, ca]
+
+    # implicit differentiation: J * dz/dp = -dh/dp
+    dz_dp = -np.linalg.solve(J, dh(dF_dp, dm_dp, dn_dp))
+    dCu_dp = dCu(dF_dp, dm_dp) + dCu_dz @ dz_dp
+
+    # angle derivatives per degree
+    to_degree = np.ones(n_param)
+    to_degree[2] = math.pi / 180
+
+    sensitivities = dict()
+    for name, values in (("Cu", dCu_dp), ("ICR_x", dz_dp[0]), ("ICR_y", dz_dp[1])):
+        values = values * to_degree
+        sensitivities[name] = {"ex": float(values[0]),
+                               "ey": float(values[1]),
+                               "angle": float(values[2]),
+                               "x": values[3:3+N_bolt],
+                               "y": values[3+N_bolt:]}
+    return sensitivities
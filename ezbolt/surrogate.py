@@ -0,0 +1,414 @@
+"""
+Capacity surrogate for one bolt group. For a fixed bolt pattern, the ICR coefficient Cu only
+depends on the line of action of the load, i.e. the load angle and the perpendicular
+eccentricity e = torsion / V_resultant. Cu is precomputed once over an (angle, ecc) grid and
+any (Vx, Vy, torsion) is then answered by bilinear interpolation together with an error estimate.
+
+The estimate is the bilinear interpolation error bound h**2 / 8 * max|f''| with the second derivatives
+taken from divided differences of the grid values, so it is only as good as those differences: it can
+understate the error where Cu bends sharply between grid points (near-concentric loads on a coarse
+ecc grid), and it does not include the equilibrium tolerance of the grid solves (0.1% of Cu).
+
+Reversing the load gives the same capacity, so (angle, e) and (angle + 180, -e) are the same
+point; the grid only needs e >= 0 and angle is periodic over 360 degrees.
+"""
+import math
+import numpy as np
+import ezbolt.brandt
+import ezbolt.curves
+
+
+# largest number of (case, bolt) pairs build_surrogate() hands to one solve_Cu_batch() call, to bound memory
+BATCH_BOLTS = 1000000
+
+
+class CapacitySurrogate:
+    """
+    Interpolated Cu for one bolt group. Built by BoltGroup.build_surrogate().
+
+    Attributes:
+        angle_grid (array):             - load angles in degrees, sorted in [0, 360)
+        ecc_grid (array):               - perpendicular eccentricities, sorted, >= 0
+        Cu (array):                     - (n_angle x n_ecc) ICR coefficients. NaN where the solver did not converge.
+                                          Queries falling in a cell touching a NaN return NaN; fall back to solve()
+        Cu_torsion (float):             - ICR coefficient for pure torsion (moment per unit bolt capacity)
+        cell_error (array):             - (n_angle x n_ecc-1) interpolation error estimate of every grid cell
+        n_trials (int):                 - total number of Brandt trials spent building the grid
+    """
+    def __init__(self, angle_grid, ecc_grid, Cu, Cu_torsion, n_trials=0):
+        self.angle_grid = np.asarray(angle_grid, dtype=float)
+        self.ecc_grid = np.asarray(ecc_grid, dtype=float)
+        self.Cu = np.asarray(Cu, dtype=float)
+        self.Cu_torsion = float(Cu_torsion)
+        self.n_trials = int(n_trials)
+
+        # close the angle grid so the last cell wraps around to the first angle
+        self._angles = np.append(self.angle_grid, self.angle_grid[0] + 360)
+        self._Cu = np.vstack([self.Cu, self.Cu[:1]])
+        self.cell_error = self._cell_error()
+
+    def _cell_error(self):
+        """
+        Bilinear interpolation error estimate per cell: h_angle^2/8 * max|d2Cu/dangle2| + h_ecc^2/8 * max|d2Cu/decc2|,
+        with second derivatives estimated from divided differences at the four corner nodes. A bound only
+        if those differences bound the second derivatives within the cell (see the module docstring).
+        """
+        n_angle, n_ecc = self.Cu.shape
+        f = self.Cu
+        if n_ecc < 3 or n_angle < 3:
+            return np.full((n_angle, n_ecc - 1), math.inf)
+
+        # second derivative along angle (periodic)
+        h = np.diff(self._angles)
+        h_prev = np.roll(h, 1)
+        slope = (np.roll(f, -1, axis=0) - f) / h[:, None]
+        slope_prev = (f - np.roll(f, 1, axis=0)) / h_prev[:, None]
+        f_aa = np.abs(2 * (slope - slope_prev) / (h + h_prev)[:, None])
+
+        # second derivative along ecc. End nodes take the value of their neighbor
+        e = self.ecc_grid
+        slope = np.diff(f, axis=1) / np.diff(e)
+        f_ee = np.abs(2 * np.diff(slope, axis=1) / (e[2:] - e[:-2]))
+        f_ee = np.hstack([f_ee[:, :1], f_ee, f_ee[:, -1:]])
+
+        # max over the four corners of every cell
+        def corner_max(g):
+            g = np.vstack([g, g[:1]])
+            g = np.maximum(g[:-1], g[1:])
+            return np.maximum(g[:, :-1], g[:, 1:])
+        return h[:, None]**2 / 8 * corner_max(f_aa) + np.diff(e)**2 / 8 * corner_max(f_ee)
+
+    def query(self, Vx, Vy, torsion):
+        """
+        Interpolate Cu for applied loads. Inputs may be floats or arrays of equal length.
+
+        Returns:
+            Cu                  float or array:: interpolated ICR coefficient. NaN if the eccentricity is outside
+                                                 ecc_grid or the cell contains a non-converged grid point
+            error               float or array:: estimated interpolation error of Cu. inf where Cu is NaN.
+                                                 Pure torsion is exact (error = 0)
+        """
+        scalar = np.ndim(Vx) == 0 and np.ndim(Vy) == 0 and np.ndim(torsion) == 0
+        Vx, Vy, torsion = np.broadcast_arrays(np.asarray(Vx, dtype=float),
+                                              np.asarray(Vy, dtype=float),
+                                              np.asarray(torsion, dtype=float))
+        Vx, Vy, torsion = Vx.ravel(), Vy.ravel(), torsion.ravel()
+        V = np.sqrt(Vx**2 + Vy**2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ecc = torsion / V
+            ecc = np.where(V == 0, 0.0, ecc)
+        angle = np.degrees(np.arctan2(Vy, Vx))
+
+        # (angle, -e) is the same point as (angle + 180, e)
+        angle = np.where(ecc < 0, angle + 180, angle)
+        ecc = np.abs(ecc)
+        angle = (angle - self._angles[0]) % 360 + self._angles[0]
+
+        # locate cells
+        n_angle, n_ecc = self.Cu.shape
+        i = np.clip(np.searchsorted(self._angles, angle, side="right") - 1, 0, n_angle - 1)
+        j = np.clip(np.searchsorted(self.ecc_grid, ecc, side="right") - 1, 0, n_ecc - 2)
+        in_range = (ecc >= self.ecc_grid[0]) & (ecc <= self.ecc_grid[-1])
+
+        # bilinear interpolation
+        ta = (angle - self._angles[i]) / (self._angles[i+1] - self._angles[i])
+        te = (ecc - self.ecc_grid[j]) / (self.ecc_grid[j+1] - self.ecc_grid[j])
+        Cu = ((1-ta) * (1-te) * self._Cu[i, j] + ta * (1-te) * self._Cu[i+1, j] +
+              (1-ta) * te * self._Cu[i, j+1] + ta * te * self._Cu[i+1, j+1])
+        error = self.cell_error[i, j]
+        Cu = np.where(in_range, Cu, math.nan)
+
+        # pure torsion is solved exactly. No load at all is undefined
+        Cu = np.where(V == 0, self.Cu_torsion, Cu)
+        Cu = np.where((V == 0) & (torsion == 0), math.nan, Cu)
+        error = np.where(V == 0, 0.0, error)
+        error = np.where(np.isnan(Cu), math.inf, error)
+        if scalar:
+            return float(Cu[0]), float(error[0])
+        return Cu, error
+
+    def DCR(self, Vx, Vy, torsion, bolt_capacity=17.9):
+        """
+        Demand capacity ratio from the interpolated Cu. Demand is the resultant force (or torsion if pure torsion).
+
+        Returns:
+            DCR                 float or array:: demand / (Cu * bolt_capacity)
+            DCR_upper           float or array:: demand / ((Cu - error) * bolt_capacity). Conservative within the
+                                                     error estimate
+        """
+        Cu, error = self.query(Vx, Vy, torsion)
+        V = np.sqrt(np.asarray(Vx, dtype=float)**2 + np.asarray(Vy, dtype=float)**2)
+        demand = np.where(V == 0, np.abs(torsion), V)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            DCR = demand / (Cu * bolt_capacity)
+            DCR_upper = np.where(Cu - error > 0, demand / ((Cu - error) * bolt_capacity), math.inf)
+        if np.ndim(DCR) == 0:
+            return float(DCR), float(DCR_upper)
+        return DCR, DCR_upper
+
+    def __repr__(self):
+        return "CapacitySurrogate({} angles x {} eccentricities, {} not converged, max cell error estimate = {:.3g})".format(
+            len(self.angle_grid), len(self.ecc_grid), int(np.isnan(self.Cu).sum()), np.nanmax(self.cell_error))
+
+
+def solve_Cu(bolt_group, Vx, Vy, torsion, icr_guess=None, tol=0.01, backend="python", curve=None):
+    """
+    Cu of a bolt group for the given load. Runs Brandt's loop directly (without the elastic methods or
+    result tables) with the load placed exactly as in BoltGroup.solve(), so the same load converges the
+    same way. Brandt's iteration is sensitive to its inputs; reusing solve()'s setup keeps results consistent.
+
+    Args:
+        bolt_group          BoltGroup:: bolt group
+        Vx, Vy, torsion     float:: applied load. Only the line of action matters, not the magnitude
+        icr_guess           tuple:: (OPTIONAL) (x, y) warm start. Retried cold if the warm start fails
+        tol                 float:: (OPTIONAL) equilibrium tolerance as a fraction of the load. Default = 0.01
+        backend             str::   (OPTIONAL) ICR backend. "python" or "numba". Default = "python"
+        curve               obj::   (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+
+    Returns:
+        Cu                  float:: ICR coefficient (moment per unit bolt capacity under pure torsion). NaN if not converged
+        ICR                 tuple:: (x, y) of converged ICR (the centroid under pure torsion). None if not converged or
+                                    torsion = 0
+        n_trials            int::   number of Brandt trials
+    """
+    geometry = bolt_group.get_geometry()
+    return solve_Cu_geometry(geometry["x"], geometry["y"], geometry["hull"], bolt_group.x_cg, bolt_group.y_cg,
+                             bolt_group.Iz, Vx, Vy, torsion, icr_guess, tol, backend, curve)
+
+
+def solve_Cu_geometry(x, y, hull, x_cg, y_cg, Iz, Vx, Vy, torsion, icr_guess=None, tol=0.01, backend="python",
+                      curve=None):
+    """
+    Same as solve_Cu() for a bolt pattern given as plain arrays, so that many perturbed patterns
+    can be solved without building a BoltGroup for each. Loads are about (x_cg, y_cg).
+
+    Args:
+        x, y                array:: bolt coordinates
+        hull                array:: indices of bolts on the convex hull. See ezbolt.brandt.convex_hull()
+        x_cg, y_cg, Iz      float:: centroid and polar moment of inertia of the bolt pattern
+        (other arguments and return values as in solve_Cu())
+    """
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    curve = ezbolt.curves.get_curve(curve)
+
+    # concentric load: ICR at infinity, every bolt reaches the same deformation ratio of 1.0
+    if torsion == 0:
+        return ezbolt.curves.concentric_Cu(len(x), curve), None, 0
+
+    # pure torsion: ICR at centroid
+    if V_resultant == 0:
+        ro = np.hypot(np.asarray(x, dtype=float) - x_cg, np.asarray(y, dtype=float) - y_cg)
+        return float(ezbolt.curves.torsion_Cu(ro, curve)), (x_cg, y_cg), 0
+
+    # AISC eccentricity (ey = 0 unless the load is horizontal). Brandt's step size heuristic is tuned to it
+    if Vy == 0:
+        ecc_x, ecc_y = 0.0, -torsion / Vx
+    else:
+        ecc_x, ecc_y = torsion / Vy, 0.0
+    args = dict(x = x,
+                y = y,
+                Vx = Vx,
+                Vy = Vy,
+                torsion = torsion,
+                ecc_x = ecc_x,
+                ecc_y = ecc_y,
+                x_cg = x_cg,
+                y_cg = y_cg,
+                Iz = Iz,
+                stepsize_factor = ezbolt.brandt.stepsize_factor(math.sqrt(ecc_x**2 + ecc_y**2)),
+                tol = tol * V_resultant,
+                backend = backend,
+                hull = hull,
+                curve = curve)
+    n_trials, converged, hist = ezbolt.brandt.run(icr_guess=icr_guess, **args)
+    if not converged and icr_guess is not None:
+        n_cold, converged, hist = ezbolt.brandt.run(**args)
+        n_trials += n_cold
+    if not converged:
+        return math.nan, None, n_trials
+    return hist[6, -1], (hist[0, -1], hist[1, -1]), n_trials
+
+
+def pad_coordinates(coordinates):
+    """
+    Stack bolt patterns of different sizes into padded arrays for solve_Cu_batch().
+
+    Args:
+        coordinates         list:: (x, y) coordinate arrays of every bolt pattern
+
+    Returns:
+        x, y                array:: (G x N_max) bolt coordinates. Padding is NaN
+        mask                array:: (G x N_max) True for real bolts
+    """
+    N_max = max(len(x) for x, _ in coordinates)
+    x = np.full((len(coordinates), N_max), math.nan)
+    y = np.full((len(coordinates), N_max), math.nan)
+    for k, (x_k, y_k) in enumerate(coordinates):
+        x[k, :len(x_k)] = x_k
+        y[k, :len(y_k)] = y_k
+    return x, y, ~np.isnan(x)
+
+
+def solve_Cu_batch(x, y, Vx, Vy, torsion, mask=None, x_cg=None, y_cg=None, Iz=None, icr_guess=None, tol=0.01,
+                   max_iter=1000, curve=None):
+    """
+    Same as solve_Cu_geometry() for many bolt patterns and load cases at once. Brandt's iteration runs
+    for every case in lockstep with NumPy (see ezbolt.brandt.brandt_batch()), so throughput on one core
+    is set by array arithmetic rather than per-solve interpreter overhead. Loads are about each
+    pattern's centroid.
+
+    Args:
+        x, y                array:: (G x N_max) bolt coordinates, one row per case. See pad_coordinates()
+        Vx, Vy, torsion     array:: (G) applied loads (scalars are broadcast)
+        mask                array:: (OPTIONAL) (G x N_max) True for real bolts. Default = coordinates that are not NaN
+        x_cg, y_cg, Iz      array:: (OPTIONAL) (G) centroids and polar moments of inertia. Computed if not given
+        icr_guess           array:: (OPTIONAL) (G x 2) warm starts. NaN rows start cold. Failed warm starts are retried cold
+        tol                 float:: (OPTIONAL) equilibrium tolerance as a fraction of the load. Default = 0.01
+        max_iter            int::   (OPTIONAL) maximum number of iterations. Default = 1000
+        curve               obj::   (OPTIONAL) bolt load-deformation curve. See ezbolt.curves. Default = AISC (closed form)
+
+    Returns:
+        Cu                  array:: (G) ICR coefficients (moment per unit bolt capacity under pure torsion). NaN if not
+                                    converged
+        ICR                 array:: (G x 2) converged ICR (the centroid under pure torsion). NaN if not converged or
+                                    torsion = 0
+        n_trials            array:: (G) number of Brandt trials
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    mask = ~np.isnan(x) if mask is None else np.asarray(mask, dtype=bool)
+    G = x.shape[0]
+    Vx, Vy, torsion = [np.broadcast_to(np.asarray(v, dtype=float), (G,)) for v in (Vx, Vy, torsion)]
+    N_bolt = mask.sum(axis=1)
+    if x_cg is None:
+        x_cg = np.where(mask, x, 0).sum(axis=1) / N_bolt
+        y_cg = np.where(mask, y, 0).sum(axis=1) / N_bolt
+        Iz = np.where(mask, (x - x_cg[:, None])**2 + (y - y_cg[:, None])**2, 0).sum(axis=1)
+    x_cg, y_cg, Iz = [np.broadcast_to(np.asarray(v, dtype=float), (G,)) for v in (x_cg, y_cg, Iz)]
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    curve = ezbolt.curves.get_curve(curve)
+
+    # concentric load: ICR at infinity, every bolt reaches the same deformation ratio of 1.0
+    Cu = ezbolt.curves.concentric_Cu(N_bolt, curve)
+    ICR = np.full((G, 2), math.nan)
+    n_trials = np.zeros(G, dtype=int)
+
+    # pure torsion: ICR at centroid
+    torsion_only = np.flatnonzero((V_resultant == 0) & (torsion != 0))
+    if len(torsion_only) > 0:
+        k = torsion_only
+        ro = np.where(mask[k], np.hypot(x[k] - x_cg[k, None], y[k] - y_cg[k, None]), 0.0)
+        Cu[k] = ezbolt.curves.torsion_Cu(ro, curve)
+        ICR[k, 0] = x_cg[k]
+        ICR[k, 1] = y_cg[k]
+    solve = np.flatnonzero((V_resultant != 0) & (torsion != 0))
+    if len(solve) == 0:
+        return Cu, ICR, n_trials
+
+    # AISC eccentricity (ey = 0 unless the load is horizontal). Brandt's step size heuristic is tuned to it
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ecc_x = np.where(Vy != 0, torsion / Vy, 0.0)
+        ecc_y = np.where(Vy != 0, 0.0, -torsion / Vx)
+    step = ezbolt.brandt.stepsize_factor(np.sqrt(ecc_x**2 + ecc_y**2))
+    args = [x.T, y.T, mask.T, Vx, Vy, torsion, ecc_x, ecc_y, x_cg, y_cg, Iz, step, tol * V_resultant]
+    if icr_guess is None:
+        guess = np.full((G, 2), math.nan)
+    else:
+        guess = np.broadcast_to(np.asarray(icr_guess, dtype=float), (G, 2))
+
+    def run(cases, guess):
+        sub = [v[:, cases] if v.ndim == 2 else v[cases] for v in args]
+        return ezbolt.brandt.brandt_batch(*sub, max_iter=max_iter, ICR0_x=guess[:, 0], ICR0_y=guess[:, 1], curve=curve)
+
+    n, converged, ICR_x, ICR_y, Cu_solved = run(solve, guess[solve])
+    n_trials[solve] = n
+    retry = ~converged & ~np.isnan(guess[solve]).any(axis=1)
+    if retry.any():
+        cases = solve[retry]
+        n, converged[retry], ICR_x[retry], ICR_y[retry], Cu_solved[retry] = run(cases, np.full((len(cases), 2), math.nan))
+        n_trials[cases] += n
+    Cu[solve] = np.where(converged, Cu_solved, math.nan)
+    ICR[solve, 0] = np.where(converged, ICR_x, math.nan)
+    ICR[solve, 1] = np.where(converged, ICR_y, math.nan)
+    return Cu, ICR, n_trials
+
+
+def _solve_grid_batch(bolt_group, Vx, Vy, torsion, icr_guess, curve):
+    """
+    solve_Cu_batch() for many load cases on one bolt group, in chunks of at most BATCH_BOLTS (case, bolt) pairs.
+    """
+    geometry = bolt_group.get_geometry()
+    N_bolt = len(geometry["x"])
+    size = max(1, BATCH_BOLTS // N_bolt)
+    Cu = np.full(len(Vx), math.nan)
+    ICR = np.full((len(Vx), 2), math.nan)
+    n_trials = np.zeros(len(Vx), dtype=int)
+    for k in range(0, len(Vx), size):
+        chunk = slice(k, k + size)
+        n = len(Vx[chunk])
+        Cu[chunk], ICR[chunk], n_trials[chunk] = solve_Cu_batch(np.broadcast_to(geometry["x"], (n, N_bolt)),
+                                                                np.broadcast_to(geometry["y"], (n, N_bolt)),
+                                                                Vx[chunk], Vy[chunk], torsion[chunk],
+                                                                mask = np.ones((n, N_bolt), dtype=bool),
+                                                                x_cg = bolt_group.x_cg,
+                                                                y_cg = bolt_group.y_cg,
+                                                                Iz = bolt_group.Iz,
+                                                                icr_guess = None if icr_guess is None else icr_guess[chunk],
+                                                                tol = 1e-3,
+                                                                curve = curve)
+    return Cu, ICR, n_trials
+
+
+def build_surrogate(bolt_group, angle_grid, ecc_grid, backend="python", curve=None, batched=True):
+    """
+    Precompute Cu of a bolt group over an (angle, ecc) grid. See BoltGroup.build_surrogate().
+
+    With batched = True, the whole grid is solved in lockstep with solve_Cu_batch() (backend is not used).
+    Cases that do not converge from Brandt's elastic estimate are solved again from the ICR of the next
+    larger eccentricity at the same angle, as long as that one converged. Otherwise each angle is swept
+    from the largest to the smallest eccentricity on backend and every solve is warm started from the ICR
+    of the previous eccentricity. A warm start that fails to converge is retried cold.
+    """
+    curve = ezbolt.curves.get_curve(curve)
+    angle_grid = np.unique(np.asarray(angle_grid, dtype=float) % 360)
+    ecc_grid = np.unique(np.asarray(ecc_grid, dtype=float))
+    if len(angle_grid) < 2 or len(ecc_grid) < 2:
+        raise RuntimeError("ERROR: angle_grid and ecc_grid need at least two values each")
+    if ecc_grid[0] < 0:
+        raise RuntimeError("ERROR: ecc_grid must be >= 0. Negative eccentricity is covered by angle + 180")
+
+    # Cu is independent of load magnitude. Solve with a unit load and an equilibrium tolerance of 0.1% of the load
+    shape = (len(angle_grid), len(ecc_grid))
+    if batched:
+        # one case per grid point, eccentricity along the fast axis so case k + 1 is the next larger eccentricity
+        i, j = np.indices(shape).reshape(2, -1)
+        radians = np.radians(angle_grid)[i]
+        Vx, Vy, torsion = np.cos(radians), np.sin(radians), ecc_grid[j]
+        Cu, ICR, n_trials = _solve_grid_batch(bolt_group, Vx, Vy, torsion, None, curve)
+        n_trials_total = int(n_trials.sum())
+        tried = ~np.isnan(Cu)
+        while True:
+            retry = np.flatnonzero(~tried & (j < len(ecc_grid) - 1))
+            retry = retry[~np.isnan(ICR[retry + 1, 0])]
+            if len(retry) == 0:
+                break
+            tried[retry] = True
+            Cu[retry], ICR[retry], n_trials = _solve_grid_batch(bolt_group, Vx[retry], Vy[retry], torsion[retry],
+                                                                ICR[retry + 1], curve)
+            n_trials_total += int(n_trials.sum())
+        Cu = Cu.reshape(shape)
+    else:
+        Cu = np.full(shape, math.nan)
+        n_trials_total = 0
+        for i, angle in enumerate(angle_grid):
+            Vx = math.cos(math.radians(angle))
+            Vy = math.sin(math.radians(angle))
+            icr_guess = None
+            for j in reversed(range(len(ecc_grid))):
+                Cu[i, j], icr_guess, n_trials = solve_Cu(bolt_group, Vx, Vy, ecc_grid[j], icr_guess, tol=1e-3,
+                                                         backend=backend, curve=curve)
+                n_trials_total += n_trials
+
+    # pure torsion: ICR at centroid
+    Cu_torsion = float(ezbolt.curves.torsion_Cu(bolt_group.get_geometry()["ro"], curve))
+    return CapacitySurrogate(angle_grid, ecc_grid, Cu, Cu_torsion, n_trials_total)
@@ -0,0 +1,194 @@
+"""
+Monte Carlo analysis of bolt placement tolerances. Every bolt of the nominal pattern is displaced
+by a random offset (hole oversizing, misdrilled holes) and Cu is solved for each sample.
+
+Samples are held as (n_samples x N_bolt) coordinate arrays. Centroids, polar moments of inertia and
+the shifted torsion are computed for all samples at once, and each Brandt search runs directly on the
+sample arrays (no BoltGroup is built), warm started from the nominal ICR. With the "python" backend
+all samples of a chunk are iterated in lockstep with NumPy. Chunks of samples can be spread over a
+process pool.
+
+The load acts at a fixed physical point. Loads are given about the nominal centroid, so the torsion of
+each sample is transferred to its own centroid: T' = T + (x_cg - x_cg') * Vy - (y_cg - y_cg') * Vx
+"""
+import math
+import multiprocessing
+import numpy as np
+import ezbolt.brandt
+import ezbolt.curves
+import ezbolt.surrogate
+
+
+DISTRIBUTIONS = ("uniform", "normal")
+
+
+class ToleranceResult:
+    """
+    Cu distribution from BoltGroup.monte_carlo().
+
+    Attributes:
+        Cu (array):                     - Cu of every sample. NaN where the solver did not converge
+        Cu_nominal (float):             - Cu of the nominal pattern
+        x, y (array):                   - (n_samples x N_bolt) sampled bolt coordinates
+        tolerance (float):              - displacement tolerance
+        distribution (str):             - "uniform" or "normal"
+        n_samples (int):                - number of samples
+        n_not_converged (int):          - number of samples where the solver did not converge
+        n_trials (int):                 - total number of Brandt trials
+    """
+    def __init__(self, Cu, Cu_nominal, x, y, tolerance, distribution, n_trials):
+        self.Cu = Cu
+        self.Cu_nominal = float(Cu_nominal)
+        self.x = x
+        self.y = y
+        self.tolerance = tolerance
+        self.distribution = distribution
+        self.n_samples = len(Cu)
+        self.n_not_converged = int(np.isnan(Cu).sum())
+        self.n_trials = n_trials
+
+    def percentiles(self, q=(1, 5, 50, 95, 99)):
+        """
+        Percentiles of Cu over converged samples.
+
+        Args:
+            q                   list:: (OPTIONAL) percentiles between 0 and 100. Default = (1, 5, 50, 95, 99)
+
+        Returns:
+            percentiles         dict:: {q: Cu}
+        """
+        values = np.nanpercentile(self.Cu, q)
+        return {p: float(v) for p, v in zip(q, values)}
+
+    @property
+    def summary(self):
+        """
+        Summary statistics of Cu. "ratio_5" is the 5th percentile divided by the nominal Cu.
+        """
+        p5 = float(np.nanpercentile(self.Cu, 5))
+        return {"Cu_nominal": self.Cu_nominal,
+                "mean": float(np.nanmean(self.Cu)),
+                "std": float(np.nanstd(self.Cu)),
+                "min": float(np.nanmin(self.Cu)),
+                "p5": p5,
+                "p50": float(np.nanpercentile(self.Cu, 50)),
+                "p95": float(np.nanpercentile(self.Cu, 95)),
+                "max": float(np.nanmax(self.Cu)),
+                "ratio_5": p5 / self.Cu_nominal,
+                "n_samples": self.n_samples,
+                "n_not_converged": self.n_not_converged}
+
+    def __repr__(self):
+        return "ToleranceResult(n_samples={}, Cu_nominal={:.4g}, Cu_p5={:.4g}, Cu_p50={:.4g}, n_not_converged={})".format(
+            self.n_samples, self.Cu_nominal, np.nanpercentile(self.Cu, 5), np.nanpercentile(self.Cu, 50),
+            self.n_not_converged)
+
+
+def sample_coordinates(x, y, tolerance, n_samples, distribution="uniform", seed=None):
+    """
+    Random bolt coordinates around a nominal pattern.
+
+    Args:
+        x, y                array:: nominal bolt coordinates
+        tolerance           float:: "uniform": every bolt lands uniformly within a circle of this radius.
+                                    "normal": x and y offsets have this standard deviation
+        n_samples           int::   number of samples
+        distribution        str::   (OPTIONAL) "uniform" or "normal". Default = "uniform"
+        seed                int::   (OPTIONAL) random seed
+
+    Returns:
+        xs, ys              array:: (n_samples x N_bolt) sampled coordinates
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise RuntimeError("ERROR: distribution must be one of {}".format(DISTRIBUTIONS))
+    rng = np.random.default_rng(seed)
+    shape = (n_samples, len(x))
+    if distribution == "uniform":
+        radius = tolerance * np.sqrt(rng.random(shape))
+        angle = 2 * math.pi * rng.random(shape)
+        dx, dy = radius * np.cos(angle), radius * np.sin(angle)
+    else:
+        dx, dy = tolerance * rng.standard_normal(shape), tolerance * rng.standard_normal(shape)
+    return np.asarray(x, dtype=float) + dx, np.asarray(y, dtype=float) + dy
+
+
+def _solve_samples(xs, ys, Vx, Vy, torsion, icr_guess, backend, curve=None):
+    """
+    Cu of every sample for a load given about each sample's own centroid. torsion is an array.
+    The "python" backend advances all samples in lockstep (ezbolt.surrogate.solve_Cu_batch()),
+    other backends run the compiled loop once per sample.
+    """
+    n_samples, N_bolt = xs.shape
+    x_cg = xs.mean(axis=1)
+    y_cg = ys.mean(axis=1)
+    Iz = ((xs - x_cg[:, None])**2 + (ys - y_cg[:, None])**2).sum(axis=1)
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    if backend == "python":
+        Cu, _, n_trials = ezbolt.surrogate.solve_Cu_batch(xs, ys, Vx, Vy, torsion,
+                                                          x_cg = x_cg,
+                                                          y_cg = y_cg,
+                                                          Iz = Iz,
+                                                          icr_guess = icr_guess,
+                                                          tol = 0.01 / V_resultant,
+                                                          curve = curve)
+        return Cu, int(n_trials.sum())
+    Cu = np.full(n_samples, math.nan)
+    n_trials = 0
+    for k in range(n_samples):
+        hull = ezbolt.brandt.convex_hull(xs[k], ys[k])
+        Cu[k], _, n = ezbolt.surrogate.solve_Cu_geometry(xs[k], ys[k], hull, x_cg[k], y_cg[k], Iz[k], Vx, Vy, torsion[k],
+                                                          icr_guess = icr_guess,
+                                                          tol = 0.01 / V_resultant,
+                                                          backend = backend,
+                                                          curve = curve)
+        n_trials += n
+    return Cu, n_trials
+
+
+def _solve_samples_star(args):
+    return _solve_samples(*args)
+
+
+def monte_carlo(bolt_group, Vx, Vy, torsion, tolerance=1/16, n_samples=1000, distribution="uniform", seed=None,
+                processes=1, backend="python", curve=None):
+    """
+    Cu distribution under random bolt placement. See BoltGroup.monte_carlo().
+    """
+    if Vx == 0 and Vy == 0 and torsion == 0:
+        raise RuntimeError("ERROR: No force applied!")
+    curve = ezbolt.curves.get_curve(curve)
+    geometry = bolt_group.get_geometry()
+    xs, ys = sample_coordinates(geometry["x"], geometry["y"], tolerance, n_samples, distribution, seed)
+
+    # pure torsion: ICR at each sample's centroid, no iteration needed
+    if Vx == 0 and Vy == 0:
+        ro = np.sqrt((xs - xs.mean(axis=1, keepdims=True))**2 + (ys - ys.mean(axis=1, keepdims=True))**2)
+        Cu = ezbolt.curves.torsion_Cu(ro, curve)
+        Cu_nominal = float(ezbolt.curves.torsion_Cu(geometry["ro"], curve))
+        return ToleranceResult(Cu, Cu_nominal, xs, ys, tolerance, distribution, 0)
+
+    # nominal solution. Its ICR is the warm start for every sample
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    Cu_nominal, icr_guess, n_trials = ezbolt.surrogate.solve_Cu(bolt_group, Vx, Vy, torsion,
+                                                                tol = 0.01 / V_resultant,
+                                                                backend = backend,
+                                                                curve = curve)
+
+    # transfer torsion from the nominal centroid to each sample's centroid
+    torsion_shifted = (torsion + (bolt_group.x_cg - xs.mean(axis=1)) * Vy
+                       - (bolt_group.y_cg - ys.mean(axis=1)) * Vx)
+
+    # solve chunks of samples, serially or across a process pool
+    processes = processes or multiprocessing.cpu_count()
+    bounds = np.linspace(0, n_samples, min(processes, n_samples) + 1).astype(int)
+    tasks = [(xs[i:j], ys[i:j], Vx, Vy, torsion_shifted[i:j], icr_guess, backend, curve) for i, j in zip(bounds[:-1], bounds[1:])]
+    if processes > 1:
+        with multiprocessing.Pool(processes) as pool:
+            outputs = pool.map(_solve_samples_star, tasks)
+    else:
+        outputs = map(_solve_samples_star, tasks)
+    Cu = []
+    for Cu_chunk, n in outputs:
+        Cu.append(Cu_chunk)
+        n_trials += n
+    return ToleranceResult(np.concatenate(Cu), Cu_nominal, xs, ys, tolerance, distribution, n_trials)
@@ -0,0 +1,250 @@
+"""
+Nearest-neighbor warm starts for Brandt's iteration. For a fixed bolt pattern, the ICR only depends on
+the line of action of the load: its angle and the perpendicular eccentricity e = torsion / V. Every
+converged ICR is kept in a small per-geometry index, and a new solve starts from the ICR of the nearest
+stored line of action instead of Brandt's elastic estimate, in whatever order the cases arrive.
+
+Lines of action are normalized as in ezbolt.cache ((angle, -e) is (angle + 180, e)) and mapped to points
+
+    (cos(angle), sin(angle), 2 * e / (e + r))
+
+where r = sqrt(Iz / N) is the radius of gyration of the bolt pattern, so eccentricities are compared
+relative to the size of the group and the angle wraps around. The points are held in a 3-d KD-tree.
+Each index keeps at most max_entries solutions and evicts the least recently used one beyond that;
+the per-process registry used by get_index() keeps at most MAX_GEOMETRIES indexes the same way.
+
+The stored ICR is carried over to the new load the way Brandt's elastic estimate would move: rotated
+about the centroid by the difference in angle and scaled by the ratio of eccentricities. Near-concentric
+loads (e < MIN_ECC * r), whose ICR lies far outside the group and moves quickly with the load, are not
+warm started. A warm start that has not converged within MAX_WARM_TRIALS trials is retried cold, so a
+poor neighbor costs trials but never a failed solve. Results agree with cold solves to within the
+equilibrium tolerance, not bit for bit.
+Indexes are locked internally and can be shared between threads.
+"""
+import collections
+import math
+import threading
+import ezbolt.batch
+
+
+MAX_ENTRIES = 256
+MAX_GEOMETRIES = 1000
+MAX_WARM_TRIALS = 60
+MIN_ECC = 0.5
+_indexes = collections.OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+class _Node:
+    """
+    KD-tree node. entry is None once the solution has been evicted (removed at the next rebuild).
+    """
+    __slots__ = ("point", "entry", "axis", "left", "right")
+
+    def __init__(self, point, entry, axis):
+        self.point = point
+        self.entry = entry
+        self.axis = axis
+        self.left = None
+        self.right = None
+
+
+class WarmStartIndex:
+    """
+    Converged ICR locations of one bolt pattern, indexed by line of action. See get_index().
+
+    Args:
+        scale               float:: radius of gyration of the bolt pattern sqrt(Iz / N). Eccentricities are normalized by it
+        max_entries         int::   (OPTIONAL) maximum number of stored solutions. Default = 256
+
+    Attributes:
+        hits (int):                     - lookups that returned a stored ICR
+        misses (int):                   - lookups on an empty index
+    """
+    def __init__(self, scale, max_entries=MAX_ENTRIES):
+        if max_entries < 1:
+            raise RuntimeError("ERROR: max_entries must be at least 1")
+        self.scale = float(scale) if scale > 0 else 1.0
+        self.max_entries = int(max_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._next_id = 0
+        self._root = None
+        self._n_changes = 0
+
+    def _point(self, angle, ecc):
+        theta = math.radians(angle)
+        return (math.cos(theta), math.sin(theta), 2 * ecc / (ecc + self.scale))
+
+    def _nearest(self, point):
+        """
+        Live node closest to point, or None. Branches farther than the best distance so far are skipped.
+        """
+        best_d2 = math.inf
+        best = None
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            if node is None or bound >= best_d2:
+                continue
+            if node.entry is not None:
+                d2 = ((node.point[0] - point[0])**2 + (node.point[1] - point[1])**2 + (node.point[2] - point[2])**2)
+                if d2 < best_d2:
+                    best_d2, best = d2, node
+            diff = point[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            stack.append((far, diff**2))
+            stack.append((near, 0.0))
+        return best, best_d2
+
+    def _build(self, nodes, depth=0):
+        """
+        Balanced subtree from a list of nodes, splitting at the median of each axis in turn.
+        """
+        if not nodes:
+            return None
+        axis = depth % 3
+        nodes.sort(key=lambda node: node.point[axis])
+        k = len(nodes) // 2
+        node = nodes[k]
+        node.axis = axis
+        node.left = self._build(nodes[:k], depth + 1)
+        node.right = self._build(nodes[k+1:], depth + 1)
+        return node
+
+    def _insert_node(self, node):
+        if self._root is None:
+            node.axis = 0
+            self._root = node
+            return
+        parent = self._root
+        depth = 0
+        while True:
+            depth += 1
+            side = "left" if node.point[parent.axis] < parent.point[parent.axis] else "right"
+            child = getattr(parent, side)
+            if child is None:
+                node.axis = depth % 3
+                setattr(parent, side, node)
+                return
+            parent = child
+
+    def nearest(self, angle, ecc):
+        """
+        Warm start for a line of action, as an offset (dx, dy) from the centroid: the ICR of the nearest
+        stored line of action, rotated by the difference in angle and scaled by the ratio of eccentricities
+        (the elastic ICR lies at r**2 / e from the centroid, perpendicular to the load). None if the index
+        is empty or the load is nearly concentric (ecc < MIN_ECC * r).
+        """
+        if ecc < MIN_ECC * self.scale:
+            return None
+        with self._lock:
+            node, _ = self._nearest(self._point(angle, ecc))
+            if node is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            key, dx, dy, angle0, ecc0 = node.entry
+            self._entries.move_to_end(key)
+        theta = math.radians(angle - angle0)
+        c = math.cos(theta) * ecc0 / ecc
+        s = math.sin(theta) * ecc0 / ecc
+        return c * dx - s * dy, s * dx + c * dy
+
+    def insert(self, angle, ecc, dx, dy):
+        """
+        Store a converged ICR (offset from the centroid) for a line of action. Replaces a stored solution
+        of the same line of action, and evicts the least recently used solution when the index is full.
+        """
+        point = self._point(angle, ecc)
+        with self._lock:
+            node, d2 = self._nearest(point)
+            if node is not None and d2 == 0:
+                node.entry = (node.entry[0], dx, dy, angle, ecc)
+                self._entries.move_to_end(node.entry[0])
+                return
+            node = _Node(point, (self._next_id, dx, dy, angle, ecc), 0)
+            self._entries[self._next_id] = node
+            self._next_id += 1
+            self._insert_node(node)
+            self._n_changes += 1
+            if len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                evicted.entry = None
+                self._n_changes += 1
+
+            # rebuild once as many nodes have been added or evicted as there were at the last rebuild,
+            # which keeps the tree balanced and drops evicted nodes at O(log n) amortized cost
+            if self._n_changes > len(self._entries) // 2 + 8:
+                self._root = self._build(list(self._entries.values()))
+                self._n_changes = 0
+
+    def clear(self):
+        """
+        Delete all stored solutions.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._root = None
+            self._n_changes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "WarmStartIndex(entries={}, max_entries={}, hits={}, misses={})".format(
+            len(self), self.max_entries, self.hits, self.misses)
+
+
+def line_of_action(Vx, Vy, torsion):
+    """
+    Normalized line of action of a load: angle in [0, 360) degrees and eccentricity e = torsion / V >= 0.
+    """
+    V_resultant = (Vx**2 + Vy**2)**(1/2)
+    angle = math.degrees(math.atan2(Vy, Vx))
+    ecc = torsion / V_resultant
+    if ecc < 0:
+        angle, ecc = angle + 180, -ecc
+    return angle % 360, ecc
+
+
+def get_index(geometry, curve=None, max_entries=MAX_ENTRIES):
+    """
+    Warm start index of a bolt pattern and load-deformation curve, shared by every solve of the same
+    pattern in this process (at any location, see ezbolt.batch.geometry_key()). The pattern key is
+    computed once per geometry dict and kept in it as geometry["pattern_key"].
+
+    Args:
+        geometry            dict:: {"x", "y", "Iz"}, e.g. from BoltGroup.icr_geometry() or ezbolt.icr.icr_geometry()
+        curve               obj::  (OPTIONAL) LoadDeformationCurve. Default = None (closed-form AISC curve)
+        max_entries         int::  (OPTIONAL) size of a newly created index. Default = 256
+    """
+    pattern_key = geometry.get("pattern_key")
+    if pattern_key is None:
+        pattern_key, _, _ = ezbolt.batch.geometry_key(list(zip(geometry["x"].tolist(), geometry["y"].tolist())))
+        geometry["pattern_key"] = pattern_key
+    key = (pattern_key, None if curve is None else curve.key)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = WarmStartIndex(math.sqrt(geometry["Iz"] / len(geometry["x"])), max_entries)
+            _indexes[key] = index
+            if len(_indexes) > MAX_GEOMETRIES:
+                _indexes.popitem(last=False)
+        else:
+            _indexes.move_to_end(key)
+        return index
+
+
+def get_warm_start(warm_start, geometry, curve=None):
+    """
+    Return a WarmStartIndex or None. warm_start may be a WarmStartIndex, True (the shared index of the
+    pattern, see get_index()), or False / None (no warm start).
+    """
+    if isinstance(warm_start, WarmStartIndex):
+        return warm_start
+    if warm_start is None or warm_start is False:
+        return None
+    return get_index(geometry, curve)
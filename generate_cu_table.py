@@ -1,8 +1,7 @@
-import ezbolt
+import ezbolt.cutable
 import time
 import numpy as np
 import pandas as pd
-import math
 from tqdm import tqdm
 import json
 from multiprocessing import Pool, cpu_count
@@ -20,16 +19,28 @@ col_spacing = 3
 csv_filename = "Cu Coefficient Table.csv"
 json_filename = "Cu Coefficient Table.json"
 
+# adaptive refinement. If True, n_degrees and n_eccs only set the range. Each bolt pattern gets its own
+# nonuniform grid, refined until linear interpolation between grid lines is within adaptive_tol (relative).
+# Use ezbolt.cutable.CuTable to interpolate the resulting table. See ezbolt.cutable.adaptive_grid()
+adaptive = False
+adaptive_tol = 0.01
 
-# test run to estimate expected runtime
+# solve the uniform grid in lockstep batches (many bolt groups advanced together with numpy) rather than
+# one case at a time. Much faster, results agree to round-off. See ezbolt.cutable.Cu_grid()
+batched = True
+
+
+# test run to estimate expected runtime (Cu only, Ce is computed separately in one vectorized pass)
 time_start = time.time()
-bolt_group = ezbolt.BoltGroup()
-bolt_group.add_bolts(xo=0, yo=0, width=6, height=6, nx=3, ny=3)
-_= bolt_group.solve(Vx=-10, Vy=-30, torsion=-200, verbose=False)
+bolt_group = ezbolt.cutable.rectangular_group(3, 3, col_spacing, row_spacing)
+_= ezbolt.cutable.solve_Cu_AISC(bolt_group, degree=18, ecc=6)
 time_end = time.time()
 
 # calculate expected run time and ask user if want to continue
 n_iterations = len(n_rows) * len(n_cols)* len(n_degrees) * len(n_eccs)
+if adaptive:
+    print("Adaptive refinement (tol = {}). Number of solves depends on the tolerance;".format(adaptive_tol))
+    print("the estimate below is an upper bound for a similar accuracy.")
 run_time = (time_end - time_start)
 n_cores = cpu_count()
 serial_runtime = n_iterations * run_time
@@ -37,6 +48,8 @@ parallel_runtime = serial_runtime / n_cores
 print("{:,.0f} iterations. ~{:.0f} ms per run. ".format(n_iterations, run_time*1000))
 print("Estimated Serial Runtime = {:.1f} minutes".format(serial_runtime/60))
 print("Estimated Parallel Runtime = {:.1f} minutes".format(parallel_runtime/60))
+if batched and not adaptive:
+    print("Batched solves are typically an order of magnitude faster than these estimates.")
 user_option = input("Would you like to continue? 1=serial, 2=parallel, 3=exit: ")
 if user_option == "3":
     raise RuntimeError("stopped by user")
@@ -44,83 +57,76 @@ else:
     run_serial = True if user_option == "1" else False
 
 
-# define function to run in parallel
-def compute_cu(args):
-    """ function used to calculate Ce and Cu"""
-    # unpack arguments
-    n_col, n_row, ecc, degree = [args[0], args[1], args[2], args[3]]
-    
-    # calculate input parameters based on orientation and eccentricity
-    nx = n_col
-    ny = n_row
-    width = (n_col-1) * col_spacing
-    height = (n_row-1) * row_spacing
-    
-    Vx = -math.sin(degree * math.pi / 180)
-    Vy = -math.cos(degree * math.pi / 180)
-    torsion = Vy * ecc
-    
-    # create bolt group and calculate Cu
-    bolt_group = ezbolt.BoltGroup()
-    bolt_group.add_bolts(xo=0, yo=0, width=width, height=height, nx=nx, ny=ny)
-    r = bolt_group.solve(Vx=Vx, Vy=Vy, torsion=torsion, verbose=False)
-    Ce = r["Elastic Method - Center of Rotation"]["Ce"]
-    Cu = r["Instant Center of Rotation Method"]["Cu"]
-    
-    return [n_col, n_row, ecc, degree, Ce, Cu]
-    
-# create arg_list
-arg_list = []
-for a in n_cols:
-    for b in n_rows:
-        for c in n_eccs:
-            for d in n_degrees:
-                arg_list.append([a,b,c,d])
-
-if run_serial:
-    # run calculation in serial
-    results = []
-    for a in tqdm(arg_list):
-        results.append(compute_cu(a))
-else:   
-    # run calculation in parallel
+# adaptive tables have a different grid per bolt pattern, one task per pattern returning its rows
+def compute_cu_adaptive(args):
+    """ function used to calculate an adaptive Cu table for one bolt pattern"""
+    n_col, n_row = [args[0], args[1]]
+    rows, n_solves = ezbolt.cutable.adaptive_pattern_table(n_col, n_row, 
+                                                           col_spacing = col_spacing, 
+                                                           row_spacing = row_spacing, 
+                                                           degree_range = (min(n_degrees), max(n_degrees)), 
+                                                           ecc_range = (min(n_eccs), max(n_eccs)), 
+                                                           tol = adaptive_tol)
+    return rows
+
+if not run_serial:
     print("\nStarting parallel computation. This may take some time...")
     print("Some bolt group configurations taken longer to converge. Progress bar may not be accurate.")
-    start=time.time()
-    with Pool() as pool:
-        results = list(tqdm(pool.imap(compute_cu, arg_list), total=n_iterations))
-    print("Done! Elapsed time = {:.2f} s".format(time.time() - start))
+start=time.time()
+if adaptive:
+    arg_list = [[a,b] for a in n_cols for b in n_rows]
+    results = []
+    if run_serial:
+        for a in tqdm(arg_list):
+            results.extend(compute_cu_adaptive(a))
+    else:
+        with Pool() as pool:
+            for task_results in tqdm(pool.imap(compute_cu_adaptive, arg_list), total=len(arg_list)):
+                results.extend(task_results)
+    df_data = pd.DataFrame(results, columns = ezbolt.cutable.TABLE_COLUMNS)
+else:
+    # uniform grid. Workers write Cu straight into a shared (pattern x ecc x degree) buffer.
+    # Ce is closed-form and computed for the whole grid in one vectorized pass
+    Cu = ezbolt.cutable.Cu_grid(n_cols, n_rows, n_degrees, n_eccs, col_spacing, row_spacing, 
+                                processes = 1 if run_serial else None, 
+                                progress = tqdm, 
+                                batched = batched)
+    bolt_groups = [ezbolt.cutable.rectangular_group(a, b, col_spacing, row_spacing) for a in n_cols for b in n_rows]
+    Ce = ezbolt.cutable.Ce_grid(bolt_groups, n_degrees, n_eccs)
+    df_data = ezbolt.cutable.grid_table(n_cols, n_rows, n_degrees, n_eccs, Ce, Cu)
+print("Done! Elapsed time = {:.2f} s".format(time.time() - start))
 
 
 
 # write results to csv
-df_data = pd.DataFrame(results, columns = ["columns", "rows", "eccentricity", "degree", "Ce", "Cu"])
 df_data.to_csv(csv_filename, index=False)
 
 
 # write results to json
 json_data = dict()
-for row in results:
-    col_key = row[0]
-    row_key = row[1]
-    ecc_key = row[2]
-    deg_key = row[3]
-    ce = row[4]
-    cu = row[5]
-    
-    if col_key not in json_data:
-        json_data[col_key] = dict()
-    if row_key not in json_data[col_key]:
-        json_data[col_key][row_key] = dict()
-    if ecc_key not in json_data[col_key][row_key]:
-        json_data[col_key][row_key][ecc_key] = dict()
-    if deg_key not in json_data[col_key][row_key][ecc_key]:
-        json_data[col_key][row_key][ecc_key][deg_key] = dict()
-    
-    json_data[col_key][row_key][ecc_key][deg_key]["Ce"] = ce
-    json_data[col_key][row_key][ecc_key][deg_key]["Cu"] = cu
+if adaptive:
+    for row in df_data.to_dict("records"):
+        col_key = row["columns"]
+        row_key = row["rows"]
+        ecc_key = row["eccentricity"]
+        deg_key = row["degree"]
+        
+        if col_key not in json_data:
+            json_data[col_key] = dict()
+        if row_key not in json_data[col_key]:
+            json_data[col_key][row_key] = dict()
+        if ecc_key not in json_data[col_key][row_key]:
+            json_data[col_key][row_key][ecc_key] = dict()
+        json_data[col_key][row_key][ecc_key][deg_key] = {"Ce": row["Ce"], "Cu": row["Cu"]}
+else:
+    # nested dict straight from the grids, no intermediate records
+    Ce_list = Ce.tolist()
+    Cu_list = Cu.tolist()
+    patterns = [(a, b) for a in n_cols for b in n_rows]
+    for k, (col_key, row_key) in enumerate(patterns):
+        json_data.setdefault(col_key, dict())[row_key] = {
+            ecc_key: {deg_key: {"Ce": Ce_list[k][i][j], "Cu": Cu_list[k][i][j]} for j, deg_key in enumerate(n_degrees)}
+            for i, ecc_key in enumerate(n_eccs)}
     
 with open(json_filename, "w") as f:
     json.dump(json_data, f)
-
-
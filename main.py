@@ -18,6 +18,6 @@ ezbolt.plot_ECR(bolt_group)
 ezbolt.plot_ICR(bolt_group)
 
 # look at the bolt force tables
-df1 = results["Elastic Method - Superposition"]["Bolt Force Table"]
-df2 = results["Elastic Method - Center of Rotation"]["Bolt Force Table"]
-df3 = results["Instant Center of Rotation Method"]["Bolt Force Table"]
\ No newline at end of file
+df1 = results.elastic.bolt_table
+df2 = results.ECR.bolt_table
+df3 = results.ICR.bolt_table
\ No newline at end of file
@@ -0,0 +1,82 @@
+import math
+import pandas as pd
+import pytest
+import ezbolt
+import ezbolt.batch
+import ezbolt.cli
+from ezbolt.cutable import rectangular_group
+
+
+def schedule(factors):
+    return [{"id": k, "nx": 2, "ny": 4, "width": 3, "height": 9,
+             "Vx": 0.01 * factor, "Vy": -0.05 * factor, "torsion": 0.2 * factor} for k, factor in enumerate(factors)]
+
+
+def solve_schedule(records):
+    (coords, cases), = ezbolt.batch.group_by_geometry(records)[0]
+    outputs = ezbolt.batch.solve_geometry(coords, cases)
+    assert all(error is None for _, _, error in outputs)
+    return {record["Vx"]: row for record, row, _ in outputs}
+
+
+def test_rows_do_not_depend_on_order():
+    forward = solve_schedule(schedule([1, 1000]))
+    backward = solve_schedule(schedule([1000, 1]))
+    for Vx, row in forward.items():
+        for key in ("Cu", "ICR_x", "ICR_y", "DCR_ICR"):
+            assert row[key] == backward[Vx][key]
+
+
+@pytest.mark.parametrize("extension, processes", [(".csv", 1), (".parquet", 2)])
+def test_cli_end_to_end(tmp_path, extension, processes):
+    if extension == ".parquet":
+        pytest.importorskip("pyarrow")
+    records = [{"id": "a", "nx": 2, "ny": 4, "width": 3, "height": 9, "Vx": 10, "Vy": -40, "torsion": 150},
+               {"id": "b", "nx": 1, "ny": 3, "width": 0, "height": 6, "Vx": 0, "Vy": -50, "torsion": -100},
+               {"id": "bad", "bolts": "0 0; 3", "Vx": 5, "Vy": -5, "torsion": 10},
+               {"id": "c", "nx": 2, "ny": 4, "width": 3, "height": 9, "Vx": -20, "Vy": 5, "torsion": 60},
+               {"id": "d", "bolts": "0 0; 3 0; 0 3", "Vx": 5, "Vy": -30, "torsion": 20}]
+    pd.DataFrame(records).to_csv(tmp_path / "schedule.csv", index=False)
+    output = tmp_path / ("results" + extension)
+    status = ezbolt.cli.main(["batch", str(tmp_path / "schedule.csv"), "-o", str(output), "--chunksize", "2",
+                              "-j", str(processes), "-q"])
+    assert status == 1
+
+    results = pd.read_csv(output) if extension == ".csv" else pd.read_parquet(output)
+    assert sorted(results["id"]) == ["a", "b", "c", "d"]
+    assert list(results.columns) == ezbolt.batch.RESULT_COLUMNS
+    failed = pd.read_csv(tmp_path / "results.failed.csv")
+    assert list(failed["id"]) == ["bad"] and failed["error"][0]
+    for record in records[:2] + records[3:4]:
+        row = results.set_index("id").loc[record["id"]]
+        direct = rectangular_group(record["nx"], record["ny"]).solve(record["Vx"], record["Vy"], record["torsion"],
+                                                                     verbose=False)
+        assert row["Cu"] == pytest.approx(direct.ICR.Cu, rel=1e-12)
+        assert row["DCR_ICR"] == pytest.approx(direct.ICR.DCR, rel=1e-12)
+
+
+def test_shifted_rows_match_direct_solve():
+    records = [{"id": k, "nx": 2, "ny": 3, "width": 3, "height": 6, "xo": xo, "yo": yo,
+                "Vx": 5, "Vy": -30, "torsion": 90} for k, (xo, yo) in enumerate([(0, 0), (12.5, -4), (-7, 20)])]
+    groups, failed = ezbolt.batch.group_by_geometry(records)
+    assert failed == [] and len(groups) == 1
+    coords, cases = groups[0]
+    for record, row, error in ezbolt.batch.solve_geometry(coords, cases):
+        assert error is None
+        direct = ezbolt.BoltGroup()
+        direct.add_bolts(xo=record["xo"], yo=record["yo"], width=3, height=6, nx=2, ny=3)
+        direct = direct.solve(5, -30, 90, verbose=False)
+        assert row["Cu"] == pytest.approx(direct.ICR.Cu, rel=1e-12)
+        assert row["ICR_x"] == pytest.approx(direct.ICR.ICR_x, abs=1e-9)
+        assert row["ICR_y"] == pytest.approx(direct.ICR.ICR_y, abs=1e-9)
+        assert row["ECR_x"] == pytest.approx(direct.ECR.ECR_x, abs=1e-9)
+        assert row["ECR_y"] == pytest.approx(direct.ECR.ECR_y, abs=1e-9)
+
+
+def test_screened_rows():
+    records = schedule([1, 2000])
+    (coords, cases), = ezbolt.batch.group_by_geometry(records)[0]
+    screened, exact = [row for _, row, _ in ezbolt.batch.solve_geometry(coords, cases, screen=0.8)]
+    assert screened["status"] == "screened" and screened["DCR_elastic"] < 0.8 and math.isnan(screened["Cu"])
+    assert exact["status"] == "exact" and exact["DCR_elastic"] >= 0.8
+    assert exact["Cu"] == solve_schedule(records)[exact["Vx"]]["Cu"]
@@ -0,0 +1,105 @@
+import math
+import numpy as np
+import pytest
+import ezbolt
+from ezbolt.cutable import rectangular_group
+
+
+def test_rescale_matches_solve(capsys):
+    bolt_group = rectangular_group(2, 4)
+    Cu = bolt_group.solve(10, -40, 150, verbose=False).ICR.Cu
+    rescaled = bolt_group.solve(25, -100, 375, bolt_capacity=21.0)
+    assert "rescaled by 2.5" in capsys.readouterr().out
+    fresh = rectangular_group(2, 4).solve(25, -100, 375, bolt_capacity=21.0, verbose=False)
+    assert rescaled.ICR.Cu == Cu
+    assert rescaled.ICR.Cu == pytest.approx(fresh.ICR.Cu, rel=1e-3)
+    assert rescaled.ICR.DCR == pytest.approx(fresh.ICR.DCR, rel=1e-3)
+    assert rescaled.elastic.DCR == pytest.approx(fresh.elastic.DCR, rel=1e-12)
+    assert rescaled.ECR.DCR == pytest.approx(fresh.ECR.DCR, rel=1e-12)
+    np.testing.assert_allclose(rescaled.ICR.column("force"), fresh.ICR.column("force"), rtol=1e-2)
+
+
+@pytest.mark.parametrize("load, factor", [((0.01, -0.05, 0.2), 1000), ((0.3, -0.4, 1.5), 1000), ((0.3, -0.4, 1.5), 100)])
+def test_rescale_large_factor_meets_tolerance(load, factor):
+    # the equilibrium tolerance is absolute, so the residual of a small load grows past it when scaled up
+    bolt_group = rectangular_group(2, 4)
+    bolt_group.solve(*load, verbose=False)
+    scaled = tuple(factor * v for v in load)
+    result = bolt_group.solve(*scaled, verbose=False)
+    assert result.ICR.converged and result.ICR.history[9, -1] < 0.01
+    fresh = rectangular_group(2, 4).solve(*scaled, verbose=False)
+    assert result.ICR.Cu == pytest.approx(fresh.ICR.Cu, rel=1e-4)
+
+
+def test_rescale_disabled():
+    bolt_group = rectangular_group(2, 4)
+    bolt_group.solve(10, -40, 150, verbose=False)
+    result = bolt_group.solve(20, -80, 300, verbose=False, rescale=False)
+    fresh = rectangular_group(2, 4).solve(20, -80, 300, verbose=False)
+    assert result.ICR.Cu == fresh.ICR.Cu
+    assert result.ICR.n_trials == fresh.ICR.n_trials
+
+
+def test_repeated_solves_do_not_accumulate_state():
+    bolt_group = rectangular_group(2, 4)
+    geometry = bolt_group.get_geometry()
+    loads = [(10, -40, 150), (-20, 5, 60), (30, 30, -400)]
+    for load in loads * 3:
+        result = bolt_group.solve(*load, verbose=False, rescale=False)
+        fresh = rectangular_group(2, 4).solve(*load, verbose=False)
+        assert result.ICR.Cu == fresh.ICR.Cu and result.ICR.n_trials == fresh.ICR.n_trials
+        assert len(bolt_group.Cu) == len(bolt_group.ICR_x) == fresh.ICR.n_trials
+        assert all(len(bolt.force_ICR) == 1 for bolt in bolt_group.bolts)
+        assert bolt_group.get_geometry() is geometry
+
+    # load-independent data is rebuilt once the geometry changes
+    bolt_group.add_bolt_single(10, 10)
+    assert bolt_group.get_geometry() is not geometry
+    result = bolt_group.solve(*loads[0], verbose=False)
+    fresh = rectangular_group(2, 4)
+    fresh.add_bolt_single(10, 10)
+    assert result.ICR.Cu == fresh.solve(*loads[0], verbose=False).ICR.Cu
+
+
+def test_elastic_and_ECR_match_per_bolt_reference():
+    rng = np.random.default_rng(1)
+    bolt_group = ezbolt.BoltGroup()
+    for x, y in rng.uniform(-30, 30, size=(1000, 2)):
+        bolt_group.add_bolt_single(x, y)
+    Vx, Vy, torsion = 30, -80, 900
+    results = bolt_group.solve(Vx, Vy, torsion, verbose=False, rescale=False)
+
+    # bolt by bolt in plain floats
+    bolts = [(b.x, b.y) for b in bolt_group.bolts]
+    N = len(bolts)
+    x_cg = sum(x for x, _ in bolts) / N
+    y_cg = sum(y for _, y in bolts) / N
+    Iz = sum((x - x_cg)**2 + (y - y_cg)**2 for x, y in bolts)
+    vx = [-Vx / N + torsion * (y - y_cg) / Iz for x, y in bolts]
+    vy = [-Vy / N - torsion * (x - x_cg) / Iz for x, y in bolts]
+    v = [math.hypot(a, b) for a, b in zip(vx, vy)]
+    np.testing.assert_allclose(results.elastic.column("vx_total"), vx, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(results.elastic.column("vy_total"), vy, rtol=1e-9, atol=1e-12)
+    assert results.elastic.bolt_demand == pytest.approx(max(v), rel=1e-9)
+
+    # the ECR method is the elastic method as a pure rotation about the ECR: same bolt forces
+    np.testing.assert_allclose(results.ECR.column("vx"), vx, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(results.ECR.column("vy"), vy, rtol=1e-9, atol=1e-12)
+    assert results.ECR.ECR_x == pytest.approx(x_cg - Vy * Iz / torsion / N, rel=1e-9)
+    assert results.ECR.ECR_y == pytest.approx(y_cg + Vx * Iz / torsion / N, rel=1e-9)
+    assert results.ECR.Ce == pytest.approx(math.hypot(Vx, Vy) / max(v), rel=1e-9)
+
+
+def test_screening():
+    bolt_group = rectangular_group(2, 4)
+    light = bolt_group.solve(2, -8, 30, verbose=False, screen=0.8)
+    assert light.status == "screened" and math.isnan(light.ICR.Cu)
+    assert light.elastic.DCR < 0.8
+    # the elastic method is conservative away from concentric loads, so a screened case passes by ICR too
+    exact = rectangular_group(2, 4).solve(2, -8, 30, verbose=False)
+    assert exact.status == "exact" and exact.ICR.DCR <= light.elastic.DCR
+
+    heavy = bolt_group.solve(20, -80, 300, verbose=False, screen=0.8)
+    fresh = rectangular_group(2, 4).solve(20, -80, 300, verbose=False)
+    assert heavy.status == "exact" and heavy.elastic.DCR >= 0.8
+    assert heavy.ICR.Cu == fresh.ICR.Cu
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+import ezbolt.brandt
+from ezbolt.cutable import rectangular_group
+
+
+def test_convex_hull_ro_max_matches_brute_force():
+    rng = np.random.default_rng(0)
+    points = [(g.get_geometry()["x"], g.get_geometry()["y"]) for g in (rectangular_group(1, 5), rectangular_group(4, 4))]
+    # integer coordinates give repeated and collinear points
+    points += [rng.integers(-5, 6, size=(2, n)).astype(float) for n in (1, 2, 3, 7, 30)]
+    for x, y in points:
+        hull = ezbolt.brandt.convex_hull(x, y)
+        for px, py in rng.uniform(-20, 20, size=(50, 2)):
+            ro = np.hypot(x - px, y - py)
+            assert ro[hull].max() == ro.max()
+
+
+@pytest.mark.parametrize("pattern", [(1, 3), (2, 4), (3, 3)])
+def test_numba_matches_python(pattern):
+    pytest.importorskip("numba")
+    for load in [(0, -50, -100), (10, -40, 150), (-20, 5, 60), (30, 30, -400)]:
+        python = rectangular_group(*pattern).solve(*load, verbose=False).ICR
+        numba = rectangular_group(*pattern).solve(*load, verbose=False, backend="numba").ICR
+        assert python.converged
+        assert numba.Cu == pytest.approx(python.Cu, rel=1e-12)
+        assert numba.n_trials == python.n_trials
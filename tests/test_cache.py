@@ -0,0 +1,60 @@
+import pytest
+import ezbolt.cache
+from ezbolt.cutable import rectangular_group
+
+
+PATTERNS = [(1, 3), (2, 4), (3, 3)]
+LOADS = [(0, -50, -100), (10, -40, 150), (-20, 5, 60), (30, 30, -400)]
+
+
+def solve(pattern, load, **kwargs):
+    # a new BoltGroup for every solve, so a repeated line of action is solved rather than rescaled
+    return rectangular_group(*pattern).solve(*load, verbose=False, **kwargs).ICR
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_cache_matches_cold(pattern, tmp_path):
+    cache = ezbolt.cache.SolveCache(str(tmp_path / "cache.sqlite"))
+    for load in LOADS:
+        stored = solve(pattern, load, cache=cache)
+        hit = solve(pattern, load, cache=cache)
+        assert stored.Cu == solve(pattern, load).Cu
+        assert hit.converged and hit.n_trials == 1
+        assert hit.Cu == pytest.approx(stored.Cu, rel=1e-3)
+    assert cache.hits == len(LOADS)
+
+
+def test_cache_hit_at_larger_load(tmp_path):
+    # the cache key ignores the load magnitude but the equilibrium tolerance is absolute
+    cache = ezbolt.cache.SolveCache(str(tmp_path / "cache.sqlite"))
+    small = (0.3, -0.4, 1.5)
+    large = tuple(100 * v for v in small)
+    solve((2, 4), small, cache=cache)
+    hit = solve((2, 4), large, cache=cache)
+    assert cache.hits == 1
+    assert hit.converged and hit.n_trials > 1 and hit.history[9, -1] < 0.01
+    assert hit.Cu == pytest.approx(solve((2, 4), large).Cu, rel=1e-3)
+
+
+def test_lookup_returns_icr_without_writing(tmp_path):
+    cache = ezbolt.cache.SolveCache(str(tmp_path / "cache.sqlite"))
+    bolt_group = rectangular_group(2, 4)
+    result = bolt_group.solve(10, -40, 150, verbose=False, cache=cache)
+    conn = cache._connect()
+    changes = conn.total_changes
+    assert cache.lookup(bolt_group, 20, -80, 300) == pytest.approx(result.ICR.ICR)
+    assert cache.lookup(bolt_group, 10, -40, 151) is None
+    assert conn.total_changes == changes
+    cache.flush()
+    assert conn.total_changes == changes + 1
+
+
+def test_eviction_counts_stores_of_every_process(tmp_path, monkeypatch):
+    # two SolveCache objects on one file stand in for two pool workers
+    monkeypatch.setattr(ezbolt.cache, "EVICT_EVERY", 5)
+    path = str(tmp_path / "cache.sqlite")
+    workers = [ezbolt.cache.SolveCache(path, max_entries=10) for _ in range(2)]
+    bolt_group = rectangular_group(2, 4)
+    for k in range(30):
+        workers[k % 2].store(bolt_group, 10, -40, 100 + k, 1.0, 2.0)
+    assert len(workers[0]) <= 10
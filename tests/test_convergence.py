@@ -0,0 +1,26 @@
+import math
+import numpy as np
+import ezbolt.convergence
+from ezbolt.cutable import rectangular_group
+
+
+def test_convergence_map_matches_solve():
+    angles, eccs = [0, 60, 135], [0.5, 3, 8]
+    cmap = ezbolt.convergence.convergence_map([(2, 3)], angles=angles, eccs=eccs, P=100)
+    for i, angle in enumerate(angles):
+        for j, ecc in enumerate(eccs):
+            Vx, Vy = 100 * math.cos(math.radians(angle)), 100 * math.sin(math.radians(angle))
+            ICR = rectangular_group(2, 3).solve(Vx, Vy, 100 * ecc, verbose=False).ICR
+            assert cmap.n_trials[0, i, j] == ICR.n_trials
+            assert cmap.converged[0, i, j] == ICR.converged
+
+
+def test_replay_corpus(tmp_path):
+    path = str(tmp_path / "corpus.csv")
+    cmap = ezbolt.convergence.convergence_map([(2, 3), (1, 4)], angles=[0, 60, 135], eccs=[0.5, 3, 8],
+                                             slow_trials=1, corpus=path)
+    replay = ezbolt.convergence.replay_corpus(path)
+    assert len(replay) == int(cmap.hard.sum()) > 0
+    assert (replay["n_trials"] == replay["n_trials_before"]).all()
+    assert (replay["converged"] == replay["converged_before"]).all()
+    np.testing.assert_array_equal(replay["Cu"], replay["Cu_before"])
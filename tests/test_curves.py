@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ezbolt
+import ezbolt.cli
+import ezbolt.convergence
+import ezbolt.curves
+import ezbolt.surrogate
+from ezbolt.cutable import rectangular_group
+
+
+def test_aisc_table_matches_closed_form():
+    # linear interpolation error is largest near rho = 0, where R ~ rho**0.55 has an infinite slope
+    rho = np.linspace(0, 1, 100001)
+    error = np.abs(ezbolt.curves.load_ratio(rho, ezbolt.curves.AISC) - ezbolt.curves.load_ratio(rho))
+    assert error.max() < 5e-3
+    assert error[rho >= 0.01].max() < 1e-5
+
+
+def test_aisc_coefficients_match_closed_form():
+    assert ezbolt.curves.concentric_Cu(4, ezbolt.curves.AISC) == pytest.approx(ezbolt.curves.concentric_Cu(4), rel=1e-12)
+    ro = np.array([1.5, 2.5, 3.0, 4.2])
+    assert ezbolt.curves.torsion_Cu(ro, ezbolt.curves.AISC) == pytest.approx(ezbolt.curves.torsion_Cu(ro), rel=1e-5)
+
+
+@pytest.mark.parametrize("nx, ny, Vx, Vy, torsion", [
+    (1, 3, 0, -50, -100),
+    (2, 4, 10, -40, 150),
+    (3, 3, -20, 5, 60),
+])
+def test_aisc_solve_matches_closed_form(nx, ny, Vx, Vy, torsion):
+    bolt_group = ezbolt.BoltGroup()
+    bolt_group.add_bolts(xo=0, yo=0, width=3 * (nx - 1), height=3 * (ny - 1), nx=nx, ny=ny)
+    closed = bolt_group.solve(Vx, Vy, torsion, verbose=False)
+    tabulated = bolt_group.solve(Vx, Vy, torsion, verbose=False, curve="AISC")
+    assert closed.ICR.converged and tabulated.ICR.converged
+    assert tabulated.ICR.Cu == pytest.approx(closed.ICR.Cu, rel=1e-3)
+
+
+LINEAR = ezbolt.curves.from_test_data(deformation=[0.1, 0.2, 0.3], force=[10.0, 20.0, 30.0], name="linear")
+
+
+def test_inverse_queries_use_curve():
+    bolt_group = rectangular_group(2, 4)
+    Cu, _, _ = ezbolt.surrogate.solve_Cu(bolt_group, 0, -1, 4, tol=1e-3, curve=LINEAR)
+    result = bolt_group.max_load(ecc=4, angle=270, curve=LINEAR)
+    assert result.Cu == pytest.approx(Cu, rel=1e-12)
+    assert result.Cu != pytest.approx(bolt_group.max_load(ecc=4, angle=270).Cu, rel=1e-2)
+    result = bolt_group.max_eccentricity(P=0.9 * Cu * 17.9, angle=270, curve=LINEAR)
+    assert result.ecc > 4 and result.Cu >= 0.9 * Cu
+    assert bolt_group.critical_angle(ecc=4, curve=LINEAR).Cu <= Cu * (1 + 1e-3)
+
+
+def test_convergence_map_uses_curve(tmp_path):
+    path = str(tmp_path / "corpus.csv")
+    cmap = ezbolt.convergence.convergence_map([(2, 3)], angles=[0, 60], eccs=[3], slow_trials=1, corpus=path,
+                                             curve=LINEAR)
+    Cu, _, _ = ezbolt.surrogate.solve_Cu(rectangular_group(2, 3), 100, 0, 300, tol=1e-4, curve=LINEAR)
+    assert cmap.Cu[0, 0, 0] == pytest.approx(Cu, rel=1e-3)
+    replay = ezbolt.convergence.replay_corpus(path, curve=LINEAR)
+    np.testing.assert_array_equal(replay["Cu"], replay["Cu_before"])
+
+
+def test_batch_cli_curve(tmp_path):
+    pd.DataFrame({"deformation": [0.1, 0.2, 0.3], "force": [10.0, 20.0, 30.0]}).to_csv(tmp_path / "curve.csv", index=False)
+    pd.DataFrame([{"id": "a", "nx": 2, "ny": 4, "width": 3, "height": 9, "Vx": 10, "Vy": -40, "torsion": 150}]).to_csv(
+        tmp_path / "schedule.csv", index=False)
+    ezbolt.cli.main(["batch", str(tmp_path / "schedule.csv"), "-o", str(tmp_path / "out.csv"), "-j", "1", "-q",
+                     "--curve", str(tmp_path / "curve.csv")])
+    row = pd.read_csv(tmp_path / "out.csv").iloc[0]
+    expected = rectangular_group(2, 4).solve(10, -40, 150, verbose=False, curve=LINEAR)
+    assert row["Cu"] == pytest.approx(expected.ICR.Cu, rel=1e-12)
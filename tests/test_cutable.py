@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+import ezbolt.cutable
+
+
+def test_adaptive_table_meets_tolerance():
+    bolt_group = ezbolt.cutable.rectangular_group(2, 4)
+    rows, n_solves = ezbolt.cutable.adaptive_pattern_table(2, 4, tol=0.01)
+    # fewer solves than the uniform table: every integer degree 0-75 and inch of eccentricity 1-36
+    assert n_solves < 76 * 36
+    table = ezbolt.cutable.CuTable(pd.DataFrame(rows, columns=ezbolt.cutable.TABLE_COLUMNS))
+    rng = np.random.default_rng(0)
+    for degree, ecc in zip(rng.uniform(0, 75, 30), rng.uniform(1, 36, 30)):
+        exact = ezbolt.cutable.solve_Cu_AISC(bolt_group, degree, ecc, tol=1e-4)[0]
+        assert table.lookup(2, 4, ecc, degree) == pytest.approx(exact, rel=0.02)
+
+
+def test_Ce_grid_matches_solve():
+    patterns = [(1, 3), (2, 4), (3, 3)]
+    degrees, eccs = [0, 15, 45, 75], [0, 1, 6, 20]
+    Ce = ezbolt.cutable.Ce_grid([ezbolt.cutable.rectangular_group(*p) for p in patterns], degrees, eccs)
+    assert Ce.shape == (3, 4, 4)
+    assert np.isnan(Ce[:, 0, :]).all()
+    for k, pattern in enumerate(patterns):
+        for j, ecc in enumerate(eccs[1:], 1):
+            for i, degree in enumerate(degrees):
+                Vx, Vy = -np.sin(np.radians(degree)), -np.cos(np.radians(degree))
+                result = ezbolt.cutable.rectangular_group(*pattern).solve(Vx, Vy, Vy * ecc, verbose=False)
+                assert Ce[k, j, i] == pytest.approx(result.ECR.Ce, rel=1e-12)
+
+    df = ezbolt.cutable.Ce_table([1, 2, 3], [3, 4], degrees, eccs)
+    assert len(df) == 6 * 4 * 4
+    row = df[(df["columns"] == 2) & (df["rows"] == 4) & (df["eccentricity"] == 6) & (df["degree"] == 45)]
+    assert row["Ce"].item() == Ce[1, 2, 2]
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_Cu_grid_shared_memory_matches_serial(batched):
+    args = ([1, 2], [3, 4], [0, 30, 60], [1, 4, 12])
+    serial = ezbolt.cutable.Cu_grid(*args, batched=batched)
+    parallel = ezbolt.cutable.Cu_grid(*args, processes=2, batched=batched)
+    if batched:
+        # serial batches pad several patterns together, parallel ones hold one pattern: sums differ in the last bit
+        np.testing.assert_allclose(parallel, serial, rtol=1e-12)
+    else:
+        np.testing.assert_array_equal(parallel, serial)
+    assert not np.isnan(serial).any()
+    bolt_group = ezbolt.cutable.rectangular_group(2, 4)
+    assert serial[3, 1, 1] == pytest.approx(ezbolt.cutable.solve_Cu_AISC(bolt_group, 30, 4, tol=1e-4)[0], rel=1e-3)
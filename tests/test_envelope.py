@@ -0,0 +1,43 @@
+import math
+import numpy as np
+import pytest
+from ezbolt.cutable import rectangular_group
+
+
+def load_history(n_steps):
+    for k in range(n_steps):
+        t = 2 * math.pi * k / n_steps
+        yield 20 * math.cos(t), -40 + 10 * math.sin(3 * t), 150 * math.sin(t) + 250
+    yield 0, 0, 0
+    yield 0, 0, -250
+
+
+def test_envelope_matches_step_by_step_solves():
+    bolt_group = rectangular_group(2, 4)
+    envelope = bolt_group.envelope(load_history(40))
+    assert envelope.n_steps == 42 and envelope.n_not_converged == 0
+
+    DCR = []
+    peak_force = np.zeros(bolt_group.N_bolt)
+    for load in load_history(40):
+        if load == (0, 0, 0):
+            DCR.append(0.0)
+            continue
+        result = rectangular_group(2, 4).solve(*load, verbose=False)
+        DCR.append(result.ICR.DCR)
+        peak_force = np.maximum(peak_force, np.abs(result.ICR.column("force")))
+    assert envelope.max_DCR == pytest.approx(max(DCR), rel=1e-3)
+    assert envelope.max_DCR_step == int(np.argmax(DCR))
+    assert envelope.governing_load == tuple(float(v) for v in list(load_history(40))[envelope.max_DCR_step])
+    np.testing.assert_allclose(envelope.peak_force, peak_force, rtol=1e-3)
+    assert envelope.bolt_demand == pytest.approx(peak_force.max(), rel=1e-3)
+
+
+def test_envelope_skips_steps_that_do_not_converge():
+    # Brandt's iteration does not converge for this near-concentric load
+    steps = [(10, -40, 150), (-17.820130483767358, -49.876883405951375, -18.098574960931998), (20, -80, 300)]
+    bolt_group = rectangular_group(2, 4)
+    assert not rectangular_group(2, 4).solve(*steps[1], verbose=False).ICR.converged
+    envelope = bolt_group.envelope(iter(steps))
+    assert envelope.n_steps == 3 and envelope.n_not_converged == 1 and envelope.first_not_converged == 1
+    assert envelope.max_DCR_step == 2
@@ -0,0 +1,41 @@
+import concurrent.futures
+import copy
+import numpy as np
+import pytest
+import ezbolt.icr
+from ezbolt.cutable import rectangular_group
+
+
+LOADS = [(0, -50, -100), (10, -40, 150), (-20, 5, 60), (30, 30, -400), (0, 0, 80)]
+
+
+def test_solve_icr_does_not_modify_inputs():
+    coordinates = [(0, 0), (3, 0), (0, 3), (3, 3), (0, 6), (3, 6)]
+    geometry = ezbolt.icr.icr_geometry(coordinates)
+    before = copy.deepcopy(geometry)
+    for key in ("x", "y", "dx", "dy", "hull"):
+        assert not geometry[key].flags.writeable
+        with pytest.raises(ValueError):
+            geometry[key][0] = 1
+    for load in LOADS:
+        from_geometry = ezbolt.icr.solve_icr(geometry, *load, sensitivities=True)
+        from_coordinates = ezbolt.icr.solve_icr(coordinates, *load)
+        assert from_geometry.Cu == from_coordinates.Cu
+    assert coordinates == [(0, 0), (3, 0), (0, 3), (3, 3), (0, 6), (3, 6)]
+    assert geometry.keys() == before.keys()
+    for key, value in before.items():
+        np.testing.assert_array_equal(geometry[key], value)
+
+
+@pytest.mark.parametrize("backend", ["python", "numba"])
+def test_threads_match_serial(backend):
+    if backend == "numba":
+        pytest.importorskip("numba")
+    geometry = rectangular_group(3, 4).icr_geometry()
+    loads = LOADS * 10
+    serial = [ezbolt.icr.solve_icr(geometry, *load, backend=backend) for load in loads]
+    with concurrent.futures.ThreadPoolExecutor(4) as pool:
+        threaded = list(pool.map(lambda load: ezbolt.icr.solve_icr(geometry, *load, backend=backend), loads))
+    for a, b in zip(serial, threaded):
+        assert (a.Cu, a.ICR_x, a.ICR_y, a.n_trials) == (b.Cu, b.ICR_x, b.ICR_y, b.n_trials)
+        np.testing.assert_array_equal(a.column("force"), b.column("force"))
@@ -0,0 +1,44 @@
+import math
+import numpy as np
+import pytest
+import ezbolt.surrogate
+from ezbolt.cutable import rectangular_group
+
+
+def Cu_at(bolt_group, angle, ecc):
+    Vx, Vy = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+    return ezbolt.surrogate.solve_Cu(bolt_group, Vx, Vy, ecc, tol=1e-4)[0]
+
+
+def test_max_load():
+    bolt_group = rectangular_group(2, 4)
+    result = bolt_group.max_load(ecc=6, angle=250, bolt_capacity=21.0)
+    assert result.Cu == pytest.approx(Cu_at(bolt_group, 250, 6), rel=1e-3)
+    assert result.P_max == pytest.approx(21.0 * result.Cu, rel=1e-12)
+    # the connection is exactly at capacity under the returned load
+    solved = rectangular_group(2, 4).solve(*result.load, bolt_capacity=21.0, verbose=False)
+    assert solved.ICR.DCR == pytest.approx(1, rel=1e-3)
+
+
+@pytest.mark.parametrize("P, angle", [(40, 270), (25, 200), (90, 315)])
+def test_max_eccentricity_brackets_capacity(P, angle):
+    bolt_group = rectangular_group(2, 4)
+    result = bolt_group.max_eccentricity(P, angle, tol=0.01)
+    assert result.P_max >= P
+    # the answer is on the safe side, within tol of the eccentricity where capacity drops below P
+    assert Cu_at(bolt_group, angle, result.ecc) * 17.9 >= P * (1 - 1e-3)
+    assert Cu_at(bolt_group, angle, result.ecc + 0.011) * 17.9 < P * (1 + 1e-3)
+
+
+def test_max_eccentricity_beyond_concentric_capacity():
+    result = rectangular_group(2, 4).max_eccentricity(P=1000, angle=270)
+    assert math.isnan(result.ecc)
+
+
+@pytest.mark.parametrize("pattern, ecc", [((2, 4), 6), ((3, 3), 2), ((1, 4), 10)])
+def test_critical_angle_matches_sweep(pattern, ecc):
+    bolt_group = rectangular_group(*pattern)
+    result = bolt_group.critical_angle(ecc, tol=0.1)
+    sweep = [Cu_at(bolt_group, angle, ecc) for angle in np.arange(0, 360, 1.0)]
+    assert result.Cu <= np.nanmin(sweep) * (1 + 1e-3)
+    assert result.Cu == pytest.approx(Cu_at(bolt_group, result.angle, ecc), rel=1e-3)
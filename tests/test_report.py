@@ -0,0 +1,29 @@
+import os
+import pandas as pd
+import pytest
+import ezbolt.report
+from ezbolt.cutable import rectangular_group
+
+
+@pytest.mark.parametrize("fmt, processes", [("png", 1), ("pdf", 2)])
+def test_generate_reports(tmp_path, fmt, processes):
+    records = [{"id": "W12/A", "nx": 2, "ny": 4, "width": 3, "height": 9, "Vx": 10, "Vy": -40, "torsion": 150},
+               {"id": "bad", "bolts": "0 0; 3", "Vx": 5, "Vy": -5, "torsion": 10},
+               {"id": "B2", "nx": 1, "ny": 3, "width": 0, "height": 6, "Vx": 0, "Vy": -50, "torsion": -100}]
+    pd.DataFrame(records).to_csv(tmp_path / "schedule.csv", index=False)
+    output_dir = str(tmp_path / "reports")
+    n_rendered, n_failed = ezbolt.report.generate_reports(str(tmp_path / "schedule.csv"), output_dir, fmt=fmt,
+                                                          processes=processes, chunksize=2, verbose=False)
+    assert (n_rendered, n_failed) == (2, 1)
+
+    index = pd.read_csv(os.path.join(output_dir, "index.csv")).set_index("id")
+    assert list(index.columns) == ezbolt.report.INDEX_COLUMNS[1:]
+    assert pd.isna(index.loc["bad", "files"]) and index.loc["bad", "error"]
+    expected = rectangular_group(2, 4).solve(10, -40, 150, verbose=False)
+    assert index.loc["W12/A", "Cu"] == pytest.approx(expected.ICR.Cu, rel=1e-12)
+    n_files = 1 if fmt == "pdf" else len(ezbolt.report.PLOTS)
+    for case_id in ("W12/A", "B2"):
+        files = index.loc[case_id, "files"].split(";")
+        assert len(files) == n_files
+        assert all(f.startswith(ezbolt.report._file_stem(case_id)) for f in files)
+        assert all(os.path.getsize(os.path.join(output_dir, f)) > 0 for f in files)
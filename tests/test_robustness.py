@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import ezbolt
+from ezbolt.cutable import rectangular_group
+
+
+def rebuilt(coordinates):
+    bolt_group = ezbolt.BoltGroup()
+    for x, y in coordinates:
+        bolt_group.add_bolt_single(x, y)
+    return bolt_group
+
+
+def assert_same_properties(bolt_group, reference):
+    for name in ("N_bolt", "x_cg", "y_cg", "Ix", "Iy", "Ixy", "Iz"):
+        assert getattr(bolt_group, name) == pytest.approx(getattr(reference, name), rel=1e-12, abs=1e-9), name
+    np.testing.assert_allclose(bolt_group.get_geometry()["ro"], reference.get_geometry()["ro"], rtol=1e-12)
+
+
+def test_remove_and_move_bolt_match_rebuilt_group():
+    bolt_group = rectangular_group(3, 4)
+    coordinates = {b.tag: (b.x, b.y) for b in bolt_group.bolts}
+    rng = np.random.default_rng(2)
+    for step in range(20):
+        tag = int(rng.choice(list(coordinates)))
+        if step % 3 == 0 and len(coordinates) > 3:
+            bolt_group.remove_bolt(tag)
+            del coordinates[tag]
+        else:
+            x, y = rng.uniform(-10, 10, 2)
+            bolt_group.move_bolt(tag, x, y)
+            coordinates[tag] = (x, y)
+        reference = rebuilt(coordinates.values())
+        assert_same_properties(bolt_group, reference)
+        assert [b.tag for b in bolt_group.bolts] == list(coordinates)
+    result = bolt_group.solve(10, -40, 150, verbose=False)
+    assert result.ICR.Cu == pytest.approx(reference.solve(10, -40, 150, verbose=False).ICR.Cu, rel=1e-9)
+
+
+@pytest.mark.parametrize("load", [(10, -40, 150), (0, 0, 200)])
+def test_n_minus_one_matches_rebuilt_groups(load):
+    bolt_group = rectangular_group(2, 4)
+    Vx, Vy, torsion = load
+    result = bolt_group.n_minus_one(Vx, Vy, torsion)
+    assert result.n_not_converged == 0 and len(result.table) == 8
+    DCR = {}
+    for bolt in bolt_group.bolts:
+        variant = rebuilt([(b.x, b.y) for b in bolt_group.bolts if b is not bolt])
+        # the load acts at a fixed point: transfer the torsion to the variant's centroid
+        torsion_k = torsion + (bolt_group.x_cg - variant.x_cg) * Vy - (bolt_group.y_cg - variant.y_cg) * Vx
+        DCR[bolt.tag] = variant.solve(Vx, Vy, torsion_k, verbose=False).ICR.DCR
+        assert result.table.loc[bolt.tag, "DCR"] == pytest.approx(DCR[bolt.tag], rel=1e-3)
+    assert result.max_DCR == pytest.approx(max(DCR.values()), rel=1e-3)
+    assert result.DCR_intact == pytest.approx(bolt_group.solve(*load, verbose=False).ICR.DCR, rel=1e-3)
@@ -0,0 +1,45 @@
+import math
+import numpy as np
+import pytest
+import ezbolt.icr
+from ezbolt.cutable import rectangular_group
+
+
+def solve(coordinates, theta, ecc_x, ecc_y, **kwargs):
+    # load at angle theta through the point (ecc_x, ecc_y) from the centroid, equilibrium to machine precision
+    Vx, Vy = math.cos(math.radians(theta)), math.sin(math.radians(theta))
+    result = ezbolt.icr.solve_icr(coordinates, Vx, Vy, Vy * ecc_x - Vx * ecc_y, tol=1e-13, max_iter=100000, **kwargs)
+    assert result.converged
+    return result
+
+
+def central_difference(f, h=1e-4):
+    plus, minus = f(h), f(-h)
+    return {key: (getattr(plus, key) - getattr(minus, key)) / (2 * h) for key in ("Cu", "ICR_x", "ICR_y")}
+
+
+@pytest.mark.parametrize("pattern, theta, ecc", [((2, 4), 250, (5.0, 1.0)), ((3, 3), 30, (-2.0, 4.0)), ((1, 4), 300, (3.0, 0.5))])
+def test_sensitivities_match_finite_differences(pattern, theta, ecc):
+    coordinates = list(zip(*[rectangular_group(*pattern).get_geometry()[k] for k in ("x", "y")]))
+    result = solve(coordinates, theta, *ecc, sensitivities=True)
+    Vx, Vy = math.cos(math.radians(theta)), math.sin(math.radians(theta))
+    # sensitivities are taken at the load point the solver placed on the line of action
+    ecc_x, ecc_y = ezbolt.icr.eccentricity(Vx, Vy, Vy * ecc[0] - Vx * ecc[1])
+    finite = {"ex": central_difference(lambda h: solve(coordinates, theta, ecc_x + h, ecc_y)),
+              "ey": central_difference(lambda h: solve(coordinates, theta, ecc_x, ecc_y + h)),
+              "angle": central_difference(lambda h: solve(coordinates, theta + h, ecc_x, ecc_y))}
+    for k in (0, len(coordinates) - 1):
+        # the load point moves with the centroid
+        def moved(h, axis):
+            shifted = [list(c) for c in coordinates]
+            shifted[k][axis] += h
+            return solve(shifted, theta, ecc_x, ecc_y)
+        finite[("x", k)] = central_difference(lambda h: moved(h, 0))
+        finite[("y", k)] = central_difference(lambda h: moved(h, 1))
+    for parameter, derivatives in finite.items():
+        for key, value in derivatives.items():
+            if isinstance(parameter, tuple):
+                analytic = result.sensitivities[key][parameter[0]][parameter[1]]
+            else:
+                analytic = result.sensitivities[key][parameter]
+            assert analytic == pytest.approx(value, abs=1e-8), (parameter, key)
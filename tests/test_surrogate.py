@@ -0,0 +1,75 @@
+import math
+import warnings
+import numpy as np
+import pytest
+import ezbolt.brandt
+import ezbolt.curves
+import ezbolt.icr
+import ezbolt.surrogate
+from ezbolt.cutable import rectangular_group
+
+
+def padded(patterns):
+    groups = [rectangular_group(*pattern) for pattern in patterns]
+    x, y, mask = ezbolt.surrogate.pad_coordinates([(g.get_geometry()["x"], g.get_geometry()["y"]) for g in groups])
+    return groups, x, y, mask
+
+
+def test_batch_matches_loop():
+    patterns = [(1, 3), (2, 4), (3, 3), (2, 6)]
+    loads = [(0, -50, -100), (10, -40, 150), (-20, 0, 60), (30, 30, -400)]
+    groups, x, y, mask = padded(patterns)
+    Vx, Vy, torsion = np.array(loads, dtype=float).T
+    Cu, ICR, n_trials = ezbolt.surrogate.solve_Cu_batch(x, y, Vx, Vy, torsion, mask)
+    for k, group in enumerate(groups):
+        Cu_k, ICR_k, n_k = ezbolt.surrogate.solve_Cu(group, *loads[k])
+        assert Cu[k] == pytest.approx(Cu_k, rel=1e-12)
+        np.testing.assert_allclose(ICR[k], ICR_k, rtol=1e-12)
+        assert n_trials[k] == n_k
+
+
+def test_batch_pure_torsion_and_concentric():
+    groups, x, y, mask = padded([(2, 4), (2, 4), (3, 3)])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        Cu, ICR, n_trials = ezbolt.surrogate.solve_Cu_batch(x, y, [0, 10, 0], [0, -40, -50], [100, 0, 80], mask)
+    geometry = groups[0].icr_geometry()
+    assert Cu[0] == pytest.approx(ezbolt.icr.solve_icr(geometry, 0, 0, 100).Cu, rel=1e-12)
+    assert tuple(ICR[0]) == (groups[0].x_cg, groups[0].y_cg)
+    assert Cu[1] == pytest.approx(ezbolt.curves.concentric_Cu(8))
+    assert np.isnan(ICR[1]).all()
+    assert list(n_trials[:2]) == [0, 0] and n_trials[2] > 0
+
+
+def test_batch_step_size_matches_scalar():
+    ecc = np.array([0, 0.99, 1, 4.99, 5, 9.99, 10, 30])
+    assert list(ezbolt.brandt.stepsize_factor(ecc)) == [ezbolt.brandt.stepsize_factor(e) for e in ecc]
+
+
+def test_solve_Cu_pure_torsion():
+    group = rectangular_group(2, 4)
+    Cu, ICR, n_trials = ezbolt.surrogate.solve_Cu(group, 0, 0, -100)
+    assert Cu == pytest.approx(ezbolt.icr.solve_icr(group.icr_geometry(), 0, 0, -100).Cu, rel=1e-12)
+    assert ICR == (group.x_cg, group.y_cg) and n_trials == 0
+
+
+def test_surrogate_error_estimate():
+    group = rectangular_group(2, 4)
+    surrogate = group.build_surrogate(np.arange(0, 360, 15), np.linspace(1, 12, 12))
+    rng = np.random.default_rng(0)
+    for angle, ecc in zip(rng.uniform(0, 360, 20), rng.uniform(1, 12, 20)):
+        Vx, Vy = math.cos(math.radians(angle)), math.sin(math.radians(angle))
+        Cu, error = surrogate.query(Vx, Vy, ecc)
+        exact, _, _ = ezbolt.surrogate.solve_Cu(group, Vx, Vy, ecc, tol=1e-3)
+        # the estimate leaves out the 0.1% equilibrium tolerance of the grid points and of the exact solve
+        assert abs(Cu - exact) <= error + 2e-3 * exact
+
+
+def test_surrogate_batched_matches_serial():
+    group = rectangular_group(2, 4)
+    angles, eccs = np.arange(0, 360, 30), [0, 0.5, 1, 3, 6, 12]
+    batched = group.build_surrogate(angles, eccs)
+    serial = group.build_surrogate(angles, eccs, batched=False)
+    np.testing.assert_array_equal(np.isnan(batched.Cu), np.isnan(serial.Cu))
+    np.testing.assert_allclose(batched.Cu, serial.Cu, rtol=5e-3)
+    assert batched.Cu_torsion == serial.Cu_torsion
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+import ezbolt
+from ezbolt.cutable import rectangular_group
+
+
+def sample_group(xs, ys):
+    bolt_group = ezbolt.BoltGroup()
+    for x, y in zip(xs, ys):
+        bolt_group.add_bolt_single(x, y)
+    return bolt_group
+
+
+@pytest.mark.parametrize("load", [(10, -40, 150), (0, 0, 200)])
+def test_monte_carlo_matches_rebuilt_groups(load):
+    bolt_group = rectangular_group(2, 4)
+    Vx, Vy, torsion = load
+    result = bolt_group.monte_carlo(Vx, Vy, torsion, tolerance=0.25, n_samples=20, seed=1)
+    assert result.n_not_converged == 0
+    assert result.Cu_nominal == pytest.approx(rectangular_group(2, 4).solve(*load, verbose=False).ICR.Cu, rel=1e-3)
+    for k in range(result.n_samples):
+        sample = sample_group(result.x[k], result.y[k])
+        # the load acts at a fixed point: transfer the torsion to the sample's centroid
+        torsion_k = torsion + (bolt_group.x_cg - sample.x_cg) * Vy - (bolt_group.y_cg - sample.y_cg) * Vx
+        assert result.Cu[k] == pytest.approx(sample.solve(Vx, Vy, torsion_k, verbose=False).ICR.Cu, rel=1e-3)
+
+
+def test_monte_carlo_processes_and_seed():
+    bolt_group = rectangular_group(2, 4)
+    serial = bolt_group.monte_carlo(10, -40, 150, n_samples=30, seed=3)
+    parallel = bolt_group.monte_carlo(10, -40, 150, n_samples=30, seed=3, processes=2)
+    np.testing.assert_array_equal(serial.x, parallel.x)
+    np.testing.assert_allclose(serial.Cu, parallel.Cu, rtol=1e-12)
+    exact = bolt_group.monte_carlo(10, -40, 150, tolerance=0, n_samples=5, seed=3)
+    np.testing.assert_allclose(exact.Cu, exact.Cu_nominal, rtol=1e-12)
@@ -0,0 +1,41 @@
+import pytest
+import ezbolt.batch
+import ezbolt.warmstart
+from ezbolt.cutable import rectangular_group
+
+
+PATTERNS = [(1, 3), (2, 4), (3, 3)]
+LOADS = [(0, -50, -100), (10, -40, 150), (-20, 5, 60), (30, 30, -400)]
+
+
+def solve(pattern, load, **kwargs):
+    # a new BoltGroup for every solve, so a repeated line of action is solved rather than rescaled
+    return rectangular_group(*pattern).solve(*load, verbose=False, **kwargs).ICR
+
+
+@pytest.mark.parametrize("pattern", PATTERNS)
+def test_warm_start_matches_cold(pattern):
+    index = ezbolt.warmstart.WarmStartIndex(scale=1.0)
+    for load in LOADS + LOADS[::-1]:
+        ICR = solve(pattern, load, warm_start=index)
+        cold = solve(pattern, load)
+        assert ICR.converged and cold.converged
+        assert ICR.Cu == pytest.approx(cold.Cu, rel=1e-3)
+    assert index.hits > 0
+
+
+def test_pattern_key_computed_once_per_geometry(monkeypatch):
+    calls = []
+    geometry_key = ezbolt.batch.geometry_key
+    monkeypatch.setattr(ezbolt.batch, "geometry_key", lambda coords: calls.append(1) or geometry_key(coords))
+    bolt_group = rectangular_group(2, 4)
+    for load in LOADS:
+        bolt_group.solve(*load, verbose=False, warm_start=True)
+    assert len(calls) == 1
+    index = ezbolt.warmstart.get_index(bolt_group.icr_geometry())
+
+    # moving a bolt changes the pattern, so its key and index
+    bolt_group.move_bolt(0, -1, -1)
+    bolt_group.solve(*LOADS[0], verbose=False, warm_start=True)
+    assert len(calls) == 2
+    assert ezbolt.warmstart.get_index(bolt_group.icr_geometry()) is not index